@@ -2,14 +2,16 @@
 #                       ViewFinder_Launcher.pyw
 # ============================================================================
 """
-ViewFinder Launcher - Runs compiled executables in sequence
-This launcher expects ViewFinder_Config.exe and ViewFinder_Main.exe
-to be in the same directory.
+ViewFinder Launcher - Config menu and overlay in one process
+Shows the configuration menu and, on "Run ViewFinder", starts the overlays in
+the same QApplication with the in-memory config. The config menu can be
+reopened from the running overlay with its hotkey.
 """
 
+from startup_timeline import StartupTimeline, BackgroundImporter
+timeline = StartupTimeline()
+
 import sys
-import subprocess
-import os
 
 def show_error_dialog(title, message):
     """Show error using tkinter dialog"""
@@ -24,60 +26,37 @@ def show_error_dialog(title, message):
         pass
 
 def main():
-    # Get the directory where this executable is located
-    if getattr(sys, 'frozen', False):
-        launcher_dir = os.path.dirname(sys.executable)
-    else:
-        launcher_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # Define paths to the compiled executables
-    config_exe = os.path.join(launcher_dir, "ViewFinder_Config.exe")
-    main_exe = os.path.join(launcher_dir, "ViewFinder_Main.exe")
-    
-    # Check if executables exist
-    if not os.path.exists(config_exe):
-        show_error_dialog(
-            "Config Executable Not Found",
-            f"Cannot find ViewFinder_Config.exe\n\n"
-            f"Looking in: {launcher_dir}\n\n"
-            f"Please ensure ViewFinder_Config.exe is in the same folder as this launcher."
-        )
-        return
-    
-    if not os.path.exists(main_exe):
-        show_error_dialog(
-            "Main Executable Not Found",
-            f"Cannot find ViewFinder_Main.exe\n\n"
-            f"Looking in: {launcher_dir}\n\n"
-            f"Please ensure ViewFinder_Main.exe is in the same folder as this launcher."
-        )
-        return
-    
-    # Launch config executable and wait for it to close
-    try:
-        config_process = subprocess.run(
-            [config_exe],
-            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-        )
-    except Exception as e:
-        show_error_dialog(
-            "Failed to Launch Config Menu",
-            f"Error launching ViewFinder_Config.exe:\n\n{str(e)}"
-        )
-        return
-    
-    # Launch main executable (don't wait - let it run independently)
-    try:
-        subprocess.Popen(
-            [main_exe],
-            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-        )
-    except Exception as e:
-        show_error_dialog(
-            "Failed to Launch Main App",
-            f"Error launching ViewFinder_Main.exe:\n\n{str(e)}"
-        )
-        return
+    from PyQt5.QtWidgets import QApplication
+    from config_menu import MainConfigMenu
+    from overlay_runtime import OverlayRuntime, load_config, background_modules
+    timeline.mark("qt imported")
+
+    app = QApplication(sys.argv)
+    app.setQuitOnLastWindowClosed(False)
+    timeline.mark("qapplication created")
+
+    # Heavy modules load while the user is still in the config menu
+    importer = BackgroundImporter(background_modules(load_config()), timeline).start()
+    runtime = OverlayRuntime(app, timeline, importer)
+
+    window = MainConfigMenu()
+
+    def _run(config):
+        timeline.mark("run requested")
+        runtime.start(config)
+        # Later runs come from the overlay's own config menu hotkey
+        window.run_requested.disconnect(_run)
+
+    def _closed():
+        if not runtime.started:
+            app.quit()
+
+    window.run_requested.connect(_run)
+    window.closed.connect(_closed)
+    window.show()
+    timeline.mark("config menu shown")
+
+    sys.exit(app.exec_())
 
 if __name__ == "__main__":
     try:
@@ -86,4 +65,4 @@ if __name__ == "__main__":
         show_error_dialog(
             "Launcher Error",
             f"An unexpected error occurred:\n\n{str(e)}"
-        )
\ No newline at end of file
+        )
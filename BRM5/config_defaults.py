@@ -0,0 +1,54 @@
+# ============================================================================
+#                           config_defaults.py
+# ============================================================================
+
+# Top-level viewfinder_config.json sections shared by the overlay runtime and
+# the config menu. Imports nothing heavy and has no side effects, so the
+# standalone config menu can use it without loading the runtime.
+
+from event_log import DEFAULT_LOGGING_CONFIG
+from trace_log import DEFAULT_TRACING_CONFIG
+from sampling_profiler import DEFAULT_PROFILING_CONFIG
+
+DEFAULT_KEYBINDS = {
+    "auto_detect": "up",
+    "hide_all": "right",
+    "exit": "down",
+    "toggle_magnifier": "m",
+    "toggle_crosshair": "c",
+    "dump_log": "f9",
+    "open_config": "f8",
+    "toggle_recording": "f10",
+    "toggle_profiler": "f11"
+}
+
+DEFAULT_RECORDING_CONFIG = {
+    "directory": "recordings",
+    "mode": "delta",
+    "keyframe_interval": 120,
+    "sparse_every": 4,
+    "max_minutes": 10,
+    "tile": 16,
+    "change_threshold": 2
+}
+
+DEFAULT_CONTROL_CONFIG = {
+    "enabled": False,
+    "transport": "local",
+    "name": "viewfinder-control",
+    "port": 47815,
+    "stats_interval_ms": 250,
+    "max_pending_bytes": 65536
+}
+
+# "crosshair" and "magnifier" are filled in by their own modules' defaults
+DEFAULT_CONFIG = {
+    "crosshair": {},
+    "magnifier": {},
+    "keybinds": DEFAULT_KEYBINDS.copy(),
+    "logging": DEFAULT_LOGGING_CONFIG.copy(),
+    "tracing": DEFAULT_TRACING_CONFIG.copy(),
+    "profiling": DEFAULT_PROFILING_CONFIG.copy(),
+    "recording": DEFAULT_RECORDING_CONFIG.copy(),
+    "control": DEFAULT_CONTROL_CONFIG.copy(),
+}
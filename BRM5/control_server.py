@@ -0,0 +1,244 @@
+# ============================================================================
+#                           control_server.py
+# ============================================================================
+
+import json
+import time
+
+from PyQt5.QtCore import QObject, QTimer
+
+import event_log
+
+# Commands: one per line, either JSON ({"cmd": "zoom", "scale": 3}) or words
+# ("zoom 3"). Every command gets one JSON reply line; subscribers also get
+# {"stats": {...}} lines at their requested interval.
+COMMAND_HELP = {
+    "toggle": "toggle magnifier|crosshair|all",
+    "zoom": "zoom <scale>",
+    "auto": "auto on|off",
+    "reload": "reload",
+    "stats": "stats",
+    "subscribe": "subscribe [interval_ms]",
+    "unsubscribe": "unsubscribe",
+}
+MIN_STATS_INTERVAL_MS = 50
+MAX_LINE_BYTES = 4096
+ZOOM_RANGE = (0.1, 10.0)
+SWITCH_VALUES = {"on": True, "1": True, "true": True, "yes": True,
+                 "off": False, "0": False, "false": False, "no": False}
+
+def parse_switch(value):
+    # JSON booleans, or the same on/off words the text commands take
+    if isinstance(value, bool):
+        return value
+    word = str(value).lower()
+    if word not in SWITCH_VALUES:
+        raise ValueError(f"expected on/off, got '{value}'")
+    return SWITCH_VALUES[word]
+
+def parse_command(line):
+    line = line.strip()
+    if line.startswith("{"):
+        message = json.loads(line)
+        if not isinstance(message, dict) or "cmd" not in message:
+            raise ValueError("JSON commands need a 'cmd' field")
+        return message
+    words = line.split()
+    if not words:
+        raise ValueError("empty command")
+    cmd, args = words[0].lower(), words[1:]
+    message = {"cmd": cmd}
+    if cmd == "toggle" and args:
+        message["overlay"] = args[0].lower()
+    elif cmd == "zoom" and args:
+        message["scale"] = float(args[0])
+    elif cmd == "auto" and args:
+        message["enabled"] = parse_switch(args[0])
+    elif cmd == "subscribe" and args:
+        message["interval_ms"] = int(args[0])
+    return message
+
+class Client:
+    def __init__(self, socket):
+        self.socket = socket
+        self.buffer = b""
+        self.interval_s = None
+        self.next_send = 0.0
+        self.dropped = 0
+
+# Local control endpoint served from the Qt event loop: a QLocalServer (named
+# pipe on Windows, Unix socket elsewhere) or a QTcpServer bound to localhost.
+# Reads and writes are non-blocking signal callbacks, so commands apply on the
+# GUI thread between frames. Stats are built once per publish tick and only
+# sent to subscribers that are due and whose unsent backlog is below
+# max_pending_bytes; a slow reader loses updates instead of stalling the loop.
+class ControlServer(QObject):
+    def __init__(self, runtime, config):
+        super().__init__()
+        self.runtime = runtime
+        self.config = config
+        self.server = None
+        self.clients = []
+        self.max_pending = int(config.get("max_pending_bytes", 65536))
+        self.default_interval_ms = max(MIN_STATS_INTERVAL_MS, int(config.get("stats_interval_ms", 250)))
+        self.last_frames = None
+        self.last_time = None
+        self.fps = 0.0
+        self.stats = {"connections": 0, "commands": 0, "errors": 0, "published": 0, "dropped": 0}
+
+        self.publish_timer = QTimer(self)
+        self.publish_timer.timeout.connect(self.publish)
+
+    def start(self):
+        transport = self.config.get("transport", "local")
+        if transport == "tcp":
+            from PyQt5.QtNetwork import QTcpServer, QHostAddress
+            self.server = QTcpServer(self)
+            ok = self.server.listen(QHostAddress.LocalHost, int(self.config.get("port", 47815)))
+            where = f"127.0.0.1:{self.config.get('port', 47815)}"
+        else:
+            from PyQt5.QtNetwork import QLocalServer
+            name = self.config.get("name", "viewfinder-control")
+            # A crashed previous run can leave a stale socket file behind
+            QLocalServer.removeServer(name)
+            self.server = QLocalServer(self)
+            ok = self.server.listen(name)
+            where = self.server.fullServerName() or name
+        if not ok:
+            event_log.error(f"Control server could not listen on {where}: {self.server.errorString()}")
+            self.server = None
+            return False
+        self.server.newConnection.connect(self._on_new_connection)
+        event_log.info(f"Control server listening on {where}")
+        return True
+
+    def close(self):
+        self.publish_timer.stop()
+        for client in list(self.clients):
+            client.socket.close()
+        self.clients = []
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            client = Client(socket)
+            self.clients.append(client)
+            self.stats["connections"] += 1
+            socket.readyRead.connect(lambda client=client: self._on_ready_read(client))
+            socket.disconnected.connect(lambda client=client: self._drop(client))
+
+    def _drop(self, client):
+        if client in self.clients:
+            self.clients.remove(client)
+            client.socket.deleteLater()
+        self._update_publish_timer()
+
+    def _on_ready_read(self, client):
+        client.buffer += bytes(client.socket.readAll())
+        while b"\n" in client.buffer:
+            line, client.buffer = client.buffer.split(b"\n", 1)
+            if line.strip():
+                self._send(client, self.handle(line.decode("utf-8", "replace"), client))
+        if len(client.buffer) > MAX_LINE_BYTES:
+            client.buffer = b""
+            self._send(client, {"ok": False, "error": "line too long"})
+
+    def handle(self, line, client=None):
+        self.stats["commands"] += 1
+        try:
+            message = parse_command(line)
+            reply = self.dispatch(message, client)
+        except Exception as e:
+            self.stats["errors"] += 1
+            return {"ok": False, "error": str(e)}
+        return dict({"ok": True, "cmd": message["cmd"]}, **reply)
+
+    def dispatch(self, message, client):
+        cmd = message["cmd"]
+        runtime = self.runtime
+        if cmd == "toggle":
+            overlay = message.get("overlay", "all")
+            if overlay not in ("magnifier", "crosshair", "all"):
+                raise ValueError(f"unknown overlay '{overlay}'")
+            return {"visible": runtime.control_toggle(overlay)}
+        if cmd == "zoom":
+            scale = float(message["scale"])
+            if not ZOOM_RANGE[0] <= scale <= ZOOM_RANGE[1]:
+                raise ValueError(f"scale must be within {ZOOM_RANGE[0]}-{ZOOM_RANGE[1]}")
+            if not runtime.set_magnifier_scale(scale):
+                raise ValueError("magnifier is not running")
+            return {"scale": scale}
+        if cmd == "auto":
+            if "enabled" in message:
+                enabled = parse_switch(message["enabled"])
+            else:
+                enabled = not runtime.visibility_state.auto_detect
+            runtime.set_auto_detect(enabled)
+            return {"auto_detect": enabled}
+        if cmd == "reload":
+            # After the reply: a changed "control" section replaces this
+            # server, which must not happen inside its own read slot
+            QTimer.singleShot(0, runtime.reload_config)
+            return {}
+        if cmd == "stats":
+            return {"stats": self.snapshot()}
+        if cmd == "subscribe":
+            if client is None:
+                raise ValueError("subscribe needs a connection")
+            interval_ms = max(MIN_STATS_INTERVAL_MS, int(message.get("interval_ms", self.default_interval_ms)))
+            client.interval_s = interval_ms / 1000.0
+            client.next_send = 0.0
+            self._update_publish_timer()
+            return {"interval_ms": interval_ms}
+        if cmd == "unsubscribe":
+            if client is not None:
+                client.interval_s = None
+                self._update_publish_timer()
+            return {}
+        if cmd == "help":
+            return {"commands": COMMAND_HELP}
+        raise ValueError(f"unknown command '{cmd}'")
+
+    def _update_publish_timer(self):
+        intervals = [c.interval_s for c in self.clients if c.interval_s is not None]
+        if not intervals:
+            self.publish_timer.stop()
+            return
+        interval_ms = int(min(intervals) * 1000)
+        if not self.publish_timer.isActive() or self.publish_timer.interval() != interval_ms:
+            self.publish_timer.start(interval_ms)
+
+    def snapshot(self):
+        stats = self.runtime.control_stats()
+        now = time.perf_counter()
+        frames = stats.get("frames")
+        if frames is not None and self.last_frames is not None and now > self.last_time:
+            self.fps = max(0, frames - self.last_frames) / (now - self.last_time)
+        self.last_frames, self.last_time = frames, now
+        stats["fps"] = round(self.fps, 1)
+        return stats
+
+    def publish(self):
+        now = time.perf_counter()
+        due = [c for c in self.clients if c.interval_s is not None and now >= c.next_send]
+        if not due:
+            return
+        line = (json.dumps({"stats": self.snapshot()}, separators=(",", ":")) + "\n").encode("utf-8")
+        for client in due:
+            client.next_send = now + client.interval_s
+            if client.socket.bytesToWrite() > self.max_pending:
+                client.dropped += 1
+                self.stats["dropped"] += 1
+                continue
+            client.socket.write(line)
+            self.stats["published"] += 1
+
+    def _send(self, client, reply):
+        client.socket.write((json.dumps(reply, separators=(",", ":")) + "\n").encode("utf-8"))
+
+    def get_stats(self):
+        return dict(self.stats, clients=len(self.clients),
+                    subscribers=sum(1 for c in self.clients if c.interval_s is not None))
@@ -0,0 +1,146 @@
+# ============================================================================
+#                            cost_estimator.py
+# ============================================================================
+
+import threading
+import time
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+MEASURE_FRAMES = 20
+MEASURE_MAX_S = 0.6
+WARMUP_FRAMES = 2
+# Above this share of the frame budget the settings are flagged as tight
+TIGHT_FRACTION = 0.7
+
+def synthetic_lens_frame(radius):
+    # A BGRA lens-sized scene with smooth gradients and hard edges, closer to
+    # a game frame than noise (which flatters nearest and punishes CLAHE)
+    import numpy as np
+    size = radius * 2
+    ys, xs = np.mgrid[0:size, 0:size].astype(np.float32) / max(1, size - 1)
+    frame = np.empty((size, size, 4), np.uint8)
+    frame[..., 0] = (90 + 80 * xs).astype(np.uint8)
+    frame[..., 1] = (110 + 70 * ys).astype(np.uint8)
+    frame[..., 2] = (60 + 60 * (1 - xs) * ys).astype(np.uint8)
+    frame[..., 3] = 255
+    step = max(4, size // 12)
+    frame[step:size - step:step, :, :3] = (30, 40, 40)
+    frame[:, step:size - step:step, :3] = (30, 40, 40)
+    c = size // 2
+    frame[c - step // 2:c + step // 2, c - step:c + step, :3] = (40, 215, 230)
+    return frame
+
+def measure(config):
+    # Times grab, pipeline and paint for one settings snapshot on the calling
+    # thread. The pipeline and paint are the real ones; the grab is a real
+    # mss grab of the lens size at the screen centre (None if unavailable).
+    import numpy as np
+    from PyQt5.QtGui import QImage, QPainter
+    from image_backend import wrap_qimage
+    from magnifier_overlay import MagnifierPipeline, target_rect
+
+    radius = int(config["radius"])
+    window_size = int(config["window_size"])
+    frame = synthetic_lens_frame(radius)
+    # Not live: the unsaved settings mustn't change the overlay's OpenCV threads
+    pipeline = MagnifierPipeline.from_config(config, live=False)
+    canvas = QImage(window_size, window_size, QImage.Format_RGB32)
+    pipeline_ms, paint_ms = [], []
+    output = None
+    try:
+        deadline = time.perf_counter() + MEASURE_MAX_S
+        for i in range(WARMUP_FRAMES + MEASURE_FRAMES):
+            start = time.perf_counter()
+            output = np.ascontiguousarray(pipeline.process(frame))
+            mid = time.perf_counter()
+            image = wrap_qimage(output)
+            target = target_rect(window_size, image.width(), image.height())
+            painter = QPainter(canvas)
+            painter.setRenderHint(QPainter.SmoothPixmapTransform, pipeline.interpolation != "nearest")
+            painter.drawImage(target, image)
+            painter.end()
+            end = time.perf_counter()
+            if i >= WARMUP_FRAMES:
+                pipeline_ms.append((mid - start) * 1000.0)
+                paint_ms.append((end - mid) * 1000.0)
+                if end > deadline:
+                    break
+    finally:
+        pipeline.close()
+
+    result = {
+        "grab_ms": measure_grab(radius),
+        "pipeline_ms": float(np.median(pipeline_ms)),
+        "paint_ms": float(np.median(paint_ms)),
+        "frames": len(pipeline_ms),
+        "backend": pipeline.backend.name,
+        "output": [output.shape[1], output.shape[0]],
+        # What the magnified window would show
+        "preview": canvas,
+    }
+    result["total_ms"] = (result["grab_ms"] or 0.0) + result["pipeline_ms"] + result["paint_ms"]
+    return result
+
+def measure_grab(radius, repeat=5):
+    try:
+        from mss import mss
+        with mss() as sct:
+            monitor = sct.monitors[1]
+            region = {
+                "left": monitor["left"] + monitor["width"] // 2 - radius,
+                "top": monitor["top"] + monitor["height"] // 2 - radius,
+                "width": radius * 2,
+                "height": radius * 2,
+            }
+            sct.grab(region)
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                sct.grab(region)
+                times.append((time.perf_counter() - start) * 1000.0)
+        return sorted(times)[len(times) // 2]
+    except Exception:
+        return None
+
+# Runs measure() off the GUI thread, one snapshot at a time. Requests made
+# while a measurement runs collapse into the latest one, and results for
+# superseded requests are dropped, so only the current settings are shown.
+class CostEstimator(QObject):
+    finished = pyqtSignal(object)
+    _done = pyqtSignal(int, object)
+
+    def __init__(self):
+        super().__init__()
+        self.generation = 0
+        self.running = False
+        self.pending = None
+        self._done.connect(self._on_done)
+
+    def request(self, config):
+        self.generation += 1
+        if self.running:
+            self.pending = (self.generation, config)
+            return
+        self._start(self.generation, config)
+
+    def _start(self, generation, config):
+        self.running = True
+        threading.Thread(target=self._run, args=(generation, config), name="cost-estimate", daemon=True).start()
+
+    def _run(self, generation, config):
+        try:
+            result = measure(config)
+        except Exception as e:
+            result = {"error": str(e)}
+        # Queued to the GUI thread
+        self._done.emit(generation, result)
+
+    def _on_done(self, generation, result):
+        self.running = False
+        if self.pending is not None:
+            pending, self.pending = self.pending, None
+            self._start(*pending)
+            return
+        if generation == self.generation:
+            self.finished.emit(result)
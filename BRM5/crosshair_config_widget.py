@@ -22,6 +22,9 @@ CROSSHAIR_DEFAULT = {
     "alpha": 255,
     "t_style": False,
     "draw_outline": True,
+    "auto_contrast": False,
+    "contrast_checks_per_s": 4,
+    "contrast_budget_ms": 1.0,
 }
 
 class CrosshairConfigWidget(QWidget):
@@ -119,6 +122,14 @@ class CrosshairConfigWidget(QWidget):
         self.t_style_check.setChecked(self.config["t_style"])
         self.t_style_check.stateChanged.connect(self.update_preview)
         layout.addWidget(self.t_style_check, row, 0, 1, 2)
+        row += 1
+
+        self.auto_contrast_check = QCheckBox("Auto Contrast")
+        self.auto_contrast_check.setChecked(self.config.get("auto_contrast", False))
+        self.auto_contrast_check.setToolTip("Check the background around the crosshair a few times per second and switch "
+                                            "to the color pair that stands out most (your colors first)")
+        self.auto_contrast_check.stateChanged.connect(self.update_preview)
+        layout.addWidget(self.auto_contrast_check, row, 0, 1, 2)
 
     def add_slider_row(self, layout, row, label_text, config_key, min_val, max_val):
         layout.addWidget(QLabel(label_text), row, 0)
@@ -150,6 +161,7 @@ class CrosshairConfigWidget(QWidget):
             "center_dot": self.center_dot_check.isChecked(),
             "t_style": self.t_style_check.isChecked(),
             "draw_outline": self.outline_check.isChecked(),
+            "auto_contrast": self.auto_contrast_check.isChecked(),
         })
 
         self.preview.set_config(self.config)
@@ -184,6 +196,7 @@ class CrosshairConfigWidget(QWidget):
         self.center_dot_check.setChecked(self.config["center_dot"])
         self.outline_check.setChecked(self.config["draw_outline"])
         self.t_style_check.setChecked(self.config["t_style"])
+        self.auto_contrast_check.setChecked(self.config["auto_contrast"])
         self.color_button.setStyleSheet(f"background-color: {self.config['color']};")
         self.outline_color_button.setStyleSheet(f"background-color: {self.config['outline_color']};")
 
@@ -5,9 +5,13 @@
 import tkinter as tk
 import ctypes
 import threading
+import time
 import json
 import os
 
+import event_log
+from trace_log import tracer
+
 MAIN_CONFIG_FILE = "viewfinder_config.json"
 
 DEFAULT_CROSSHAIR_CONFIG = {
@@ -23,16 +27,35 @@ DEFAULT_CROSSHAIR_CONFIG = {
     "alpha": 255,
     "t_style": False,
     "draw_outline": True,
+    "auto_contrast": False,
+    "contrast_checks_per_s": 4,
+    "contrast_budget_ms": 1.0,
 }
 
+# Slowest auto-contrast rate the budget back-off goes down to
+MIN_CONTRAST_INTERVAL_MS = 2000
+
 class CrosshairOverlay:
-    def __init__(self):
+    def __init__(self, config=None, on_ready=None):
         self.root = None
         self.canvas = None
         self.visible = True
+        self.native_ops = 0
         self.position_set = False
         self.lock = threading.Lock()
-        self.config = self.load_config()
+        self.ready = threading.Event()
+        self.on_ready = on_ready
+        self.sprite = None
+        self.sprite_item = None
+        self.palettes = []
+        self.photos = {}
+        self.picker = None
+        self.contrast_sct = None
+        self.contrast_job = None
+        self.contrast_interval_ms = 0
+        self.check_ms = 0.0
+        self.checks = 0
+        self.config = {**DEFAULT_CROSSHAIR_CONFIG, **config} if config is not None else self.load_config()
 
     def load_config(self):
         if os.path.exists(MAIN_CONFIG_FILE):
@@ -42,7 +65,7 @@ class CrosshairOverlay:
                     loaded = main_config.get("crosshair", {})
                     return {**DEFAULT_CROSSHAIR_CONFIG, **loaded}
             except Exception as e:
-                print(f"[WARN] Could not load crosshair config from {MAIN_CONFIG_FILE}: {e}")
+                event_log.warn(f"Could not load crosshair config from {MAIN_CONFIG_FILE}: {e}")
         return DEFAULT_CROSSHAIR_CONFIG.copy()
 
     def setup(self):
@@ -72,81 +95,146 @@ class CrosshairOverlay:
         ctypes.windll.user32.SetWindowLongW(hwnd, GWL_EXSTYLE, 
                                             styles | WS_EX_TRANSPARENT | WS_EX_LAYERED)
 
-        self.position_set = True
+        with self.lock:
+            self.position_set = True
+            if not self.visible:
+                self.root.withdraw()
+                self.native_ops += 1
+        self.ready.set()
+        if self.on_ready:
+            self.on_ready()
         self.root.mainloop()
 
-    def draw_center_dot(self, cx, cy, dot_size, color, outline_color, outline_thickness, draw_outline):
-        if draw_outline and outline_thickness > 0:
-            r = dot_size + outline_thickness
-            self.canvas.create_oval(cx - r, cy - r, cx + r, cy + r, fill=outline_color, outline=outline_color)
-        self.canvas.create_oval(cx - dot_size, cy - dot_size, cx + dot_size, cy + dot_size, fill=color, outline=color)
-
+    # The crosshair is one prerendered image (crosshair_sprite.py, the same
+    # rasterization the config preview shows) per palette; recolouring swaps
+    # the image on a single canvas item
     def draw_crosshair(self, cx, cy):
+        from crosshair_sprite import CrosshairSprite, ContrastPicker, palettes_for
         cfg = self.config
-        style = cfg["style"]
-        size = cfg["size"]
-        thickness = cfg["thickness"]
-        gap = cfg["gap"]
-        color = cfg["color"]
-        outline_color = cfg["outline_color"]
-        outline_thickness = cfg["outline_thickness"]
-        draw_outline = cfg["draw_outline"]
-        center_dot = cfg["center_dot"]
-        center_dot_size = cfg["center_dot_size"]
-        t_style = cfg["t_style"]
-
-        if style == "dot":
-            self.draw_center_dot(cx, cy, center_dot_size, color, outline_color, outline_thickness, draw_outline)
-
-        elif style == "circle":
-            if draw_outline and outline_thickness > 0:
-                self.canvas.create_oval(cx - size - outline_thickness, cy - size - outline_thickness, 
-                                       cx + size + outline_thickness, cy + size + outline_thickness, 
-                                       outline=outline_color, width=thickness + outline_thickness * 2)
-            self.canvas.create_oval(cx - size, cy - size, cx + size, cy + size, outline=color, width=thickness)
-
-            if center_dot:
-                self.draw_center_dot(cx, cy, center_dot_size, color, outline_color, outline_thickness, draw_outline)
-
-        else:
-            lines = []
-
-            if not t_style:
-                lines.append((cx, cy - gap - size, cx, cy - gap))
-
-            lines.append((cx, cy + gap, cx, cy + gap + size))
-            lines.append((cx - gap - size, cy, cx - gap, cy))
-            lines.append((cx + gap, cy, cx + gap + size, cy))
-
-            if draw_outline and outline_thickness > 0:
-                for x1, y1, x2, y2 in lines:
-                    self.canvas.create_line(x1, y1, x2, y2, fill=outline_color, 
-                                          width=thickness + outline_thickness * 2, capstyle=tk.ROUND)
-
-            for x1, y1, x2, y2 in lines:
-                self.canvas.create_line(x1, y1, x2, y2, fill=color, width=thickness, capstyle=tk.ROUND)
-
-            if center_dot:
-                self.draw_center_dot(cx, cy, center_dot_size, color, outline_color, outline_thickness, draw_outline)
+        self.root.attributes('-alpha', max(0, min(255, cfg["alpha"])) / 255.0)
+        self.sprite = CrosshairSprite(cfg)
+        self.palettes = palettes_for(cfg)
+        self.photos = {}
+        self.sprite_item = self.canvas.create_image(cx, cy, image=self._palette_photo(0))
+        if cfg["auto_contrast"]:
+            self.picker = ContrastPicker(self.palettes, self.sprite.radius)
+            self.contrast_interval_ms = int(1000 / max(0.5, float(cfg["contrast_checks_per_s"])))
+            self.contrast_job = self.root.after(self.contrast_interval_ms, self._check_contrast)
+
+    def _palette_photo(self, index):
+        photo = self.photos.get(index)
+        if photo is None:
+            color, outline_color = self.palettes[index]
+            photo = tk.PhotoImage(data=self.sprite.ppm(color, outline_color), format="PPM")
+            self.photos[index] = photo
+        return photo
+
+    def _check_contrast(self):
+        self.contrast_job = None
+        start = time.perf_counter()
+        try:
+            import numpy as np
+            if self.contrast_sct is None:
+                # mss handles are per thread; this one lives on the Tk thread
+                from mss import mss
+                self.contrast_sct = mss()
+            monitor = self.contrast_sct.monitors[1]
+            half = self.picker.ring_radius
+            region = {
+                "left": monitor["left"] + monitor["width"] // 2 - half,
+                "top": monitor["top"] + monitor["height"] // 2 - half,
+                "width": self.picker.grab_size,
+                "height": self.picker.grab_size,
+            }
+            before = self.picker.current
+            index = self.picker.update(np.asarray(self.contrast_sct.grab(region)))
+            if index != before:
+                self.canvas.itemconfigure(self.sprite_item, image=self._palette_photo(index))
+                if tracer.enabled:
+                    tracer.instant("crosshair palette", "crosshair")
+        except Exception as e:
+            event_log.warn(f"Crosshair contrast check failed: {e}", key="crosshair.contrast")
+        ms = (time.perf_counter() - start) * 1000.0
+        self.checks += 1
+        # The first check pays for imports and the mss handle; not counted
+        if self.checks == 2:
+            self.check_ms = ms
+        elif self.checks > 2:
+            self.check_ms += 0.1 * (ms - self.check_ms)
+        budget = float(self.config["contrast_budget_ms"])
+        if self.checks >= 2 and self.check_ms > budget and self.contrast_interval_ms < MIN_CONTRAST_INTERVAL_MS:
+            # Keep the average cost per second fixed by checking less often
+            self.contrast_interval_ms = min(MIN_CONTRAST_INTERVAL_MS, self.contrast_interval_ms * 2)
+            self.check_ms = budget
+            event_log.warn(f"Crosshair contrast checks over {budget} ms, now every {self.contrast_interval_ms} ms", key="crosshair.contrast_budget")
+        if self.visible:
+            self.contrast_job = self.root.after(self.contrast_interval_ms, self._check_contrast)
+
+    def _stop_contrast(self):
+        if self.contrast_job is not None:
+            self.root.after_cancel(self.contrast_job)
+            self.contrast_job = None
+
+    def get_stats(self):
+        stats = {"visible": self.visible, "native_ops": self.native_ops}
+        if self.picker is not None:
+            stats["contrast"] = dict(self.picker.get_stats(), checks=self.checks,
+                                     check_ms=round(self.check_ms, 3), interval_ms=self.contrast_interval_ms)
+        return stats
 
     def set_visibility(self, visible):
         with self.lock:
-            if self.position_set and self.canvas and self.root:
+            if not self.position_set:
+                # Applied by setup() once the window exists
+                self.visible = visible
+                return
+            if visible == self.visible:
+                return
+            if self.canvas and self.root:
                 try:
                     if visible:
-                        self.root.after(0, lambda: self.root.deiconify())
+                        self.root.after(0, self._show)
                     else:
-                        self.root.after(0, lambda: self.root.withdraw())
+                        self.root.after(0, self._hide)
                     self.visible = visible
+                    self.native_ops += 1
                 except Exception as e:
-                    print(f"[WARN] Crosshair visibility update failed: {e}")
+                    event_log.warn(f"Crosshair visibility update failed: {e}", key="crosshair.visibility")
+
+    def _show(self):
+        self.root.deiconify()
+        # Hidden crosshairs don't sample; pick up again on show
+        if self.picker is not None and self.contrast_job is None:
+            self.contrast_job = self.root.after(0, self._check_contrast)
+
+    def _hide(self):
+        self.root.withdraw()
+        self._stop_contrast()
+
+    def reload_config(self, config=None):
+        config = {**DEFAULT_CROSSHAIR_CONFIG, **config} if config is not None else self.load_config()
+        with self.lock:
+            self.config = config
+            if self.position_set and self.canvas and self.root:
+                self.root.after(0, self._redraw)
+
+    def _redraw(self):
+        if tracer.enabled:
+            tracer.begin("crosshair redraw", "config")
+        self._stop_contrast()
+        self.canvas.delete("all")
+        self.sprite = self.picker = self.sprite_item = None
+        self.photos = {}
+        self.draw_crosshair(self.root.winfo_screenwidth() // 2, self.root.winfo_screenheight() // 2)
+        if tracer.enabled:
+            tracer.end("crosshair redraw", "config")
 
     def quit(self):
         if self.root:
             self.root.quit()
 
-def start_crosshair_thread():
-    overlay = CrosshairOverlay()
-    thread = threading.Thread(target=overlay.setup, daemon=True)
+def start_crosshair_thread(config=None, on_ready=None):
+    overlay = CrosshairOverlay(config=config, on_ready=on_ready)
+    thread = threading.Thread(target=overlay.setup, name="crosshair", daemon=True)
     thread.start()
     return overlay
\ No newline at end of file
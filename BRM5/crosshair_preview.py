@@ -2,118 +2,113 @@
 #                           crosshair_preview.py
 # ============================================================================
 
+import time
+from collections import deque
+
 from PyQt5.QtWidgets import QWidget
-from PyQt5.QtGui import QPainter, QColor, QPen
-from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPainter, QColor, QPen, QPixmap, QImage, QGuiApplication
+from PyQt5.QtCore import Qt, QTimer
 
 CANVAS_SIZE = 400
 GRID_SPACING = 20
 CENTER_X = CANVAS_SIZE // 2
 CENTER_Y = CANVAS_SIZE // 2
+FALLBACK_REFRESH_HZ = 60
+
+# Config keys that change the sprite's shape; anything else only recolours it
+SHAPE_KEYS = ("style", "size", "thickness", "gap", "outline_thickness", "draw_outline",
+              "center_dot", "center_dot_size", "t_style")
 
+# Draws the crosshair from the same sprite rasterization the overlay shows
+# (crosshair_sprite.py) over a cached grid. Config changes are coalesced to
+# at most one repaint per display frame, so dragging a slider doesn't queue a
+# paint per tick.
 class CrosshairPreview(QWidget):
     def __init__(self):
         super().__init__()
         self.setMinimumSize(CANVAS_SIZE, CANVAS_SIZE)
         self.config = {}
+        self.grid = None
+        self.sprite = None
+        self.shape = None
+        self.pixmap = None
+        self.pixmap_key = None
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.timeout.connect(self.update)
+        self.requests = 0
+        self.paints = 0
+        self.paint_ms = 0.0
+        self.paint_times = deque(maxlen=240)
 
     def set_config(self, config):
         self.config = config
-        self.update()
+        self.requests += 1
+        if not self.frame_timer.isActive():
+            screen = QGuiApplication.primaryScreen()
+            hz = screen.refreshRate() if screen is not None else 0
+            self.frame_timer.start(int(1000 / (hz if hz > 0 else FALLBACK_REFRESH_HZ)))
+
+    def resizeEvent(self, event):
+        self.grid = None
+        super().resizeEvent(event)
+
+    def _grid_pixmap(self):
+        if self.grid is None:
+            self.grid = QPixmap(self.size())
+            self.grid.fill(Qt.transparent)
+            painter = QPainter(self.grid)
+            painter.setPen(QPen(QColor(60, 60, 60), 1))
+            for i in range(0, CANVAS_SIZE, GRID_SPACING):
+                painter.drawLine(i, 0, i, CANVAS_SIZE)
+                painter.drawLine(0, i, CANVAS_SIZE, i)
+            painter.end()
+        return self.grid
+
+    def _sprite_pixmap(self):
+        from crosshair_sprite import CrosshairSprite
+        cfg = self.config
+        shape = tuple(cfg[key] for key in SHAPE_KEYS)
+        if shape != self.shape:
+            self.sprite = CrosshairSprite(cfg)
+            self.shape = shape
+        key = (shape, cfg["color"].upper(), cfg["outline_color"].upper(), cfg["alpha"])
+        if key != self.pixmap_key:
+            rgba = self.sprite.rgba(key[1], key[2], max(0, min(255, cfg["alpha"])))
+            size = self.sprite.size
+            image = QImage(rgba, size, size, size * 4, QImage.Format_RGBA8888)
+            # fromImage copies, so the bytes can be dropped from the cache later
+            self.pixmap = QPixmap.fromImage(image)
+            self.pixmap_key = key
+        return self.pixmap
 
     def paintEvent(self, event):
+        start = time.perf_counter()
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-
-        painter.setPen(QPen(QColor(60, 60, 60), 1))
-        for i in range(0, CANVAS_SIZE, GRID_SPACING):
-            painter.drawLine(i, 0, i, CANVAS_SIZE)
-            painter.drawLine(0, i, CANVAS_SIZE, i)
-
-        if not self.config:
-            return
-
-        style = self.config["style"]
-        size = self.config["size"]
-        thickness = self.config["thickness"]
-        gap = self.config["gap"]
-        outline_thickness = self.config["outline_thickness"]
-        color = QColor(self.config["color"])
-        outline_color = QColor(self.config["outline_color"])
-        center_dot = self.config["center_dot"]
-        center_dot_size = self.config["center_dot_size"]
-        draw_outline = self.config["draw_outline"]
-        t_style = self.config["t_style"]
-        alpha = self.config["alpha"]
-
-        color.setAlpha(alpha)
-        outline_color.setAlpha(alpha)
-
-        if style == "dot":
-            self._draw_dot(painter, CENTER_X, CENTER_Y, center_dot_size, color, 
-                          outline_color, draw_outline, outline_thickness)
-
-        elif style == "circle":
-            self._draw_circle(painter, CENTER_X, CENTER_Y, size, thickness, color,
-                            outline_color, draw_outline, outline_thickness,
-                            center_dot, center_dot_size)
-
-        else:
-            self._draw_cross(painter, CENTER_X, CENTER_Y, size, thickness, gap, color,
-                           outline_color, draw_outline, outline_thickness,
-                           center_dot, center_dot_size, t_style)
-
-    def _draw_dot(self, painter, cx, cy, dot_size, color, outline_color, 
-                  draw_outline, outline_thickness):
-        if draw_outline and outline_thickness > 0:
-            painter.setPen(Qt.NoPen)
-            painter.setBrush(outline_color)
-            r = dot_size + outline_thickness
-            painter.drawEllipse(cx - r, cy - r, r * 2, r * 2)
-
-        painter.setPen(Qt.NoPen)
-        painter.setBrush(color)
-        painter.drawEllipse(cx - dot_size, cy - dot_size, 
-                          dot_size * 2, dot_size * 2)
-
-    def _draw_circle(self, painter, cx, cy, radius, thickness, color,
-                     outline_color, draw_outline, outline_thickness,
-                     center_dot, center_dot_size):
-        if draw_outline and outline_thickness > 0:
-            painter.setPen(QPen(outline_color, thickness + outline_thickness * 2))
-            painter.setBrush(Qt.NoBrush)
-            painter.drawEllipse(cx - radius, cy - radius, radius * 2, radius * 2)
-
-        painter.setPen(QPen(color, thickness))
-        painter.setBrush(Qt.NoBrush)
-        painter.drawEllipse(cx - radius, cy - radius, radius * 2, radius * 2)
-
-        if center_dot:
-            self._draw_dot(painter, cx, cy, center_dot_size, color,
-                          outline_color, draw_outline, outline_thickness)
-
-    def _draw_cross(self, painter, cx, cy, size, thickness, gap, color,
-                    outline_color, draw_outline, outline_thickness,
-                    center_dot, center_dot_size, t_style):
-        lines = []
-
-        if not t_style:
-            lines.append((cx, cy - gap - size, cx, cy - gap))
-
-        lines.append((cx, cy + gap, cx, cy + gap + size))
-        lines.append((cx - gap - size, cy, cx - gap, cy))
-        lines.append((cx + gap, cy, cx + gap + size, cy))
-
-        if draw_outline and outline_thickness > 0:
-            painter.setPen(QPen(outline_color, thickness + outline_thickness * 2, 
-                               Qt.SolidLine, Qt.RoundCap))
-            for x1, y1, x2, y2 in lines:
-                painter.drawLine(x1, y1, x2, y2)
-
-        painter.setPen(QPen(color, thickness, Qt.SolidLine, Qt.RoundCap))
-        for x1, y1, x2, y2 in lines:
-            painter.drawLine(x1, y1, x2, y2)
-
-        if center_dot:
-            self._draw_dot(painter, cx, cy, center_dot_size, color,
-                          outline_color, draw_outline, outline_thickness)
\ No newline at end of file
+        painter.drawPixmap(0, 0, self._grid_pixmap())
+
+        if self.config:
+            pixmap = self._sprite_pixmap()
+            r = self.sprite.radius
+            painter.drawPixmap(CENTER_X - r, CENTER_Y - r, pixmap)
+
+        # Rate and cost of the previous paints; this one isn't finished yet
+        now = time.monotonic()
+        while self.paint_times and now - self.paint_times[0] > 1.0:
+            self.paint_times.popleft()
+        painter.setPen(QColor(140, 140, 140))
+        painter.drawText(6, CANVAS_SIZE - 6, f"{len(self.paint_times)} paints/s  {self.paint_ms:.2f} ms")
+        painter.end()
+
+        self.paint_times.append(now)
+        self.paints += 1
+        ms = (time.perf_counter() - start) * 1000.0
+        self.paint_ms = ms if self.paints == 1 else self.paint_ms + 0.1 * (ms - self.paint_ms)
+
+    def get_stats(self):
+        return {
+            "requests": self.requests,
+            "paints": self.paints,
+            "paints_per_s": len(self.paint_times),
+            "paint_ms": round(self.paint_ms, 3),
+        }
@@ -0,0 +1,203 @@
+# ============================================================================
+#                           crosshair_sprite.py
+# ============================================================================
+
+import math
+
+# Sprite pixel labels
+EMPTY = 0
+FILL = 1
+OUTLINE = 2
+
+def parse_color(value):
+    value = value.lstrip("#")
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+def color_hex(rgb):
+    return "#{:02X}{:02X}{:02X}".format(*rgb)
+
+def sprite_radius(cfg):
+    outline = cfg["outline_thickness"] if cfg["draw_outline"] else 0
+    dot = cfg["center_dot_size"] + outline
+    if cfg["style"] == "dot":
+        reach = dot
+    elif cfg["style"] == "circle":
+        reach = cfg["size"] + cfg["thickness"] / 2.0 + outline
+    else:
+        reach = cfg["gap"] + cfg["size"] + cfg["thickness"] / 2.0 + outline
+    return int(math.ceil(max(reach, dot))) + 1
+
+def _segment_distance(x, y, x1, y1, x2, y2):
+    dx, dy = x2 - x1, y2 - y1
+    length = dx * dx + dy * dy
+    t = min(1.0, max(0.0, ((x - x1) * dx + (y - y1) * dy) / length)) if length else 0.0
+    return math.hypot(x - (x1 + t * dx), y - (y1 + t * dy))
+
+# Rasterizes a crosshair config once into a label map (EMPTY/FILL/OUTLINE,
+# square, crosshair centre on the middle pixel) layered like the old canvas
+# primitives: outline, then fill, then the centre dot's outline and fill.
+# The overlay and the config preview both draw from it. Colouring is a table
+# lookup per palette, cached, so switching colours never re-rasterizes.
+# Edges are hard so colour-keyed transparency has no fringes. Plain Python,
+# so the crosshair thread doesn't load numpy unless auto contrast is on.
+class CrosshairSprite:
+    def __init__(self, cfg):
+        self.radius = sprite_radius(cfg)
+        self.size = self.radius * 2 + 1
+        self.labels = self._rasterize(cfg)
+        self.cache = {}
+
+    def _stamp(self, labels, box, distance, limit, value):
+        # Labels pixels within limit of a shape whose extent is box
+        # (x0, y0, x1, y1, centre coordinates); only the box plus limit is scanned
+        r, n = self.radius, self.size
+        x0, y0, x1, y1 = box
+        xs = range(max(-r, math.floor(x0 - limit)), min(r, math.ceil(x1 + limit)) + 1)
+        for y in range(max(-r, math.floor(y0 - limit)), min(r, math.ceil(y1 + limit)) + 1):
+            row = (y + r) * n + r
+            for x in xs:
+                if distance(x, y) <= limit:
+                    labels[row + x] = value
+
+    def _rasterize(self, cfg):
+        labels = bytearray(self.size * self.size)
+        outline = cfg["outline_thickness"] if cfg["draw_outline"] else 0
+        thickness = cfg["thickness"]
+        size, gap = cfg["size"], cfg["gap"]
+        dot = cfg["center_dot_size"]
+
+        shapes = []
+        if cfg["style"] == "circle":
+            shapes.append(((-size, -size, size, size), lambda x, y: abs(math.hypot(x, y) - size)))
+        elif cfg["style"] != "dot":
+            lines = [(0, gap, 0, gap + size), (-gap - size, 0, -gap, 0), (gap, 0, gap + size, 0)]
+            if not cfg["t_style"]:
+                lines.append((0, -gap - size, 0, -gap))
+            for x1, y1, x2, y2 in lines:
+                shapes.append(((min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)),
+                               lambda x, y, line=(x1, y1, x2, y2): _segment_distance(x, y, *line)))
+        # Outline of every stroke first so fills are never covered
+        if outline > 0:
+            for box, distance in shapes:
+                self._stamp(labels, box, distance, thickness / 2.0 + outline, OUTLINE)
+        for box, distance in shapes:
+            self._stamp(labels, box, distance, thickness / 2.0, FILL)
+
+        if cfg["style"] == "dot" or cfg["center_dot"]:
+            if outline > 0:
+                self._stamp(labels, (0, 0, 0, 0), math.hypot, dot + outline, OUTLINE)
+            self._stamp(labels, (0, 0, 0, 0), math.hypot, dot, FILL)
+        return labels
+
+    def bounds(self):
+        # Offsets of the drawn pixels from the centre: (min, max) per axis
+        n, r = self.size, self.radius
+        drawn = [(i % n - r, i // n - r) for i, label in enumerate(self.labels) if label]
+        if not drawn:
+            return (0, 0, 0, 0)
+        xs, ys = [x for x, _ in drawn], [y for _, y in drawn]
+        return (min(xs), max(xs), min(ys), max(ys))
+
+    def _colored(self, lut):
+        return b"".join([lut[label] for label in self.labels])
+
+    def rgba(self, color, outline_color, alpha=255):
+        # size * size * 4 bytes of RGBA; empty pixels fully transparent
+        key = (color, outline_color, alpha)
+        image = self.cache.get(key)
+        if image is None:
+            image = self._colored((bytes(4), bytes(parse_color(color) + (alpha,)),
+                                   bytes(parse_color(outline_color) + (alpha,))))
+            self.cache[key] = image
+        return image
+
+    def ppm(self, color, outline_color, key_color=(255, 255, 255)):
+        # Binary PPM for tk.PhotoImage; empty pixels take the window's
+        # transparent key colour
+        key = ("ppm", color, outline_color, key_color)
+        data = self.cache.get(key)
+        if data is None:
+            header = f"P6 {self.size} {self.size} 255\n".encode("ascii")
+            data = header + self._colored((bytes(key_color), bytes(parse_color(color)), bytes(parse_color(outline_color))))
+            self.cache[key] = data
+        return data
+
+# Fill/outline pairs tried after the configured one. Pure white is the
+# overlay's transparent key colour, so light tones stop just short of it.
+CONTRAST_PALETTES = (
+    ("#00FF00", "#000000"),
+    ("#FF00FF", "#000000"),
+    ("#00FFFF", "#000000"),
+    ("#FFFF00", "#000000"),
+    ("#FF3030", "#000000"),
+    ("#202020", "#F0F0F0"),
+)
+RING_SAMPLES = 32
+RING_MARGIN = 4
+# A new palette must beat the current one by this factor on this many checks
+# in a row before the crosshair switches
+HYSTERESIS = 1.3
+CONFIRM_CHECKS = 2
+
+def palettes_for(cfg):
+    configured = (cfg["color"].upper(), cfg["outline_color"].upper())
+    return [configured] + [p for p in CONTRAST_PALETTES if p != configured]
+
+def ring_offsets(radius, samples=RING_SAMPLES):
+    # Integer (dy, dx) offsets of evenly spaced points on a circle
+    import numpy as np
+    angles = np.linspace(0.0, 2.0 * np.pi, samples, endpoint=False)
+    return (np.round(np.sin(angles) * radius).astype(np.intp),
+            np.round(np.cos(angles) * radius).astype(np.intp))
+
+def contrast(rgb, background):
+    # "Redmean" weighted RGB distance: cheap and closer to perceived
+    # difference than plain Euclidean
+    import numpy as np
+    r_mean = (rgb[..., 0] + background[0]) / 2.0
+    d = rgb - background
+    return np.sqrt((2.0 + r_mean / 256.0) * d[..., 0] ** 2 + 4.0 * d[..., 1] ** 2 + (2.0 + (255.0 - r_mean) / 256.0) * d[..., 2] ** 2)
+
+# Chooses the palette whose fill stands out most from the background ring
+# around the crosshair. Works on a fixed number of ring pixels from a small
+# BGRA grab (2 * ring radius + 1 square), so a check costs the same whatever
+# the crosshair looks like.
+class ContrastPicker:
+    def __init__(self, palettes, sprite_radius):
+        import numpy as np
+        self.palettes = palettes
+        self.fills = np.array([parse_color(fill) for fill, _ in palettes], np.float32)
+        self.ring_radius = sprite_radius + RING_MARGIN
+        self.grab_size = self.ring_radius * 2 + 1
+        dy, dx = ring_offsets(self.ring_radius)
+        self.ring = (dy + self.ring_radius, dx + self.ring_radius)
+        self.current = 0
+        self.candidate = None
+        self.streak = 0
+        self.switches = 0
+        self.background = None
+
+    def update(self, grab):
+        # grab: (grab_size, grab_size, 4) BGRA; returns the palette index
+        import numpy as np
+        pixels = grab[self.ring][:, 2::-1].astype(np.float32)
+        # Median per channel: a few HUD or tracer pixels in the ring don't move it
+        self.background = np.median(pixels, axis=0)
+        scores = contrast(self.fills, self.background)
+        best = int(np.argmax(scores))
+        if best != self.current and scores[best] > scores[self.current] * HYSTERESIS:
+            self.streak = self.streak + 1 if best == self.candidate else 1
+            self.candidate = best
+            if self.streak >= CONFIRM_CHECKS:
+                self.current = best
+                self.switches += 1
+                self.candidate, self.streak = None, 0
+        else:
+            self.candidate, self.streak = None, 0
+        return self.current
+
+    def get_stats(self):
+        stats = {"palette": self.palettes[self.current][0], "switches": self.switches}
+        if self.background is not None:
+            stats["background"] = color_hex(tuple(int(c) for c in self.background))
+        return stats
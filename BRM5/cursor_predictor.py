@@ -0,0 +1,105 @@
+# ============================================================================
+#                          cursor_predictor.py
+# ============================================================================
+
+import math
+from collections import deque
+
+PREDICTORS = ("off", "velocity", "alpha_beta")
+
+# Samples older than this are treated as the cursor having stopped
+STALE_S = 0.1
+
+class ConstantVelocityPredictor:
+    name = "velocity"
+
+    def __init__(self, window_s=0.04, max_samples=16):
+        self.window_s = window_s
+        self.samples = deque(maxlen=max_samples)
+
+    def reset(self):
+        self.samples.clear()
+
+    def add(self, t, x, y):
+        if self.samples and t <= self.samples[-1][0]:
+            return
+        self.samples.append((t, x, y))
+        while len(self.samples) > 2 and t - self.samples[0][0] > self.window_s:
+            self.samples.popleft()
+
+    def velocity(self, now=None):
+        if len(self.samples) < 2:
+            return 0.0, 0.0
+        t0, x0, y0 = self.samples[0]
+        t1, x1, y1 = self.samples[-1]
+        if now is not None and now - t1 > STALE_S:
+            return 0.0, 0.0
+        dt = t1 - t0
+        if dt <= 0:
+            return 0.0, 0.0
+        return (x1 - x0) / dt, (y1 - y0) / dt
+
+    def predict(self, lead_s, now=None):
+        if not self.samples:
+            return None
+        t, x, y = self.samples[-1]
+        vx, vy = self.velocity(now)
+        if now is not None:
+            lead_s += max(0.0, now - t)
+        return x + vx * lead_s, y + vy * lead_s
+
+# Alpha-beta (g-h) filter: smooths position and velocity with fixed gains, so
+# single-sample jitter moves the estimate less than a raw two-point velocity
+class AlphaBetaPredictor:
+    name = "alpha_beta"
+
+    def __init__(self, alpha=0.85, beta=0.5):
+        self.alpha = alpha
+        self.beta = beta
+        self.reset()
+
+    def reset(self):
+        self.t = None
+        self.x = self.y = 0.0
+        self.vx = self.vy = 0.0
+
+    def add(self, t, x, y):
+        if self.t is None or t - self.t > STALE_S:
+            self.t, self.x, self.y = t, float(x), float(y)
+            self.vx = self.vy = 0.0
+            return
+        dt = t - self.t
+        if dt <= 0:
+            return
+        px, py = self.x + self.vx * dt, self.y + self.vy * dt
+        rx, ry = x - px, y - py
+        self.x, self.y = px + self.alpha * rx, py + self.alpha * ry
+        self.vx += self.beta * rx / dt
+        self.vy += self.beta * ry / dt
+        self.t = t
+
+    def velocity(self, now=None):
+        if self.t is None or (now is not None and now - self.t > STALE_S):
+            return 0.0, 0.0
+        return self.vx, self.vy
+
+    def predict(self, lead_s, now=None):
+        if self.t is None:
+            return None
+        vx, vy = self.velocity(now)
+        if now is not None:
+            lead_s += max(0.0, now - self.t)
+        return self.x + vx * lead_s, self.y + vy * lead_s
+
+def make_predictor(name):
+    if name == "velocity":
+        return ConstantVelocityPredictor()
+    if name == "alpha_beta":
+        return AlphaBetaPredictor()
+    return None
+
+def clamp_offset(dx, dy, limit):
+    dist = math.hypot(dx, dy)
+    if dist <= limit or dist == 0:
+        return dx, dy
+    return dx * limit / dist, dy * limit / dist
@@ -0,0 +1,37 @@
+# ============================================================================
+#                              detection.py
+# ============================================================================
+
+import event_log
+
+_detection_sct = None
+
+def grab_detection_patch(mag_detection_pos):
+    global _detection_sct
+    import numpy as np
+    x, y = mag_detection_pos
+    region = {"left": x - 2, "top": y - 2, "width": 5, "height": 5}
+    if _detection_sct is None:
+        from mss import mss
+        _detection_sct = mss()
+    return np.array(_detection_sct.grab(region))
+
+def yellow_mask(frame):
+    b = frame[..., 0]
+    g = frame[..., 1]
+    r = frame[..., 2]
+    return (r > 150) & (g > 150) & (b < 140)
+
+def is_yellow(patch):
+    import numpy as np
+    return np.count_nonzero(yellow_mask(patch)) > 1
+
+def detect_yellow_in_region(mag_detection_pos, recorder=None):
+    try:
+        patch = grab_detection_patch(mag_detection_pos)
+        if recorder is not None:
+            recorder.set_detection_patch(patch)
+        return is_yellow(patch)
+    except Exception as e:
+        event_log.warn(f"Detection failed: {e}", key="detect.grab")
+        return False
@@ -0,0 +1,191 @@
+# ============================================================================
+#                             event_log.py
+# ============================================================================
+
+import sys
+import time
+import atexit
+import threading
+import traceback
+import logging
+from logging.handlers import RotatingFileHandler
+from collections import deque
+
+DEFAULT_LOGGING_CONFIG = {
+    "rate_limit_s": 5.0,
+    "ring_size": 500,
+    "console": True,
+    "file_sink": False,
+    "file_path": "viewfinder.log",
+    "max_bytes": 1048576,
+    "backup_count": 3,
+    "dump_on_exit": False,
+    "dump_path": "viewfinder_events.log",
+}
+
+LEVEL_NAMES = {
+    logging.DEBUG: "DEBUG",
+    logging.INFO: "INFO",
+    logging.WARNING: "WARN",
+    logging.ERROR: "ERROR",
+}
+
+# Per-message-key rate limiting: the first event for a key is emitted, repeats
+# inside the window only bump a counter, and the next emitted event for that
+# key reports how many were swallowed. Nothing here runs unless something is
+# actually being logged, so a healthy frame loop pays nothing.
+class EventLog:
+    def __init__(self):
+        self.config = DEFAULT_LOGGING_CONFIG.copy()
+        self.rate_limit_s = self.config["rate_limit_s"]
+        self.console = self.config["console"]
+        self.ring = deque(maxlen=self.config["ring_size"])
+        self.last_emit = {}
+        self.suppressed = {}
+        self.suppressed_total = 0
+        self.emitted_total = 0
+        self.lock = threading.Lock()
+        self.file_logger = None
+        self._exit_hook_registered = False
+
+    def configure(self, config=None):
+        self.config = {**DEFAULT_LOGGING_CONFIG, **(config or {})}
+        self.rate_limit_s = float(self.config["rate_limit_s"])
+        self.console = bool(self.config["console"])
+
+        with self.lock:
+            self.ring = deque(self.ring, maxlen=max(1, int(self.config["ring_size"])))
+
+        self._close_file_sink()
+        if self.config["file_sink"]:
+            self._open_file_sink()
+
+        if self.config["dump_on_exit"] and not self._exit_hook_registered:
+            atexit.register(self._dump_at_exit)
+            self._exit_hook_registered = True
+
+    def _open_file_sink(self):
+        try:
+            handler = RotatingFileHandler(
+                self.config["file_path"],
+                maxBytes=int(self.config["max_bytes"]),
+                backupCount=int(self.config["backup_count"]),
+                encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            file_logger = logging.getLogger("viewfinder")
+            file_logger.setLevel(logging.DEBUG)
+            file_logger.propagate = False
+            file_logger.addHandler(handler)
+            self.file_logger = file_logger
+        except Exception as e:
+            print(f"[WARN] Could not open log file {self.config['file_path']}: {e}")
+            self.file_logger = None
+
+    def _close_file_sink(self):
+        if self.file_logger:
+            for handler in list(self.file_logger.handlers):
+                self.file_logger.removeHandler(handler)
+                handler.close()
+            self.file_logger = None
+
+    def log(self, level, message, key=None):
+        now = time.monotonic()
+        with self.lock:
+            suppressed = 0
+            if key is not None:
+                last = self.last_emit.get(key)
+                if last is not None and now - last < self.rate_limit_s:
+                    self.suppressed[key] = self.suppressed.get(key, 0) + 1
+                    self.suppressed_total += 1
+                    return False
+                self.last_emit[key] = now
+                suppressed = self.suppressed.pop(key, 0)
+            self.emitted_total += 1
+            self.ring.append((time.time(), level, key, message, suppressed))
+
+        line = f"[{LEVEL_NAMES.get(level, 'INFO')}] {message}"
+        if suppressed:
+            line += f" (suppressed {suppressed} repeats)"
+        if self.console:
+            try:
+                print(line)
+            except Exception:
+                pass
+        if self.file_logger:
+            self.file_logger.log(level, line)
+        return True
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "emitted": self.emitted_total,
+                "suppressed": self.suppressed_total,
+                "pending_suppressed": dict(self.suppressed),
+                "buffered": len(self.ring),
+            }
+
+    def format_events(self):
+        with self.lock:
+            events = list(self.ring)
+            pending = dict(self.suppressed)
+        lines = []
+        for stamp, level, key, message, suppressed in events:
+            when = time.strftime("%H:%M:%S", time.localtime(stamp)) + f".{int(stamp * 1000) % 1000:03d}"
+            line = f"{when} [{LEVEL_NAMES.get(level, 'INFO')}] {message}"
+            if key is not None:
+                line += f" <{key}>"
+            if suppressed:
+                line += f" (suppressed {suppressed} repeats)"
+            lines.append(line)
+        for key, count in sorted(pending.items()):
+            lines.append(f"pending suppressed: <{key}> x{count}")
+        return lines
+
+    def dump(self, path=None):
+        lines = self.format_events()
+        path = path or self.config["dump_path"]
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            self.log(logging.INFO, f"Dumped {len(lines)} events to {path}")
+            return True
+        except Exception as e:
+            self.log(logging.WARNING, f"Could not dump events to {path}: {e}")
+            return False
+
+    def _dump_at_exit(self):
+        self.console = False
+        self.dump()
+        self._close_file_sink()
+
+default_log = EventLog()
+
+def configure(config=None):
+    default_log.configure(config)
+
+def debug(message, key=None):
+    return default_log.log(logging.DEBUG, message, key)
+
+def info(message, key=None):
+    return default_log.log(logging.INFO, message, key)
+
+def warn(message, key=None):
+    return default_log.log(logging.WARNING, message, key)
+
+def error(message, key=None):
+    return default_log.log(logging.ERROR, message, key)
+
+def exception(message, key=None):
+    # Tracebacks only go out with the first event of a burst
+    if default_log.log(logging.ERROR, message, key):
+        exc_type, exc, tb = sys.exc_info()
+        if exc is not None:
+            text = "".join(traceback.format_exception(exc_type, exc, tb)).rstrip()
+            if default_log.console:
+                print(text)
+            if default_log.file_logger:
+                default_log.file_logger.error(text)
+
+def dump(path=None):
+    return default_log.dump(path)
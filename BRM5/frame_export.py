@@ -0,0 +1,209 @@
+# ============================================================================
+#                             frame_export.py
+# ============================================================================
+
+import os
+import sys
+import time
+import atexit
+import numpy as np
+from multiprocessing import shared_memory
+
+import event_log
+
+DEFAULT_EXPORT_CONFIG = {
+    "shm_export": False,
+    "shm_name": "viewfinder_frames",
+    "shm_slots": 3,
+    "shm_max_frame_mb": 8
+}
+
+# Segment layout (all little-endian):
+#   ring header   64 bytes   RING_DTYPE
+#   slot headers  64 bytes each, one per slot   SLOT_DTYPE
+#   slot data     slot_bytes each, 64-byte aligned, rows `stride` bytes apart
+# Frame n (counting from 1) goes to slot n % slots. The writer stores
+# seq_begin = n, then the pixels and shape, then seq_end = n, then the ring's
+# latest = n. A reader takes `latest`, checks the slot's seq_end matches,
+# uses the pixels in place, and afterwards checks seq_begin still matches:
+# if it doesn't, the writer lapped the reader mid-read (an overrun).
+# capture_time is the writer's time.perf_counter() at grab, which is a
+# system-wide clock on Windows and Linux, so readers can measure latency.
+MAGIC = b"VFFRAME1"
+VERSION = 1
+RING_DTYPE = np.dtype([
+    ("magic", "S8"), ("version", "<u4"), ("slots", "<u4"),
+    ("slot_bytes", "<u8"), ("data_offset", "<u8"), ("latest", "<u8"),
+    ("writer_pid", "<u4"),
+])
+SLOT_DTYPE = np.dtype([
+    ("seq_begin", "<u8"), ("capture_time", "<f8"), ("wall_time", "<f8"),
+    ("height", "<u4"), ("width", "<u4"), ("channels", "<u4"), ("stride", "<u4"),
+    ("nbytes", "<u8"), ("seq_end", "<u8"),
+])
+HEADER_SIZE = 64
+ALIGN = 64
+
+def _align(n):
+    return -(-n // ALIGN) * ALIGN
+
+def segment_size(slots, slot_bytes):
+    return HEADER_SIZE + slots * HEADER_SIZE + slots * slot_bytes
+
+def _untrack(shm):
+    # Before 3.13, attaching also registers the segment with the resource
+    # tracker, which unlinks it when the *reader* exits
+    if sys.platform != "win32" and sys.version_info < (3, 13):
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+
+# Publishes each magnified frame into a named shared-memory ring. One copy
+# per frame into the slot; readers map the slot without copying.
+class SharedFrameExporter:
+    def __init__(self, name, slots=3, max_frame_bytes=8 * 1024 * 1024):
+        self.name = name
+        self.slots = max(2, int(slots))
+        self.slot_bytes = _align(int(max_frame_bytes))
+        self.shm = None
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=segment_size(self.slots, self.slot_bytes))
+        except FileExistsError:
+            # Left over from a crash (POSIX); take it over
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=segment_size(self.slots, self.slot_bytes))
+        buf = self.shm.buf
+        self.ring = np.ndarray((), RING_DTYPE, buffer=buf, offset=0)
+        self.slot_headers = np.ndarray((self.slots,), SLOT_DTYPE, buffer=buf, offset=HEADER_SIZE,
+                                       strides=(HEADER_SIZE,))
+        self.data_offset = HEADER_SIZE + self.slots * HEADER_SIZE
+        self.data = np.ndarray((self.slots, self.slot_bytes), np.uint8, buffer=buf, offset=self.data_offset)
+        self.slot_headers[...] = 0
+        self.ring["slots"] = self.slots
+        self.ring["slot_bytes"] = self.slot_bytes
+        self.ring["data_offset"] = self.data_offset
+        self.ring["latest"] = 0
+        self.ring["writer_pid"] = os.getpid()
+        self.ring["version"] = VERSION
+        # Magic last: readers treat the segment as valid from here on
+        self.ring["magic"] = MAGIC
+        self.seq = 0
+        self.stats = {"published": 0, "oversize": 0}
+        self.publish_ms = 0.0
+        atexit.register(self.close)
+        event_log.info(f"Exporting frames to shared memory '{name}' ({self.slots} x {self.slot_bytes // 1024} KiB)")
+
+    @classmethod
+    def from_config(cls, config):
+        if not config.get("shm_export", False):
+            return None
+        try:
+            return cls(config.get("shm_name", "viewfinder_frames"), config.get("shm_slots", 3),
+                       float(config.get("shm_max_frame_mb", 8)) * 1024 * 1024)
+        except Exception as e:
+            event_log.warn(f"Shared-memory export unavailable: {e}")
+            return None
+
+    def matches(self, config):
+        return (config.get("shm_name") == self.name and int(config.get("shm_slots", 3)) == self.slots
+                and _align(int(float(config.get("shm_max_frame_mb", 8)) * 1024 * 1024)) == self.slot_bytes)
+
+    def publish(self, frame, capture_time):
+        if self.shm is None:
+            return False
+        start = time.perf_counter()
+        h, w = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        nbytes = h * w * channels
+        if nbytes > self.slot_bytes:
+            self.stats["oversize"] += 1
+            event_log.warn(f"Frame {w}x{h} too large for the export slots ({self.slot_bytes // 1024} KiB)", key="export.oversize")
+            return False
+        self.seq += 1
+        index = self.seq % self.slots
+        header = self.slot_headers[index]
+        header["seq_begin"] = self.seq
+        dst = self.data[index, :nbytes].reshape(frame.shape)
+        np.copyto(dst, frame)
+        header["capture_time"] = capture_time
+        header["wall_time"] = time.time()
+        header["height"], header["width"], header["channels"] = h, w, channels
+        header["stride"] = w * channels
+        header["nbytes"] = nbytes
+        header["seq_end"] = self.seq
+        self.ring["latest"] = self.seq
+        self.stats["published"] += 1
+        ms = (time.perf_counter() - start) * 1000.0
+        self.publish_ms = ms if self.stats["published"] == 1 else self.publish_ms + 0.1 * (ms - self.publish_ms)
+        return True
+
+    def close(self):
+        if self.shm is None:
+            return
+        # Otherwise atexit keeps every closed exporter (and its mapping) alive
+        atexit.unregister(self.close)
+        # Drop our views before closing the mapping
+        self.ring = self.slot_headers = self.data = None
+        shm, self.shm = self.shm, None
+        try:
+            shm.close()
+            shm.unlink()
+        except Exception:
+            pass
+
+    def get_stats(self):
+        return dict(self.stats, name=self.name, seq=self.seq, publish_ms=round(self.publish_ms, 3))
+
+# Reader side, for tools written in Python. Frames returned by latest() are
+# views into shared memory: check frame_valid(seq) after using one.
+class SharedFrameReader:
+    def __init__(self, name):
+        self.shm = shared_memory.SharedMemory(name=name)
+        _untrack(self.shm)
+        buf = self.shm.buf
+        self.ring = np.ndarray((), RING_DTYPE, buffer=buf, offset=0)
+        if bytes(self.ring["magic"]) != MAGIC:
+            self.close()
+            raise ValueError(f"'{name}' is not a ViewFinder frame ring")
+        self.slots = int(self.ring["slots"])
+        self.slot_bytes = int(self.ring["slot_bytes"])
+        self.data_offset = int(self.ring["data_offset"])
+        self.slot_headers = np.ndarray((self.slots,), SLOT_DTYPE, buffer=buf, offset=HEADER_SIZE,
+                                       strides=(HEADER_SIZE,))
+        self.last_seq = 0
+        self.stats = {"frames": 0, "missed": 0, "torn": 0}
+
+    def latest(self):
+        # Returns (seq, capture_time, frame view) for the newest complete
+        # frame not returned before, or None
+        seq = int(self.ring["latest"])
+        if seq == 0 or seq == self.last_seq:
+            return None
+        header = self.slot_headers[seq % self.slots]
+        if int(header["seq_end"]) != seq:
+            self.stats["torn"] += 1
+            return None
+        h, w, c, stride = (int(header[k]) for k in ("height", "width", "channels", "stride"))
+        offset = self.data_offset + (seq % self.slots) * self.slot_bytes
+        frame = np.ndarray((h, w, c), np.uint8, buffer=self.shm.buf, offset=offset, strides=(stride, c, 1))
+        if self.last_seq:
+            self.stats["missed"] += max(0, seq - self.last_seq - 1)
+        self.last_seq = seq
+        self.stats["frames"] += 1
+        return seq, float(header["capture_time"]), frame
+
+    def frame_valid(self, seq):
+        valid = int(self.slot_headers[seq % self.slots]["seq_begin"]) == seq
+        if not valid:
+            self.stats["torn"] += 1
+        return valid
+
+    def close(self):
+        self.ring = self.slot_headers = None
+        if self.shm is not None:
+            self.shm.close()
+            self.shm = None
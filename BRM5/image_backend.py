@@ -0,0 +1,206 @@
+# ============================================================================
+#                            image_backend.py
+# ============================================================================
+
+import numpy as np
+from PyQt5.QtGui import QImage
+from PyQt5.QtCore import Qt
+
+import event_log
+
+BACKEND_NAMES = ("auto", "opencv", "numpy")
+# Cheapest first; the quality governor walks this order
+INTERPOLATIONS = ("nearest", "linear", "area", "cubic", "lanczos")
+
+# Fixed-point precision for the NumPy bilinear path: weights are 0..256 so the
+# horizontal pass fits uint16 and the vertical pass fits uint32
+_WEIGHT_BITS = 8
+_WEIGHT_ONE = 1 << _WEIGHT_BITS
+
+def output_size(width, height, scale):
+    return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+# Qt formats that wrap the capture buffers without conversion: mss hands out
+# BGRA, which is Format_RGB32 in memory on little-endian machines
+QIMAGE_FORMATS = {
+    3: QImage.Format_BGR888,
+    4: QImage.Format_RGB32,
+}
+
+def wrap_qimage(frame):
+    h, w, ch = frame.shape
+    return QImage(frame.data, w, h, frame.strides[0], QIMAGE_FORMATS[ch])
+
+# NumPy + Qt kernels. Works on the 4-channel BGRA capture directly so the
+# frame never needs a channel-dropping copy.
+class NumpyBackend:
+    name = "numpy"
+    channels = 4
+    # Qt only has bilinear smoothing, so cubic and lanczos are served as linear
+    interpolations = ("nearest", "linear", "area")
+
+    def __init__(self):
+        self._nearest_cache = {}
+        self._linear_cache = {}
+
+    def resize(self, frame, scale, interpolation="linear"):
+        h, w = frame.shape[:2]
+        out_w, out_h = output_size(w, h, scale)
+        if (out_w, out_h) == (w, h):
+            return frame
+
+        if interpolation not in self.interpolations:
+            interpolation = "linear"
+        if interpolation == "area" and scale < 1:
+            factor = int(round(1 / scale))
+            if abs(factor * scale - 1) < 1e-6 and h % factor == 0 and w % factor == 0:
+                return self._box_downscale(frame, factor)
+            interpolation = "linear"
+        elif interpolation == "area":
+            # Like cv2.INTER_AREA when enlarging: pixel replication for whole
+            # factors, bilinear otherwise
+            interpolation = "nearest" if abs(scale - round(scale)) < 1e-6 else "linear"
+
+        if interpolation == "nearest":
+            # 4-byte pixels move as one uint32 instead of four uint8s
+            packed = frame.ndim == 3 and frame.shape[2] == 4 and frame.flags.c_contiguous
+            src = frame.view(np.uint32)[..., 0] if packed else frame
+            if scale > 1 and abs(scale - round(scale)) < 1e-6:
+                factor = int(round(scale))
+                out = np.repeat(np.repeat(src, factor, axis=0), factor, axis=1)
+            else:
+                rows, cols = self._nearest_indices(w, h, out_w, out_h)
+                out = src[rows[:, None], cols]
+            return out[..., None].view(np.uint8) if packed else out
+
+        if frame.ndim == 3 and frame.shape[2] in QIMAGE_FORMATS and frame.dtype == np.uint8:
+            return self._bilinear_qt(frame, out_w, out_h)
+        return self._bilinear(frame, out_w, out_h)
+
+    def _box_downscale(self, frame, factor):
+        h, w = frame.shape[:2]
+        shaped = frame.reshape(h // factor, factor, w // factor, factor, *frame.shape[2:])
+        summed = shaped.sum(axis=(1, 3), dtype=np.uint32)
+        return ((summed + (factor * factor) // 2) // (factor * factor)).astype(np.uint8)
+
+    def _nearest_indices(self, w, h, out_w, out_h):
+        key = (w, h, out_w, out_h)
+        cached = self._nearest_cache.get(key)
+        if cached is None:
+            rows = np.minimum((np.arange(out_h) * h) // out_h, h - 1)
+            cols = np.minimum((np.arange(out_w) * w) // out_w, w - 1)
+            cached = self._nearest_cache[key] = (rows, cols)
+        return cached
+
+    def _linear_axis(self, src, dst):
+        # Same sample positions as cv2.INTER_LINEAR: centre-aligned, clamped
+        pos = (np.arange(dst, dtype=np.float64) + 0.5) * (src / dst) - 0.5
+        pos = np.clip(pos, 0, src - 1)
+        lo = np.floor(pos).astype(np.intp)
+        hi = np.minimum(lo + 1, src - 1)
+        weight = np.round((pos - lo) * _WEIGHT_ONE).astype(np.uint32)
+        return lo, hi, weight
+
+    def _bilinear_qt(self, frame, out_w, out_h):
+        frame = np.ascontiguousarray(frame)
+        ch = frame.shape[2]
+        scaled = wrap_qimage(frame).scaled(out_w, out_h, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        if scaled.format() != QIMAGE_FORMATS[ch]:
+            scaled = scaled.convertToFormat(QIMAGE_FORMATS[ch])
+        ptr = scaled.constBits()
+        ptr.setsize(scaled.sizeInBytes())
+        rows = np.frombuffer(ptr, np.uint8).reshape(out_h, scaled.bytesPerLine())
+        return rows[:, :out_w * ch].reshape(out_h, out_w, ch).copy()
+
+    # Pure NumPy fallback for buffers Qt can't wrap (e.g. single-channel)
+    def _bilinear(self, frame, out_w, out_h):
+        h, w = frame.shape[:2]
+        key = (w, h, out_w, out_h)
+        cached = self._linear_cache.get(key)
+        if cached is None:
+            cached = self._linear_cache[key] = (self._linear_axis(w, out_w), self._linear_axis(h, out_h))
+        (x0, x1, wx), (y0, y1, wy) = cached
+
+        extra = (1,) * (frame.ndim - 2)
+        wx = wx.reshape((1, out_w) + extra)
+        wy = wy.reshape((out_h, 1) + extra)
+
+        # Rows first: only the source rows that are actually sampled get
+        # interpolated horizontally
+        top = frame[y0].astype(np.uint32)
+        bottom = frame[y1].astype(np.uint32)
+        top = top[:, x0] * (_WEIGHT_ONE - wx) + top[:, x1] * wx
+        bottom = bottom[:, x0] * (_WEIGHT_ONE - wx) + bottom[:, x1] * wx
+        out = top * (_WEIGHT_ONE - wy) + bottom * wy
+        out += 1 << (2 * _WEIGHT_BITS - 1)
+        out >>= 2 * _WEIGHT_BITS
+        return out.astype(np.uint8)
+
+    def bgr_to_rgb(self, frame):
+        return np.ascontiguousarray(frame[..., 2::-1])
+
+    def rectangle(self, img, pt1, pt2, color, thickness=1):
+        (x1, y1), (x2, y2) = pt1, pt2
+        color = np.asarray(color, dtype=img.dtype)[:img.shape[2]] if img.ndim == 3 else color
+        # Same band width as cv2.rectangle (centred on the corners), square corners
+        half = 0 if thickness <= 1 else (thickness + 1) // 2
+        top, bottom = max(y1 - half, 0), y2 + half + 1
+        left, right = max(x1 - half, 0), x2 + half + 1
+        img[top:y1 + half + 1, left:right] = color
+        img[max(y2 - half, 0):bottom, left:right] = color
+        img[top:bottom, left:x1 + half + 1] = color
+        img[top:bottom, max(x2 - half, 0):right] = color
+        return img
+
+class OpenCVBackend:
+    name = "opencv"
+    channels = 3
+    interpolations = INTERPOLATIONS
+
+    def __init__(self):
+        import cv2
+        self.cv2 = cv2
+        self.flags = {
+            "nearest": cv2.INTER_NEAREST,
+            "linear": cv2.INTER_LINEAR,
+            "area": cv2.INTER_AREA,
+            "cubic": cv2.INTER_CUBIC,
+            "lanczos": cv2.INTER_LANCZOS4,
+        }
+
+    def resize(self, frame, scale, interpolation="linear"):
+        h, w = frame.shape[:2]
+        return self.cv2.resize(frame, output_size(w, h, scale), interpolation=self.flags.get(interpolation, self.cv2.INTER_LINEAR))
+
+    def bgr_to_rgb(self, frame):
+        return self.cv2.cvtColor(frame, self.cv2.COLOR_BGR2RGB)
+
+    def rectangle(self, img, pt1, pt2, color, thickness=1):
+        self.cv2.rectangle(img, pt1, pt2, color, thickness)
+        return img
+
+_backends = {}
+
+def opencv_available():
+    try:
+        import cv2
+        return True
+    except ImportError:
+        return False
+
+def get_backend(name="auto"):
+    if name not in BACKEND_NAMES:
+        event_log.warn(f"Unknown image backend '{name}', using auto")
+        name = "auto"
+    if name == "auto":
+        name = "opencv" if opencv_available() else "numpy"
+
+    backend = _backends.get(name)
+    if backend is None:
+        try:
+            backend = OpenCVBackend() if name == "opencv" else NumpyBackend()
+        except ImportError as e:
+            event_log.warn(f"OpenCV backend unavailable ({e}), using NumPy")
+            return get_backend("numpy")
+        _backends[name] = backend
+    return backend
@@ -0,0 +1,204 @@
+# ============================================================================
+#                            image_enhance.py
+# ============================================================================
+
+import time
+import numpy as np
+
+DEFAULT_ENHANCE_CONFIG = {
+    "contrast_stretch": False,
+    "stretch_percent": 1.0,
+    "gamma": 1.0,
+    "sharpen": 0.0,
+    "clahe": False,
+    "clahe_clip": 2.0
+}
+
+COST_EMA = 0.1
+# Every Nth pixel in each direction feeds the stretch percentiles / histograms
+HISTOGRAM_STEP = 4
+CLAHE_TILES = (8, 8)
+
+_PAIRS = np.arange(65536, dtype=np.uint32)
+
+def pair_lut(lut):
+    # Applies lut to two bytes per lookup: half the gathers of a byte LUT
+    return lut[_PAIRS & 255].astype(np.uint16) | (lut[_PAIRS >> 8].astype(np.uint16) << 8)
+
+def gamma_lut(gamma):
+    x = np.arange(256, dtype=np.float64) / 255.0
+    return np.clip(np.round(255.0 * np.power(x, 1.0 / gamma)), 0, 255).astype(np.uint8)
+
+def stretch_lut(low, high):
+    if high <= low:
+        return np.arange(256, dtype=np.uint8)
+    x = (np.arange(256, dtype=np.float64) - low) * (255.0 / (high - low))
+    return np.clip(np.round(x), 0, 255).astype(np.uint8)
+
+def histogram_percentiles(hist, low_pct, high_pct):
+    cdf = np.cumsum(hist)
+    total = cdf[-1]
+    low = int(np.searchsorted(cdf, total * low_pct / 100.0))
+    high = int(np.searchsorted(cdf, total * high_pct / 100.0))
+    return low, high
+
+def equalize_lut(hist, clip):
+    # Clip-limited histogram equalisation (the per-tile step of CLAHE, done
+    # once for the whole frame)
+    hist = hist.astype(np.float64)
+    limit = max(1.0, clip * hist.sum() / 256.0)
+    excess = np.maximum(hist - limit, 0).sum()
+    hist = np.minimum(hist, limit) + excess / 256.0
+    cdf = np.cumsum(hist)
+    cdf = (cdf - cdf[0]) / max(cdf[-1] - cdf[0], 1e-9)
+    return np.clip(np.round(cdf * 255.0), 0, 255).astype(np.uint8)
+
+# Post-resize stage: runs on the magnified frame at output resolution and
+# modifies it in place. Stretch, gamma and (without OpenCV) the equalisation
+# collapse into one 256-entry LUT pass; sharpening reuses preallocated buffers.
+class EnhancementStage:
+    def __init__(self, config=None, backend=None):
+        self.config = {**DEFAULT_ENHANCE_CONFIG, **(config or {})}
+        self.cv2 = getattr(backend, "cv2", None)
+        self.cost_ms = {}
+        self.shape = None
+        self.pair_key = None
+        self.pair = None
+        self.gamma = gamma_lut(self.config["gamma"]) if self.config["gamma"] != 1.0 else None
+        self.clahe = None
+        if self.config["clahe"] and self.cv2 is not None:
+            self.clahe = self.cv2.createCLAHE(clipLimit=self.config["clahe_clip"], tileGridSize=CLAHE_TILES)
+
+    @classmethod
+    def from_config(cls, config, backend=None):
+        stage = cls({key: config[key] for key in DEFAULT_ENHANCE_CONFIG if key in config}, backend)
+        return stage if stage.enabled else None
+
+    @property
+    def enabled(self):
+        c = self.config
+        return c["contrast_stretch"] or c["clahe"] or c["gamma"] != 1.0 or c["sharpen"] > 0
+
+    def _buffers(self, frame):
+        if frame.shape == self.shape:
+            return
+        self.shape = frame.shape
+        self.lut_out = (np.empty(frame.shape, np.uint8), np.empty(frame.shape, np.uint8))
+        self.flip = 0
+        self.blur = np.empty(frame.shape, np.uint8 if self.cv2 is not None else np.int16)
+        self.sharp = None if self.cv2 is not None else np.empty(frame.shape, np.int16)
+        if self.cv2 is not None and frame.shape[2] == 3:
+            self.ycrcb = np.empty(frame.shape, np.uint8)
+            self.luma = np.empty(frame.shape[:2], np.uint8)
+
+    def _timed(self, name, start):
+        now = time.perf_counter()
+        ms = (now - start) * 1000.0
+        previous = self.cost_ms.get(name)
+        self.cost_ms[name] = ms if previous is None else previous + COST_EMA * (ms - previous)
+        return now
+
+    def _luma_sample(self, frame):
+        # Green is a cheap stand-in for luminance in BGR(A)
+        return frame[::HISTOGRAM_STEP, ::HISTOGRAM_STEP, 1]
+
+    def process(self, frame):
+        if not frame.flags.writeable or not frame.flags.c_contiguous:
+            frame = np.ascontiguousarray(frame).copy()
+        self._buffers(frame)
+        start = time.perf_counter()
+        c = self.config
+
+        if self.clahe is not None and frame.shape[2] == 3:
+            cv2 = self.cv2
+            cv2.cvtColor(frame, cv2.COLOR_BGR2YCrCb, dst=self.ycrcb)
+            cv2.extractChannel(self.ycrcb, 0, self.luma)
+            self.clahe.apply(self.luma, self.luma)
+            cv2.insertChannel(self.luma, self.ycrcb, 0)
+            cv2.cvtColor(self.ycrcb, cv2.COLOR_YCrCb2BGR, dst=frame)
+            start = self._timed("clahe", start)
+
+        lut = None
+        hist = None
+        if (c["clahe"] and self.clahe is None) or c["contrast_stretch"]:
+            hist = np.bincount(self._luma_sample(frame).ravel(), minlength=256)
+        if c["clahe"] and self.clahe is None:
+            lut = equalize_lut(hist, c["clahe_clip"])
+            # Histogram as it will look after equalisation, for the stretch
+            hist = np.bincount(lut, weights=hist, minlength=256)
+            start = self._timed("equalize", start)
+        if c["contrast_stretch"]:
+            low, high = histogram_percentiles(hist, c["stretch_percent"], 100.0 - c["stretch_percent"])
+            stretch = stretch_lut(low, high)
+            lut = stretch if lut is None else stretch[lut]
+            start = self._timed("stretch", start)
+        if self.gamma is not None:
+            lut = self.gamma if lut is None else self.gamma[lut]
+        if lut is not None:
+            frame = self._apply_lut(frame, lut)
+            start = self._timed("lut", start)
+
+        if c["sharpen"] > 0:
+            self._sharpen(frame, c["sharpen"])
+            start = self._timed("sharpen", start)
+        return frame
+
+    def _apply_lut(self, frame, lut):
+        if self.cv2 is not None:
+            self.cv2.LUT(frame, lut, dst=frame)
+            return frame
+        # NumPy can't gather in place; write into the other of two output
+        # buffers (the view may still be painting the previous one)
+        self.flip ^= 1
+        out = self.lut_out[self.flip]
+        if frame.size % 2 == 0:
+            key = lut.tobytes()
+            if key != self.pair_key:
+                self.pair_key, self.pair = key, pair_lut(lut)
+            np.take(self.pair, frame.reshape(-1).view(np.uint16), out=out.reshape(-1).view(np.uint16))
+        else:
+            np.take(lut, frame, out=out)
+        return out
+
+    def _sharpen(self, frame, amount):
+        if self.cv2 is not None:
+            cv2 = self.cv2
+            cv2.GaussianBlur(frame, (0, 0), 1.0, dst=self.blur)
+            cv2.addWeighted(frame, 1.0 + amount, self.blur, -amount, 0, dst=frame)
+            return
+        # 3x3 [1 2 1] blur in int16, then frame + amount * (frame - blur)
+        blur, sharp = self.blur, self.sharp
+        np.copyto(sharp, frame)
+        np.copyto(blur, sharp)
+        blur[1:-1] += sharp[1:-1]
+        blur[1:-1] += sharp[:-2]
+        blur[1:-1] += sharp[2:]
+        blur[1:-1] >>= 2
+        np.copyto(sharp, blur)
+        blur[:, 1:-1] += sharp[:, 1:-1]
+        blur[:, 1:-1] += sharp[:, :-2]
+        blur[:, 1:-1] += sharp[:, 2:]
+        blur[:, 1:-1] >>= 2
+        np.copyto(sharp, frame)
+        np.subtract(sharp, blur, out=blur)
+        blur *= int(round(amount * 16))
+        blur >>= 4
+        sharp += blur
+        np.clip(sharp, 0, 255, out=sharp)
+        np.copyto(frame, sharp, casting="unsafe")
+
+    def get_stats(self):
+        return {name: round(ms, 3) for name, ms in self.cost_ms.items()}
+
+def describe(config):
+    c = {**DEFAULT_ENHANCE_CONFIG, **config}
+    parts = []
+    if c["clahe"]:
+        parts.append(f"clahe {c['clahe_clip']}")
+    if c["contrast_stretch"]:
+        parts.append(f"stretch {c['stretch_percent']}%")
+    if c["gamma"] != 1.0:
+        parts.append(f"gamma {c['gamma']}")
+    if c["sharpen"] > 0:
+        parts.append(f"sharpen {c['sharpen']}")
+    return ", ".join(parts) or "off"
@@ -8,16 +8,22 @@ from PyQt5.QtGui import QFont, QPainter, QColor
 import json
 import os
 
+import event_log
+
 DEFAULT_KEYBINDS = {
     "auto_detect": "up",
     "hide_all": "right",
     "exit": "down",
     "toggle_magnifier": "m",
-    "toggle_crosshair": "c"
+    "toggle_crosshair": "c",
+    "dump_log": "f9",
+    "open_config": "f8",
+    "toggle_recording": "f10",
+    "toggle_profiler": "f11"
 }
 
 class InstructionsMenu(QWidget):
-    def __init__(self):
+    def __init__(self, keybinds=None):
         super().__init__()
 
         self.setWindowFlags(
@@ -34,29 +40,41 @@ class InstructionsMenu(QWidget):
         self.drag_position = QPoint()
 
         self.bg_color = QColor(20, 20, 20, 150)
+        self.native_ops = 0
+
+        if keybinds is None:
+            keybinds = self.load_keybinds()
+
+        self.label = QLabel(self.format_text(keybinds))
+        self.label.setStyleSheet("color: white;")
+        self.label.setFont(QFont("Arial", 12))
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.label)
+        layout.setContentsMargins(15, 15, 15, 15)
+        self.setLayout(layout)
 
-        keybinds = self.load_keybinds()
+        self.resize(220, 120)
 
-        text = (
+    def format_text(self, keybinds):
+        keybinds = {**DEFAULT_KEYBINDS, **keybinds}
+        return (
             "--------- Instructions ---------\n"
             f"    {keybinds['auto_detect']} - Toggle auto-detect\n"
             f"    {keybinds['exit']} - Exit application\n"
             f"    {keybinds['hide_all']} - Toggle all overlays\n"
             f"    {keybinds['toggle_magnifier']} - Toggle magnifier\n"
             f"    {keybinds['toggle_crosshair']} - Toggle crosshair\n"
+            f"    {keybinds['dump_log']} - Dump event log\n"
+            f"    {keybinds['open_config']} - Open config menu\n"
+            f"    {keybinds['toggle_recording']} - Record session\n"
+            f"    {keybinds['toggle_profiler']} - Profile\n"
             "----------------------------------"
         )
 
-        label = QLabel(text)
-        label.setStyleSheet("color: white;")
-        label.setFont(QFont("Arial", 12))
-
-        layout = QVBoxLayout()
-        layout.addWidget(label)
-        layout.setContentsMargins(15, 15, 15, 15)
-        self.setLayout(layout)
-
-        self.resize(220, 120)
+    def set_keybinds(self, keybinds):
+        self.label.setText(self.format_text(keybinds))
+        self.adjustSize()
 
     def load_keybinds(self):
         config_file = "viewfinder_config.json"
@@ -66,7 +84,7 @@ class InstructionsMenu(QWidget):
                     config = json.load(f)
                     return config.get("keybinds", DEFAULT_KEYBINDS)
             except Exception as e:
-                print(f"[WARN] Could not load keybinds from config: {e}")
+                event_log.warn(f"Could not load keybinds from config: {e}")
         return DEFAULT_KEYBINDS
 
     def show_in_top_right(self):
@@ -76,6 +94,15 @@ class InstructionsMenu(QWidget):
         self.move(x, y)
         self.show()
 
+    def set_visibility(self, visible):
+        if visible == self.isVisible():
+            return
+        if visible:
+            self.show_in_top_right()
+        else:
+            self.hide()
+        self.native_ops += 1
+
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             self.dragging = True
@@ -2,16 +2,43 @@
 #                       magnifier_config_widget.py
 # ============================================================================
 
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSlider, QSpinBox, QDoubleSpinBox, QGroupBox)
-from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSlider, QSpinBox, QDoubleSpinBox, QGroupBox, QComboBox, QCheckBox, QPushButton)
+from PyQt5.QtCore import Qt, QTimer, QObject, pyqtSignal
+from PyQt5.QtGui import QPixmap
 import copy
+import threading
+
+from probe_calibration import screen_key, cached_probe, calibrate_screen
+from cost_estimator import CostEstimator, TIGHT_FRACTION
 
 MAGNIFIER_DEFAULT = {
     "scale": 2.0,
     "radius": 120,
     "window_size": 400,
     "timer_ms": 33,
-    "mag_detection_pos": [1718, 877]
+    "mag_detection_pos": [1718, 877],
+    "image_backend": "auto",
+    "lens_indicator": "box",
+    "cursor_prediction": "off",
+    "interpolation": "linear",
+    "quality_governor": True,
+    "resize_threads": 0,
+    "tile_min_pixels": 300000,
+    "contrast_stretch": False,
+    "stretch_percent": 1.0,
+    "gamma": 1.0,
+    "sharpen": 0.0,
+    "clahe": False,
+    "clahe_clip": 2.0,
+    "motion_highlight": False,
+    "motion_threshold": 24,
+    "motion_rate": 0.05,
+    "motion_budget_ms": 2.0,
+    "shm_export": False,
+    "shm_name": "viewfinder_frames",
+    "shm_slots": 3,
+    "shm_max_frame_mb": 8,
+    "probe_cache": {}
 }
 
 RADIUS_RANGE = (50, 300)
@@ -20,6 +47,28 @@ WINDOW_RANGE = (200, 800)
 WINDOW_TICK = 100
 FPS_RANGE = (10, 60)
 FPS_TICK = 10
+IMAGE_BACKENDS = ["auto", "opencv", "numpy"]
+LENS_INDICATORS = ["box", "corners", "none"]
+CURSOR_PREDICTORS = ["off", "velocity", "alpha_beta"]
+INTERPOLATIONS = ["nearest", "linear", "area", "cubic", "lanczos"]
+CALIBRATION_DELAY_S = 3
+ESTIMATE_DEBOUNCE_MS = 400
+PREVIEW_SIZE = 160
+
+# Runs calibrate_screen (a full-screen grab plus the component search) off the
+# GUI thread and hands the result back through a queued signal
+class ProbeCalibrator(QObject):
+    finished = pyqtSignal(object)
+
+    def start(self, use_opencv):
+        threading.Thread(target=self._run, args=(use_opencv,), name="probe-calibration", daemon=True).start()
+
+    def _run(self, use_opencv):
+        try:
+            result = calibrate_screen(use_opencv)
+        except Exception as e:
+            result = {"error": str(e)}
+        self.finished.emit(result)
 
 class MagnifierConfigWidget(QWidget):
     def __init__(self, config):
@@ -67,13 +116,15 @@ class MagnifierConfigWidget(QWidget):
 
         detect_group = QGroupBox("Auto-Detection Settings")
         detect_layout = QVBoxLayout()
+        # A calibrated probe for this screen takes precedence over the X/Y below
+        detection_pos = cached_probe(self.config, screen_key()) or self.config["mag_detection_pos"]
 
         pos_x_layout = QHBoxLayout()
         pos_x_label = QLabel("Detection X Position:")
         pos_x_label.setFixedWidth(150)
         self.pos_x_spinbox = QSpinBox()
-        self.pos_x_spinbox.setRange(0, 3840)
-        self.pos_x_spinbox.setValue(self.config["mag_detection_pos"][0])
+        self.pos_x_spinbox.setRange(0, 7680)
+        self.pos_x_spinbox.setValue(detection_pos[0])
         self.pos_x_spinbox.setSuffix(" px")
         pos_x_layout.addWidget(pos_x_label)
         pos_x_layout.addWidget(self.pos_x_spinbox)
@@ -84,19 +135,159 @@ class MagnifierConfigWidget(QWidget):
         pos_y_label = QLabel("Detection Y Position:")
         pos_y_label.setFixedWidth(150)
         self.pos_y_spinbox = QSpinBox()
-        self.pos_y_spinbox.setRange(0, 2160)
-        self.pos_y_spinbox.setValue(self.config["mag_detection_pos"][1])
+        self.pos_y_spinbox.setRange(0, 4320)
+        self.pos_y_spinbox.setValue(detection_pos[1])
         self.pos_y_spinbox.setSuffix(" px")
         pos_y_layout.addWidget(pos_y_label)
         pos_y_layout.addWidget(self.pos_y_spinbox)
         pos_y_layout.addStretch()
         detect_layout.addLayout(pos_y_layout)
 
+        calibrate_layout = QHBoxLayout()
+        self.calibrate_button = QPushButton("Calibrate From Screen")
+        self.calibrate_button.setToolTip(
+            f"Minimizes this window, waits {CALIBRATION_DELAY_S}s, then finds the weapon HUD in one screenshot; "
+            "equip a weapon in game first. The result is remembered for this resolution and DPI"
+        )
+        self.calibrate_button.clicked.connect(self.start_calibration)
+        self.calibrate_status = QLabel("")
+        calibrate_layout.addWidget(self.calibrate_button)
+        calibrate_layout.addWidget(self.calibrate_status)
+        calibrate_layout.addStretch()
+        detect_layout.addLayout(calibrate_layout)
+        self.calibration_timer = QTimer(self)
+        self.calibration_timer.timeout.connect(self.calibration_tick)
+        self.calibrator = ProbeCalibrator()
+        self.calibrator.finished.connect(self.calibration_done)
+        key = screen_key()
+        if cached_probe(self.config, key):
+            self.calibrate_status.setText(f"Using the calibrated position for {key}")
+        self.countdown = 0
+
         detect_group.setLayout(detect_layout)
         layout.addWidget(detect_group)
 
+        perf_group = QGroupBox("Performance Settings")
+        perf_layout = QVBoxLayout()
+
+        self.backend_combo = self.create_combo_row(
+            perf_layout, "Image Backend:", IMAGE_BACKENDS, self.config.get("image_backend", "auto"),
+            "auto uses OpenCV when installed; numpy avoids loading OpenCV entirely"
+        )
+        self.indicator_combo = self.create_combo_row(
+            perf_layout, "Lens Indicator:", LENS_INDICATORS, self.config.get("lens_indicator", "box"),
+            "Outline drawn around the captured area; corners and none are cheaper for the compositor"
+        )
+        self.prediction_combo = self.create_combo_row(
+            perf_layout, "Cursor Prediction:", CURSOR_PREDICTORS, self.config.get("cursor_prediction", "off"),
+            "Capture ahead of the cursor by the measured display latency while panning"
+        )
+        self.interpolation_combo = self.create_combo_row(
+            perf_layout, "Interpolation:", INTERPOLATIONS, self.config.get("interpolation", "linear"),
+            "Resize quality, cheapest first; cubic and lanczos need OpenCV (served as linear otherwise)"
+        )
+
+        self.governor_checkbox = QCheckBox("Lower interpolation quality automatically when frames run over budget")
+        self.governor_checkbox.setChecked(self.config.get("quality_governor", True))
+        perf_layout.addWidget(self.governor_checkbox)
+
+        threads_layout = QHBoxLayout()
+        threads_label = QLabel("Resize Threads:")
+        threads_label.setFixedWidth(150)
+        self.threads_spinbox = QSpinBox()
+        self.threads_spinbox.setRange(0, 16)
+        self.threads_spinbox.setSpecialValueText("auto")
+        self.threads_spinbox.setValue(self.config.get("resize_threads", 0))
+        self.threads_spinbox.setToolTip("Split large magnified frames into bands resized in parallel; 1 = off, auto = one per core (up to 4)")
+        threads_layout.addWidget(threads_label)
+        threads_layout.addWidget(self.threads_spinbox)
+        threads_layout.addStretch()
+        perf_layout.addLayout(threads_layout)
+
+        self.export_checkbox = QCheckBox("Export magnified frames to shared memory")
+        self.export_checkbox.setChecked(self.config.get("shm_export", False))
+        self.export_checkbox.setToolTip(f"Publish each frame to the '{self.config.get('shm_name', 'viewfinder_frames')}' segment for external tools (see Info/frame_reader.py)")
+        perf_layout.addWidget(self.export_checkbox)
+
+        perf_group.setLayout(perf_layout)
+        layout.addWidget(perf_group)
+
+        enhance_group = QGroupBox("Image Enhancement")
+        enhance_layout = QVBoxLayout()
+
+        checks_layout = QHBoxLayout()
+        self.stretch_checkbox = QCheckBox("Contrast Stretch")
+        self.stretch_checkbox.setChecked(self.config.get("contrast_stretch", False))
+        self.stretch_checkbox.setToolTip("Stretch the darkest/brightest 1% of each frame to full range")
+        self.clahe_checkbox = QCheckBox("CLAHE")
+        self.clahe_checkbox.setChecked(self.config.get("clahe", False))
+        self.clahe_checkbox.setToolTip("Local contrast equalization (global clip-limited equalization without OpenCV)")
+        checks_layout.addWidget(self.stretch_checkbox)
+        checks_layout.addWidget(self.clahe_checkbox)
+        checks_layout.addStretch()
+        enhance_layout.addLayout(checks_layout)
+
+        self.gamma_spinbox = self.create_double_row(enhance_layout, "Gamma:", (0.2, 3.0), self.config.get("gamma", 1.0))
+        self.gamma_spinbox.setToolTip("Above 1 brightens shadows, below 1 darkens")
+        self.sharpen_spinbox = self.create_double_row(enhance_layout, "Sharpen:", (0.0, 3.0), self.config.get("sharpen", 0.0))
+        self.sharpen_spinbox.setToolTip("Unsharp mask amount, 0 = off")
+
+        self.motion_checkbox = QCheckBox("Highlight Motion")
+        self.motion_checkbox.setChecked(self.config.get("motion_highlight", False))
+        self.motion_checkbox.setToolTip("Tint pixels that differ from a running background of the lens area")
+        enhance_layout.addWidget(self.motion_checkbox)
+
+        threshold_layout = QHBoxLayout()
+        threshold_label = QLabel("Motion Threshold:")
+        threshold_label.setFixedWidth(150)
+        self.motion_threshold_spinbox = QSpinBox()
+        self.motion_threshold_spinbox.setRange(4, 128)
+        self.motion_threshold_spinbox.setValue(self.config.get("motion_threshold", 24))
+        self.motion_threshold_spinbox.setToolTip("Brightness change (0-255) that counts as movement")
+        threshold_layout.addWidget(threshold_label)
+        threshold_layout.addWidget(self.motion_threshold_spinbox)
+        threshold_layout.addStretch()
+        enhance_layout.addLayout(threshold_layout)
+
+        self.motion_budget_spinbox = self.create_double_row(enhance_layout, "Motion Budget:", (0.2, 10.0), self.config.get("motion_budget_ms", 2.0))
+        self.motion_budget_spinbox.setSuffix(" ms")
+        self.motion_budget_spinbox.setToolTip("Per-frame time allowed; over it the highlight drops cleanup and resolution")
+
+        enhance_group.setLayout(enhance_layout)
+        layout.addWidget(enhance_group)
+
+        cost_group = QGroupBox("Estimated Cost")
+        cost_layout = QHBoxLayout()
+        self.cost_preview = QLabel()
+        self.cost_preview.setFixedSize(PREVIEW_SIZE, PREVIEW_SIZE)
+        self.cost_preview.setAlignment(Qt.AlignCenter)
+        self.cost_preview.setStyleSheet("background-color: #202020;")
+        self.cost_label = QLabel("Measuring...")
+        self.cost_label.setWordWrap(True)
+        self.cost_label.setToolTip("The real magnifier pipeline timed on a synthetic frame in the background; "
+                                   "capture is a real screen grab of the lens size")
+        cost_layout.addWidget(self.cost_preview)
+        cost_layout.addWidget(self.cost_label, 1)
+        cost_group.setLayout(cost_layout)
+        layout.addWidget(cost_group)
+
         layout.addStretch()
 
+        self.estimator = CostEstimator()
+        self.estimator.finished.connect(self.show_estimate)
+        self.estimate_timer = QTimer(self)
+        self.estimate_timer.setSingleShot(True)
+        self.estimate_timer.timeout.connect(self.run_estimate)
+        for spinbox in (self.scale_spinbox, self.radius_spinbox, self.window_spinbox, self.fps_spinbox,
+                        self.threads_spinbox, self.gamma_spinbox, self.sharpen_spinbox,
+                        self.motion_threshold_spinbox, self.motion_budget_spinbox):
+            spinbox.valueChanged.connect(self.schedule_estimate)
+        for combo in (self.backend_combo, self.interpolation_combo):
+            combo.currentTextChanged.connect(self.schedule_estimate)
+        for checkbox in (self.stretch_checkbox, self.clahe_checkbox, self.motion_checkbox):
+            checkbox.stateChanged.connect(self.schedule_estimate)
+        self.schedule_estimate()
+
     def create_slider_spinbox_pair(self, parent_layout, label_text, value_range, tick_interval, initial_value, suffix):
         row_layout = QHBoxLayout()
         label = QLabel(label_text)
@@ -123,6 +314,108 @@ class MagnifierConfigWidget(QWidget):
 
         return slider, spinbox
 
+    def create_double_row(self, parent_layout, label_text, value_range, initial_value):
+        row_layout = QHBoxLayout()
+        label = QLabel(label_text)
+        label.setFixedWidth(150)
+
+        spinbox = QDoubleSpinBox()
+        spinbox.setRange(*value_range)
+        spinbox.setSingleStep(0.1)
+        spinbox.setValue(initial_value)
+
+        row_layout.addWidget(label)
+        row_layout.addWidget(spinbox)
+        row_layout.addStretch()
+        parent_layout.addLayout(row_layout)
+
+        return spinbox
+
+    def create_combo_row(self, parent_layout, label_text, items, current, tooltip):
+        row_layout = QHBoxLayout()
+        label = QLabel(label_text)
+        label.setFixedWidth(150)
+
+        combo = QComboBox()
+        combo.addItems(items)
+        combo.setCurrentText(current)
+        combo.setToolTip(tooltip)
+
+        row_layout.addWidget(label)
+        row_layout.addWidget(combo)
+        row_layout.addStretch()
+        parent_layout.addLayout(row_layout)
+
+        return combo
+
+    def schedule_estimate(self, *args):
+        # Debounced: dragging a slider restarts the wait instead of queueing runs
+        self.cost_label.setText("Measuring...")
+        self.estimate_timer.start(ESTIMATE_DEBOUNCE_MS)
+
+    def run_estimate(self):
+        self.estimator.request(copy.deepcopy(self.get_config()))
+
+    def show_estimate(self, result):
+        if "error" in result:
+            self.cost_label.setText(f"Could not measure: {result['error']}")
+            return
+        fps = self.fps_spinbox.value()
+        budget_ms = 1000.0 / fps
+        total = result["total_ms"]
+        grab = f"{result['grab_ms']:.1f} ms" if result["grab_ms"] is not None else "n/a"
+        lines = [
+            f"Capture {grab} + pipeline {result['pipeline_ms']:.1f} ms + paint {result['paint_ms']:.1f} ms "
+            f"= {total:.1f} ms per frame ({result['output'][0]}x{result['output'][1]}, {result['backend']})",
+            f"About {total * fps / 10.0:.0f}% of one CPU core at {fps} FPS (budget {budget_ms:.1f} ms per frame)",
+        ]
+        style = ""
+        if total > budget_ms:
+            lines.append(f"Too slow for {fps} FPS on this machine. Lower zoom, radius or FPS"
+                         + (", or let the quality governor drop interpolation" if self.governor_checkbox.isChecked() else ""))
+            style = "color: #D03030;"
+        elif total > budget_ms * TIGHT_FRACTION:
+            lines.append("Close to the frame budget; expect dropped frames while the game is busy")
+            style = "color: #C08000;"
+        self.cost_label.setText("\n".join(lines))
+        self.cost_label.setStyleSheet(style)
+        self.cost_preview.setPixmap(QPixmap.fromImage(result["preview"]).scaled(
+            PREVIEW_SIZE, PREVIEW_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+
+    def start_calibration(self):
+        self.calibrate_button.setEnabled(False)
+        self.countdown = CALIBRATION_DELAY_S
+        self.calibrate_status.setText(f"Capturing in {self.countdown}...")
+        self.window().showMinimized()
+        self.calibration_timer.start(1000)
+
+    def calibration_tick(self):
+        self.countdown -= 1
+        if self.countdown > 0:
+            self.calibrate_status.setText(f"Capturing in {self.countdown}...")
+            return
+        self.calibration_timer.stop()
+        self.calibrate_status.setText("Capturing...")
+        self.calibrator.start(self.config.get("image_backend", "auto") != "numpy")
+
+    def calibration_done(self, result):
+        window = self.window()
+        window.showNormal()
+        window.raise_()
+        window.activateWindow()
+        self.calibrate_button.setEnabled(True)
+        if "error" in result:
+            self.calibrate_status.setText(f"Calibration failed: {result['error']}")
+            return
+        if result["pos"] is None:
+            self.calibrate_status.setText("No weapon HUD found - equip a weapon and try again")
+            return
+        key = screen_key()
+        self.config.setdefault("probe_cache", {})[key] = result["pos"]
+        self.pos_x_spinbox.setValue(result["pos"][0])
+        self.pos_y_spinbox.setValue(result["pos"][1])
+        self.calibrate_status.setText(f"Found at {result['pos'][0]}, {result['pos'][1]} for {key}")
+
     def get_config(self):
         self.config["scale"] = self.scale_spinbox.value()
         self.config["radius"] = self.radius_spinbox.value()
@@ -132,6 +425,20 @@ class MagnifierConfigWidget(QWidget):
             self.pos_x_spinbox.value(),
             self.pos_y_spinbox.value()
         ]
+        self.config["image_backend"] = self.backend_combo.currentText()
+        self.config["lens_indicator"] = self.indicator_combo.currentText()
+        self.config["cursor_prediction"] = self.prediction_combo.currentText()
+        self.config["interpolation"] = self.interpolation_combo.currentText()
+        self.config["quality_governor"] = self.governor_checkbox.isChecked()
+        self.config["resize_threads"] = self.threads_spinbox.value()
+        self.config["shm_export"] = self.export_checkbox.isChecked()
+        self.config["contrast_stretch"] = self.stretch_checkbox.isChecked()
+        self.config["clahe"] = self.clahe_checkbox.isChecked()
+        self.config["gamma"] = round(self.gamma_spinbox.value(), 2)
+        self.config["sharpen"] = round(self.sharpen_spinbox.value(), 2)
+        self.config["motion_highlight"] = self.motion_checkbox.isChecked()
+        self.config["motion_threshold"] = self.motion_threshold_spinbox.value()
+        self.config["motion_budget_ms"] = round(self.motion_budget_spinbox.value(), 2)
         return self.config
 
     def reset_to_default(self):
@@ -142,4 +449,18 @@ class MagnifierConfigWidget(QWidget):
         self.window_spinbox.setValue(self.config["window_size"])
         self.fps_spinbox.setValue(int(1000 / self.config["timer_ms"]))
         self.pos_x_spinbox.setValue(self.config["mag_detection_pos"][0])
-        self.pos_y_spinbox.setValue(self.config["mag_detection_pos"][1])
\ No newline at end of file
+        self.pos_y_spinbox.setValue(self.config["mag_detection_pos"][1])
+        self.backend_combo.setCurrentText(self.config["image_backend"])
+        self.indicator_combo.setCurrentText(self.config["lens_indicator"])
+        self.prediction_combo.setCurrentText(self.config["cursor_prediction"])
+        self.interpolation_combo.setCurrentText(self.config["interpolation"])
+        self.governor_checkbox.setChecked(self.config["quality_governor"])
+        self.threads_spinbox.setValue(self.config["resize_threads"])
+        self.export_checkbox.setChecked(self.config["shm_export"])
+        self.stretch_checkbox.setChecked(self.config["contrast_stretch"])
+        self.clahe_checkbox.setChecked(self.config["clahe"])
+        self.gamma_spinbox.setValue(self.config["gamma"])
+        self.sharpen_spinbox.setValue(self.config["sharpen"])
+        self.motion_checkbox.setChecked(self.config["motion_highlight"])
+        self.motion_threshold_spinbox.setValue(self.config["motion_threshold"])
+        self.motion_budget_spinbox.setValue(self.config["motion_budget_ms"])
\ No newline at end of file
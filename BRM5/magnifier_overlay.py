@@ -3,15 +3,25 @@
 # ============================================================================
 
 import sys
-import cv2
+import time
 import numpy as np
 from mss import mss
 import json
 import os
 
-from PyQt5.QtWidgets import QLabel, QWidget
-from PyQt5.QtGui import QPixmap, QImage, QCursor
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import QApplication, QWidget
+from PyQt5.QtGui import QCursor, QPainter, QColor, QRegion
+from PyQt5.QtCore import Qt, QTimer, QRect
+
+import event_log
+from trace_log import tracer
+from image_backend import get_backend, wrap_qimage
+from cursor_predictor import make_predictor, clamp_offset
+from quality_governor import QualityGovernor
+from image_enhance import EnhancementStage, DEFAULT_ENHANCE_CONFIG
+from motion_highlight import MotionHighlighter, DEFAULT_MOTION_CONFIG
+from tiled_resize import TiledResizer, DEFAULT_RESIZE_THREADS, DEFAULT_TILE_MIN_PIXELS
+from frame_export import SharedFrameExporter, DEFAULT_EXPORT_CONFIG
 
 MAIN_CONFIG_FILE = "viewfinder_config.json"
 
@@ -20,15 +30,38 @@ DEFAULT_MAGNIFIER_CONFIG = {
     "radius": 120,
     "window_size": 400,
     "timer_ms": 33,
-    "mag_detection_pos": [1718, 877]
+    "mag_detection_pos": [1718, 877],
+    "image_backend": "auto",
+    "lens_indicator": "box",
+    "cursor_prediction": "off",
+    "interpolation": "linear",
+    "quality_governor": True,
+    "resize_threads": DEFAULT_RESIZE_THREADS,
+    "tile_min_pixels": DEFAULT_TILE_MIN_PIXELS,
+    **DEFAULT_ENHANCE_CONFIG,
+    **DEFAULT_MOTION_CONFIG,
+    **DEFAULT_EXPORT_CONFIG,
+    "probe_cache": {}
 }
 
+LENS_INDICATORS = ("box", "corners", "none")
+INDICATOR_COLOR = QColor(0, 255, 0)
+INDICATOR_THICKNESS = 3
+
+# Smoothing for the grab -> on-screen latency estimate the predictor leads by
+LATENCY_EMA = 0.1
+
 class MagnifierOverlay:
-    def __init__(self, config=None):
-        self.config = config if config is not None else self.load_config()
+    def __init__(self, config=None, on_first_frame=None):
+        self.config = {**DEFAULT_MAGNIFIER_CONFIG, **config} if config is not None else self.load_config()
         self.sct = mss()
         self.magnified_window = None
         self.lens_window = None
+        self.on_first_frame = on_first_frame
+        self.visible = True
+        self.native_ops = 0
+        self.recorder = None
+        self.exporter = None
 
     def load_config(self):
         if os.path.exists(MAIN_CONFIG_FILE):
@@ -38,47 +71,149 @@ class MagnifierOverlay:
                     loaded_magnifier = main_config.get("magnifier", {})
                     return {**DEFAULT_MAGNIFIER_CONFIG, **loaded_magnifier}
             except Exception as e:
-                print(f"[WARN] Could not load magnifier config from {MAIN_CONFIG_FILE}: {e}")
+                event_log.warn(f"Could not load magnifier config from {MAIN_CONFIG_FILE}: {e}")
         return DEFAULT_MAGNIFIER_CONFIG.copy()
 
     def create_windows(self):
         try:
-            self.magnified_window = MagnifiedView(self.config["window_size"])
+            pipeline = MagnifierPipeline.from_config(self.config)
+            self.magnified_window = MagnifiedView(self.config["window_size"], pipeline.backend)
             self.lens_window = LensWindow(
                 self.magnified_window,
                 self.sct,
                 self.config["scale"],
                 self.config["radius"],
-                self.config["timer_ms"]
+                self.config["timer_ms"],
+                pipeline,
+                self.config.get("lens_indicator", "box"),
+                make_predictor(self.config.get("cursor_prediction", "off")),
+                self.config.get("quality_governor", True)
             )
-            self.magnified_window.show()
-            self.lens_window.show()
+            self.lens_window.first_frame_callback = self.on_first_frame
+            self.lens_window.recorder = self.recorder
+            self.lens_window.exporter = self.update_exporter()
+            self.on_first_frame = None
+            if self.visible:
+                for window in self.windows():
+                    window.show()
+                    self.native_ops += 1
         except Exception as e:
-            print(f"[ERROR] Failed to create magnifier windows: {e}")
+            event_log.exception(f"Failed to create magnifier windows: {e}")
+
+    def get_stats(self):
+        stats = {"visible": self.visible, "native_ops": self.native_ops}
+        if self.lens_window:
+            stats.update(self.lens_window.get_stats())
+        if self.exporter is not None:
+            stats["export"] = self.exporter.get_stats()
+        return stats
+
+    def update_exporter(self):
+        # Kept across reloads so readers stay attached; recreated only when
+        # the segment itself changes
+        if self.exporter is not None and not (self.config.get("shm_export") and self.exporter.matches(self.config)):
+            self.exporter.close()
+            self.exporter = None
+        if self.exporter is None:
+            self.exporter = SharedFrameExporter.from_config(self.config)
+        return self.exporter
+
+    def close(self):
+        if self.lens_window:
+            self.lens_window.stop()
+        if self.exporter is not None:
+            self.exporter.close()
+            self.exporter = None
+
+    def set_recorder(self, recorder):
+        self.recorder = recorder
+        if self.lens_window:
+            self.lens_window.recorder = recorder
+
+    def set_scale(self, scale):
+        # Takes effect on the next frame, without rebuilding the windows
+        self.config["scale"] = scale
+        if self.lens_window:
+            self.lens_window.scale = scale
+            self.lens_window.pipeline.scale = scale
+
+    def windows(self):
+        if not (self.magnified_window and self.lens_window):
+            return []
+        if self.lens_window.shows_indicator:
+            return [self.magnified_window, self.lens_window]
+        return [self.magnified_window]
 
     def set_visibility(self, visible):
-        if self.magnified_window and self.lens_window:
-            if visible:
-                if not self.magnified_window.isVisible():
-                    self.magnified_window.show()
-                if not self.lens_window.isVisible():
-                    self.lens_window.show()
-            else:
-                if self.magnified_window.isVisible():
-                    self.magnified_window.hide()
-                if self.lens_window.isVisible():
-                    self.lens_window.hide()
+        self.visible = visible
+        for window in self.windows():
+            if window.isVisible() != visible:
+                window.setVisible(visible)
+                self.native_ops += 1
 
     def reload_config(self, config=None):
-        self.config = config if config is not None else self.load_config()
+        if tracer.enabled:
+            tracer.begin("magnifier reload", "config")
+        self.config = {**DEFAULT_MAGNIFIER_CONFIG, **config} if config is not None else self.load_config()
         if self.magnified_window:
             self.magnified_window.close()
         if self.lens_window:
+            self.lens_window.stop()
             self.lens_window.close()
         self.create_windows()
+        if tracer.enabled:
+            tracer.end("magnifier reload", "config")
+
+def target_rect(window_size, w, h):
+    # Same placement the old centred QLabel gave: small frames are scaled
+    # up to fit (keeping aspect), large ones are shown 1:1 and cropped
+    if w < window_size or h < window_size:
+        fit = min(window_size / w, window_size / h)
+        w, h = max(1, int(w * fit)), max(1, int(h * fit))
+    return QRect((window_size - w) // 2, (window_size - h) // 2, w, h)
+
+# Everything between the raw BGRA grab and the displayed frame
+class MagnifierPipeline:
+    def __init__(self, scale, backend=None, interpolation="linear", enhance=None, motion=None, resizer=None):
+        self.scale = scale
+        self.backend = backend or get_backend()
+        self.interpolation = interpolation
+        self.enhance = enhance
+        self.motion = motion
+        self.resizer = resizer
+
+    @classmethod
+    def from_config(cls, config, live=True):
+        backend = get_backend(config.get("image_backend", "auto"))
+        return cls(
+            config["scale"],
+            backend,
+            config.get("interpolation", "linear"),
+            EnhancementStage.from_config(config, backend),
+            MotionHighlighter.from_config(config, backend),
+            TiledResizer.from_config(config, backend, live)
+        )
 
+    def process(self, frame_bgra, origin=None):
+        # Motion highlighting tints the capture in place, before upscaling
+        if self.motion is not None:
+            self.motion.process(frame_bgra, origin)
+        frame = frame_bgra if self.backend.channels == 4 else frame_bgra[..., :3]
+        resizer = self.resizer or self.backend
+        out = resizer.resize(frame, self.scale, self.interpolation)
+        # Enhancement runs at output resolution, on the resized buffer
+        if self.enhance is not None:
+            out = self.enhance.process(out)
+        return out
+
+    def close(self):
+        if self.resizer is not None:
+            self.resizer.close()
+
+# Paints the latest frame straight from its buffer: no per-frame QPixmap, no
+# label layout, and only the exposed part of the image is drawn
 class MagnifiedView(QWidget):
-    def __init__(self, window_size):
+    def __init__(self, window_size, backend=None):
         super().__init__()
         self.setWindowTitle("Magnified View")
         self.setWindowFlags(Qt.WindowStaysOnTopHint)
@@ -86,21 +221,89 @@ class MagnifiedView(QWidget):
 
         self._drag_pos = None
 
-        self.label = QLabel(self)
-        self.label.setAlignment(Qt.AlignCenter)
+        # OpenCV scales small frames up to the window once per frame; without
+        # it Qt does, also once per frame
+        self.cv2 = getattr(backend, "cv2", None)
+        self.frame = None
+        self.image = None
+        self.scaled = None
+        self.target = QRect()
+        self.frame_size = None
+        self.frame_time = None
+        self.latency_s = 0.0
+        self.smooth = True
+        self.paint_ms = 0.0
+
         self.setFixedSize(window_size, window_size)
-        self.label.resize(self.size())
 
-    def update_image(self, frame_bgr):
-        frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-        h, w, ch = frame_rgb.shape
-        qimg = QImage(frame_rgb.data, w, h, ch * w, QImage.Format_RGB888).copy()
-        pixmap = QPixmap.fromImage(qimg)
+    def update_image(self, frame_bgr, grab_time=None):
+        # BGR or BGRA straight from the backend; Qt reads either layout as-is.
+        # The QImage wraps the array, so keep the array alive until replaced.
+        frame_bgr = np.ascontiguousarray(frame_bgr)
+        h, w = frame_bgr.shape[:2]
+        self.frame_time = grab_time
+
+        resized = (w, h) != self.frame_size
+        if resized:
+            self.frame_size = (w, h)
+            self.target = self._target_rect(w, h)
+            self.scaled = None
+            # Opaque when the frame covers the window, so Qt skips the background fill
+            self.setAttribute(Qt.WA_OpaquePaintEvent, self.target.contains(self.rect()))
+
+        # Paints are always 1:1; any scaling happens here, once per frame
+        tw, th = self.target.width(), self.target.height()
+        if (tw, th) == (w, h):
+            self.frame = frame_bgr
+            self.image = wrap_qimage(frame_bgr)
+        elif self.cv2 is not None:
+            cv2 = self.cv2
+            if self.scaled is None:
+                # BGRA paints without a per-paint conversion (Format_RGB32)
+                self.widened = np.empty((h, w, 4), np.uint8)
+                self.scaled = np.empty((th, tw, 4), np.uint8)
+                self.image = wrap_qimage(self.scaled)
+            source = frame_bgr
+            if frame_bgr.shape[2] == 3:
+                # Widen the small frame rather than the scaled one
+                source = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2BGRA, dst=self.widened)
+            flag = cv2.INTER_LINEAR if self.smooth else cv2.INTER_NEAREST
+            cv2.resize(source, (tw, th), dst=self.scaled, interpolation=flag)
+            self.frame = self.scaled
+        else:
+            mode = Qt.SmoothTransformation if self.smooth else Qt.FastTransformation
+            self.frame = frame_bgr
+            self.image = wrap_qimage(frame_bgr).scaled(tw, th, Qt.IgnoreAspectRatio, mode)
 
-        if w < self.window_size or h < self.window_size:
-            pixmap = pixmap.scaled(self.window_size, self.window_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        if resized:
+            self.update()
+        else:
+            self.update(self.target)
 
-        self.label.setPixmap(pixmap)
+    def _target_rect(self, w, h):
+        return target_rect(self.window_size, w, h)
+
+    def paintEvent(self, event):
+        if self.image is None:
+            return
+        exposed = event.rect().intersected(self.target)
+        if exposed.isEmpty():
+            return
+        start = time.perf_counter()
+        painter = QPainter(self)
+        painter.drawImage(exposed, self.image, exposed.translated(-self.target.topLeft()))
+        painter.end()
+        end = time.perf_counter()
+        self.paint_ms = (end - start) * 1000.0
+        if tracer.enabled:
+            tracer.complete("paint", start, "magnifier", end)
+
+        if self.frame_time is not None:
+            latency = time.perf_counter() - self.frame_time
+            if self.latency_s:
+                latency = self.latency_s + LATENCY_EMA * (latency - self.latency_s)
+            self.latency_s = latency
+            self.frame_time = None
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
@@ -114,44 +317,162 @@ class MagnifiedView(QWidget):
     def mouseReleaseEvent(self, event):
         self._drag_pos = None
 
+# Follows the cursor at display rate, independent of the capture timer, and
+# only notifies when the position actually changed
+class CursorTracker:
+    def __init__(self, callback, interval_ms=None, on_sample=None):
+        self.callback = callback
+        self.on_sample = on_sample
+        self.last_pos = None
+        self.moves = 0
+
+        if interval_ms is None:
+            screen = QApplication.primaryScreen()
+            rate = screen.refreshRate() if screen else 0
+            interval_ms = int(1000 / rate) if rate >= 30 else 16
+        self.timer = QTimer()
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.poll)
+        self.timer.setInterval(interval_ms)
+
+    def start(self):
+        self.last_pos = None
+        self.poll()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def poll(self):
+        pos = QCursor.pos()
+        if self.on_sample:
+            self.on_sample(pos)
+        if pos != self.last_pos:
+            self.last_pos = pos
+            self.moves += 1
+            self.callback(pos)
+
+def indicator_region(mode, size, thickness=INDICATOR_THICKNESS):
+    # Window shape for the lens outline. Only these pixels belong to the
+    # window, so nothing translucent has to be blended over the game.
+    t = thickness
+    if mode == "corners":
+        tick = max(t * 3, size // 6)
+        region = QRegion()
+        for x, y in ((0, 0), (size - tick, 0), (0, size - t), (size - tick, size - t)):
+            region = region.united(QRegion(x, y, tick, t))
+        for x, y in ((0, 0), (size - t, 0), (0, size - tick), (size - t, size - tick)):
+            region = region.united(QRegion(x, y, t, tick))
+        return region
+    return QRegion(0, 0, size, size).subtracted(QRegion(t, t, size - 2 * t, size - 2 * t))
+
 class LensWindow(QWidget):
-    def __init__(self, magnified_window, sct, scale, radius, timer_ms):
+    def __init__(self, magnified_window, sct, scale, radius, timer_ms, pipeline=None, indicator="box", predictor=None, governed=False):
         super().__init__()
         self.magnified_window = magnified_window
         self.sct = sct
         self.scale = scale
         self.radius = radius
+        self.pipeline = pipeline or MagnifierPipeline(scale)
+        if indicator not in LENS_INDICATORS:
+            event_log.warn(f"Unknown lens indicator '{indicator}', using box")
+            indicator = "box"
+        self.indicator = indicator
+        self.predictor = predictor
+        self.timer_s = timer_ms / 1000.0
+        self.governor = None
+        if governed:
+            backend = self.pipeline.backend
+            self.governor = QualityGovernor(backend.interpolations, self.pipeline.interpolation, timer_ms)
+            self.pipeline.interpolation = self.governor.tier
+        self.magnified_window.smooth = self.pipeline.interpolation != "nearest"
 
         self.setWindowFlags(
             Qt.FramelessWindowHint |
             Qt.WindowStaysOnTopHint |
             Qt.WindowTransparentForInput
         )
-        self.setAttribute(Qt.WA_TranslucentBackground)
-
-        self.label = QLabel(self)
-        self.label.setStyleSheet("background: transparent;")
-        self.label.setAttribute(Qt.WA_TranslucentBackground)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
 
         self.setFixedSize(radius * 2, radius * 2)
-        self.label.resize(self.size())
-
-        self.border_overlay = np.zeros((radius * 2, radius * 2, 4), dtype=np.uint8)
-        cv2.rectangle(self.border_overlay, (0, 0), (radius * 2 - 1, radius * 2 - 1), (0, 255, 0, 255), 3)
+        if indicator != "none":
+            self.setMask(indicator_region(indicator, radius * 2))
 
-        w, h = radius * 2, radius * 2
-        qimg = QImage(self.border_overlay.data, w, h, 4 * w, QImage.Format_RGBA8888).copy()
-        self.border_pixmap = QPixmap.fromImage(qimg)
-        self.label.setPixmap(self.border_pixmap)
+        self.tracker = CursorTracker(self.follow_cursor, on_sample=self.add_sample if predictor else None)
+        self.first_frame_callback = None
+        self.recorder = None
+        self.exporter = None
+        self.frames = 0
+        self.tick_ms = 0.0
 
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_frame)
         self.timer.start(timer_ms)
+        QTimer.singleShot(0, self.update_frame)
+
+    @property
+    def shows_indicator(self):
+        return self.indicator != "none"
+
+    def add_sample(self, pos):
+        self.predictor.add(time.perf_counter(), pos.x(), pos.y())
+
+    def capture_center(self, pos):
+        if self.predictor is None:
+            return pos.x(), pos.y()
+        now = time.perf_counter()
+        self.predictor.add(now, pos.x(), pos.y())
+        # Aim where the cursor will be when this frame reaches the screen
+        lead = self.magnified_window.latency_s or self.timer_s
+        predicted = self.predictor.predict(lead, now)
+        dx, dy = clamp_offset(predicted[0] - pos.x(), predicted[1] - pos.y(), self.radius)
+        return int(round(pos.x() + dx)), int(round(pos.y() + dy))
+
+    def follow_cursor(self, pos):
+        self.move(pos.x() - self.radius, pos.y() - self.radius)
+
+    def showEvent(self, event):
+        self.tracker.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.tracker.stop()
+        super().hideEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), INDICATOR_COLOR)
+        painter.end()
+
+    def stop(self):
+        self.timer.stop()
+        self.tracker.stop()
+        self.pipeline.close()
+
+    def get_stats(self):
+        stats = {
+            "frames": self.frames,
+            "tick_ms": round(self.tick_ms, 3),
+            "scale": self.pipeline.scale,
+            "interpolation": self.pipeline.interpolation,
+            "backend": self.pipeline.backend.name,
+            "latency_ms": round(self.magnified_window.latency_s * 1000.0, 2),
+            "paint_ms": round(self.magnified_window.paint_ms, 3),
+            "cursor_moves": self.tracker.moves,
+        }
+        if self.governor is not None:
+            stats["governor"] = self.governor.get_stats()
+        if self.pipeline.enhance is not None:
+            stats["enhance_ms"] = self.pipeline.enhance.get_stats()
+        if self.pipeline.resizer is not None:
+            stats["resize"] = self.pipeline.resizer.get_stats()
+        if self.pipeline.motion is not None:
+            stats["motion"] = self.pipeline.motion.get_stats()
+        return stats
 
     def update_frame(self):
-        pos = QCursor.pos()
-        x, y = pos.x(), pos.y()
-        self.move(x - self.radius, y - self.radius)
+        grab_time = time.perf_counter()
+        x, y = self.capture_center(QCursor.pos())
 
         mon = {
             "left": x - self.radius,
@@ -161,9 +482,32 @@ class LensWindow(QWidget):
         }
 
         try:
-            sct_img = self.sct.grab(mon)
-            frame = np.array(sct_img)[..., :3]
-            magnified = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_LINEAR)
-            self.magnified_window.update_image(magnified)
+            frame = np.array(self.sct.grab(mon))
+            if self.recorder is not None:
+                self.recorder.append(grab_time, x, y, frame)
+            if tracer.enabled:
+                tracer.complete("grab", grab_time, "magnifier")
+                tracer.begin("pipeline", "magnifier")
+            magnified = self.pipeline.process(frame, (x, y))
+            if tracer.enabled:
+                tracer.end("pipeline", "magnifier")
+            if self.exporter is not None:
+                self.exporter.publish(magnified, grab_time)
+            self.magnified_window.update_image(magnified, grab_time)
+            tick_ms = (time.perf_counter() - grab_time) * 1000.0
+            self.tick_ms = tick_ms if not self.frames else self.tick_ms + LATENCY_EMA * (tick_ms - self.tick_ms)
+            self.frames += 1
+            if self.governor is not None:
+                # Last paint stands in for this frame's, which hasn't happened yet
+                tier = self.governor.record(tick_ms + self.magnified_window.paint_ms)
+                if tier != self.pipeline.interpolation:
+                    event_log.info(f"Magnifier quality: {self.pipeline.interpolation} -> {tier} ({self.governor.cost_ms:.1f} ms per frame, budget {self.governor.budget_ms} ms)")
+                    self.pipeline.interpolation = tier
+                    self.magnified_window.smooth = tier != "nearest"
+            if tracer.enabled:
+                tracer.complete("capture tick", grab_time, "magnifier")
+            if self.first_frame_callback is not None:
+                callback, self.first_frame_callback = self.first_frame_callback, None
+                callback()
         except Exception as e:
-            print(f"[WARN] Capture failed: {e}")
\ No newline at end of file
+            event_log.warn(f"Capture failed: {e}", key="magnifier.capture")
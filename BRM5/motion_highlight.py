@@ -0,0 +1,233 @@
+# ============================================================================
+#                          motion_highlight.py
+# ============================================================================
+
+import time
+import numpy as np
+
+import event_log
+
+DEFAULT_MOTION_CONFIG = {
+    "motion_highlight": False,
+    "motion_threshold": 24,
+    "motion_rate": 0.05,
+    "motion_budget_ms": 2.0
+}
+
+# Tint for moving pixels (BGR) and how much of it replaces the original colour
+MOTION_TINT = (255, 0, 255)
+TINT_SHIFT = 1
+COST_EMA = 0.2
+# More than this fraction moving at once is a camera pan, not a target
+GLOBAL_MOTION = 0.35
+# (sample step, morphology) from full quality to cheapest
+MOTION_LEVELS = ((1, True), (1, False), (2, True), (2, False))
+UP_RATIO = 0.5
+UP_FRAMES = 60
+
+# Pre-upscale stage: keeps an exponential moving average of the capture's luma
+# and tints pixels that differ from it. Runs in place on the BGR(A) capture so
+# it costs capture-sized work, not output-sized. When the capture origin moves
+# (the lens follows the cursor) the average is shifted along with it and only
+# the newly exposed strips are reseeded. When the running cost passes
+# motion_budget_ms it drops morphology, then samples every other pixel; a
+# frame whose differencing would push it over budget is left untinted.
+class MotionHighlighter:
+    def __init__(self, config=None, backend=None):
+        self.config = {**DEFAULT_MOTION_CONFIG, **(config or {})}
+        self.cv2 = getattr(backend, "cv2", None)
+        self.threshold = float(self.config["motion_threshold"])
+        self.rate = min(max(float(self.config["motion_rate"]), 0.001), 1.0)
+        self.budget_ms = float(self.config["motion_budget_ms"])
+        self.level = 0
+        self.cost_ms = None
+        self.stage_ms = None
+        self.good_frames = 0
+        self.shape = None
+        self.origin = None
+        self.stats = {
+            "frames": 0,
+            "tinted": 0,
+            "over_budget": 0,
+            "reseeds": 0,
+            "shifts": 0,
+            "level_changes": 0,
+        }
+        self.moving = 0.0
+
+    @classmethod
+    def from_config(cls, config, backend=None):
+        if not config.get("motion_highlight", False):
+            return None
+        return cls({key: config[key] for key in DEFAULT_MOTION_CONFIG if key in config}, backend)
+
+    @property
+    def step(self):
+        return MOTION_LEVELS[self.level][0]
+
+    def _buffers(self, frame):
+        step = self.step
+        key = (frame.shape, step)
+        if key == self.shape:
+            return False
+        self.shape = key
+        h, w = frame.shape[:2]
+        sh, sw = (h + step - 1) // step, (w + step - 1) // step
+        self.background = np.empty((sh, sw), np.float32)
+        self.luma = np.empty((sh, sw), np.float32)
+        self.diff = np.empty((sh, sw), np.float32)
+        self.mask = np.empty((sh, sw), np.uint8)
+        self.gray = np.empty((sh, sw), np.uint8)
+        self.scratch = np.empty((sh, sw), np.uint8)
+        self.full_mask = np.empty((h, w), np.uint8) if step > 1 else None
+        return True
+
+    def _load_luma(self, frame):
+        sample = frame[::self.step, ::self.step]
+        if self.cv2 is not None:
+            cv2 = self.cv2
+            code = cv2.COLOR_BGRA2GRAY if frame.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+            cv2.cvtColor(np.ascontiguousarray(sample), code, dst=self.gray)
+            np.copyto(self.luma, self.gray)
+        else:
+            # Green is a cheap stand-in for luminance in BGR(A)
+            np.copyto(self.luma, sample[..., 1], casting="unsafe")
+
+    def reset(self):
+        self.shape = None
+        self.origin = None
+
+    def _reseed(self):
+        np.copyto(self.background, self.luma)
+        self.stats["reseeds"] += 1
+
+    def _shift(self, origin):
+        # Content moves opposite to the origin; keep the average aligned with
+        # it when the move is a whole number of samples and smaller than the lens
+        step = self.step
+        dx, dy = origin[0] - self.origin[0], origin[1] - self.origin[1]
+        if dx % step or dy % step:
+            return False
+        sx, sy = dx // step, dy // step
+        h, w = self.background.shape
+        if abs(sx) >= w or abs(sy) >= h:
+            return False
+        # Exposed strips start from the current capture; diff is free here
+        shifted = self.diff
+        np.copyto(shifted, self.luma)
+        shifted[max(0, -sy):h - max(0, sy), max(0, -sx):w - max(0, sx)] = \
+            self.background[max(0, sy):h - max(0, -sy), max(0, sx):w - max(0, -sx)]
+        self.background, self.diff = shifted, self.background
+        self.stats["shifts"] += 1
+        return True
+
+    def _open(self, mask):
+        # 3x3 opening removes isolated noise pixels
+        if self.cv2 is not None:
+            kernel = np.ones((3, 3), np.uint8)
+            self.cv2.morphologyEx(mask, self.cv2.MORPH_OPEN, kernel, dst=mask)
+            return
+        s = self.scratch
+        for op_a, op_b in ((np.minimum, np.minimum), (np.maximum, np.maximum)):
+            np.copyto(s, mask)
+            op_a(s[1:], mask[:-1], out=s[1:])
+            op_a(s[:-1], mask[1:], out=s[:-1])
+            np.copyto(mask, s)
+            op_b(mask[:, 1:], s[:, :-1], out=mask[:, 1:])
+            op_b(mask[:, :-1], s[:, 1:], out=mask[:, :-1])
+
+    def _expand(self):
+        if self.full_mask is None:
+            return self.mask
+        full, step = self.full_mask, self.step
+        for dy in range(step):
+            for dx in range(step):
+                part = full[dy::step, dx::step]
+                part[...] = self.mask[:part.shape[0], :part.shape[1]]
+        return full
+
+    def _tint(self, frame, mask):
+        where = mask.view(bool)
+        for channel, value in enumerate(MOTION_TINT):
+            plane = frame[..., channel]
+            np.right_shift(plane, TINT_SHIFT, out=plane, where=where)
+            np.add(plane, value >> TINT_SHIFT, out=plane, where=where, casting="unsafe")
+
+    def process(self, frame, origin=None):
+        start = time.perf_counter()
+        self.stats["frames"] += 1
+        fresh = self._buffers(frame)
+        self._load_luma(frame)
+
+        if origin != self.origin:
+            moved = not fresh and origin is not None and self.origin is not None and self._shift(origin)
+            self.origin = origin
+            if not moved:
+                fresh = True
+        if fresh:
+            # New buffers or a jump the average can't follow
+            self._reseed()
+            self._record(start)
+            return frame
+
+        # Skip the differencing when its usual cost would overrun the budget
+        stage = time.perf_counter()
+        if self.stage_ms is not None:
+            predicted = (stage - start) * 1000.0 + self.stage_ms
+            if predicted > self.budget_ms:
+                self.stats["over_budget"] += 1
+                self._record(start, predicted)
+                return frame
+
+        np.subtract(self.luma, self.background, out=self.diff)
+        # background += rate * (luma - background)
+        np.multiply(self.diff, self.rate, out=self.luma)
+        self.background += self.luma
+        np.abs(self.diff, out=self.diff)
+        np.greater(self.diff, self.threshold, out=self.mask.view(bool))
+
+        if MOTION_LEVELS[self.level][1]:
+            self._open(self.mask)
+        self.moving = float(np.count_nonzero(self.mask)) / self.mask.size
+        if self.moving > GLOBAL_MOTION:
+            self._reseed()
+        elif self.moving > 0:
+            self._tint(frame, self._expand())
+            self.stats["tinted"] += 1
+        ms = (time.perf_counter() - stage) * 1000.0
+        self.stage_ms = ms if self.stage_ms is None else self.stage_ms + COST_EMA * (ms - self.stage_ms)
+        self._record(start)
+        return frame
+
+    def _record(self, start, ms=None):
+        # ms overrides the measured cost for frames that skipped the work
+        if ms is None:
+            ms = (time.perf_counter() - start) * 1000.0
+        self.cost_ms = ms if self.cost_ms is None else self.cost_ms + COST_EMA * (ms - self.cost_ms)
+        if self.cost_ms > self.budget_ms and self.level < len(MOTION_LEVELS) - 1:
+            self._set_level(self.level + 1)
+        elif self.cost_ms < self.budget_ms * UP_RATIO and self.level > 0:
+            self.good_frames += 1
+            if self.good_frames >= UP_FRAMES:
+                self._set_level(self.level - 1)
+        else:
+            self.good_frames = 0
+
+    def _set_level(self, level):
+        step, morph = MOTION_LEVELS[level]
+        event_log.info(f"Motion highlight: step {step}, morphology {'on' if morph else 'off'} "
+                       f"({self.cost_ms:.2f} ms per frame, budget {self.budget_ms} ms)", key="motion.level")
+        self.level = level
+        self.good_frames = 0
+        self.stats["level_changes"] += 1
+        # Cost estimates belong to the old level; buffers resize on next frame
+        self.cost_ms = None
+        self.stage_ms = None
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats["cost_ms"] = round(self.cost_ms, 3) if self.cost_ms is not None else None
+        stats["budget_ms"] = self.budget_ms
+        stats["step"], stats["morphology"] = MOTION_LEVELS[self.level]
+        stats["moving"] = round(self.moving, 4)
+        return stats
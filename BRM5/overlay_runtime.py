@@ -0,0 +1,529 @@
+# ============================================================================
+#                           overlay_runtime.py
+# ============================================================================
+
+import sys
+import time
+import copy
+import threading
+import json
+import os
+
+try:
+    import keyboard
+    _HAS_KEYBOARD = True
+except ImportError:
+    _HAS_KEYBOARD = False
+    print("[WARN] 'keyboard' library not found. Install with: pip install keyboard")
+    sys.exit(1)
+
+from PyQt5.QtCore import QTimer, QObject, pyqtSignal
+
+import event_log
+import trace_log
+from trace_log import tracer
+from sampling_profiler import PROFILE_ENV
+from config_defaults import DEFAULT_CONFIG
+from startup_timeline import StartupTimeline, BackgroundImporter
+from crosshair_overlay import start_crosshair_thread
+from overlay_toggles import OverlayToggles
+from instructions_menu import InstructionsMenu
+from visibility_state import VisibilityStateMachine
+from detection import detect_yellow_in_region
+from probe_calibration import screen_key, cached_probe
+
+CONFIG_FILE = "viewfinder_config.json"
+
+DETECTION_CHECK_MS = 100
+KEY_DEBOUNCE_S = 0.2
+STARTUP_REPORT_TIMEOUT_MS = 10000
+
+# numpy, mss and (unless the NumPy backend is selected) cv2 are loaded on a
+# worker thread after the first windows are up; magnifier_overlay goes last
+BACKGROUND_MODULES = ["numpy", "mss", "cv2", "image_backend", "magnifier_overlay"]
+
+def background_modules(config):
+    if config.get("magnifier", {}).get("image_backend", "auto") == "numpy":
+        return [name for name in BACKGROUND_MODULES if name != "cv2"]
+    return list(BACKGROUND_MODULES)
+
+def merge_config(loaded):
+    config = {}
+    for key in DEFAULT_CONFIG:
+        if key in loaded and isinstance(DEFAULT_CONFIG[key], dict):
+            config[key] = {**DEFAULT_CONFIG[key], **loaded[key]}
+        elif key in loaded:
+            config[key] = loaded[key]
+        else:
+            config[key] = copy.deepcopy(DEFAULT_CONFIG[key])
+    return config
+
+def load_config():
+    if os.path.exists(CONFIG_FILE):
+        try:
+            with open(CONFIG_FILE, "r") as f:
+                return merge_config(json.load(f))
+        except Exception as e:
+            event_log.exception(f"Could not load config: {e}")
+    return merge_config({})
+
+# Auto-detect input for the visibility state machine: polls the detection
+# pixel and reports changes, never touches windows itself
+class VisibilityController:
+    def __init__(self, visibility_state, mag_detection_pos):
+        self.visibility_state = visibility_state
+        self.mag_detection_pos = mag_detection_pos
+        self.recorder = None
+        self.toggle_lock = threading.Lock()
+        self.last_toggle_time = 0
+
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.check_and_update)
+        self.timer.start(DETECTION_CHECK_MS)
+
+    @property
+    def auto_detect_enabled(self):
+        return self.visibility_state.auto_detect
+
+    def toggle_auto_detect(self):
+        current_time = time.time()
+        with self.toggle_lock:
+            if current_time - self.last_toggle_time < 0.3:
+                return
+            self.last_toggle_time = current_time
+        enabled = not self.visibility_state.auto_detect
+        self.visibility_state.set_auto_detect(enabled)
+        event_log.info(f"Auto-detection {'ENABLED' if enabled else 'DISABLED'}")
+
+    def check_and_update(self):
+        state = self.visibility_state
+        # Nothing to decide while everything is hidden by hand
+        if not state.auto_detect or state.hide_all:
+            return
+        if tracer.enabled:
+            tracer.begin("detection check", "detect")
+        try:
+            yellow_detected = detect_yellow_in_region(self.mag_detection_pos, self.recorder)
+            if state.set_detected(yellow_detected):
+                if yellow_detected:
+                    event_log.info("Gun equipped - showing overlays")
+                else:
+                    event_log.info("Gun holstered - hiding overlays")
+        except Exception as e:
+            event_log.warn(f"Check failed: {e}", key="detect.check")
+        if tracer.enabled:
+            tracer.end("detection check", "detect")
+
+class GuiDispatcher(QObject):
+    toggle_all_signal = pyqtSignal()
+    toggle_auto_signal = pyqtSignal()
+    exit_signal = pyqtSignal()
+    dump_log_signal = pyqtSignal()
+    open_config_signal = pyqtSignal()
+    toggle_recording_signal = pyqtSignal()
+    toggle_profiler_signal = pyqtSignal()
+    modules_ready_signal = pyqtSignal()
+    crosshair_ready_signal = pyqtSignal()
+
+def format_key_name(key):
+    if len(key) == 1:
+        return key.upper()
+    return key.capitalize()
+
+# Owns every overlay for the lifetime of the QApplication. start() brings the
+# overlays up from a config dict; apply_config() swaps in a new one (e.g. from
+# the in-process config menu) without restarting anything.
+class OverlayRuntime:
+    def __init__(self, app, timeline=None, importer=None):
+        self.app = app
+        self.timeline = timeline or StartupTimeline()
+        self.importer = importer
+        self.config = None
+        self.started = False
+
+        self.gui = GuiDispatcher()
+        self.magnifier_overlay = None
+        self.crosshair_overlay = None
+        self.menu = None
+        self.config_menu = None
+        self.visibility_state = VisibilityStateMachine()
+        # Registered up front so the magnifier can be created in the right state
+        self.visibility_state.register("magnifier", None)
+        self.visibility_controller = None
+        self.overlay_toggles = None
+        self.recorder = None
+        self.profiler = None
+        self.control_server = None
+        self.key_bindings = []
+
+    def start(self, config):
+        self.config = merge_config(config)
+        self.started = True
+        self.app.setQuitOnLastWindowClosed(False)
+
+        event_log.configure(self.config.get("logging"))
+        trace_log.configure(self.config.get("tracing"))
+        event_log.info("Starting overlay system...")
+        if tracer.enabled:
+            event_log.info(f"Tracing on ({tracer.capacity} events); {format_key_name(self.config['keybinds']['dump_log'])} also exports a trace")
+
+        mag_config = self.config.get("magnifier", {})
+        mag_detection_pos, screen = self.detection_pos(mag_config)
+
+        self.gui.modules_ready_signal.connect(self._on_modules_ready)
+        self.gui.crosshair_ready_signal.connect(self._on_crosshair_ready)
+        self.gui.toggle_all_signal.connect(self._do_toggle_all_visibility)
+        self.gui.toggle_auto_signal.connect(self._do_toggle_auto)
+        self.gui.exit_signal.connect(self._do_exit)
+        self.gui.dump_log_signal.connect(self._do_dump_log)
+        self.gui.open_config_signal.connect(self.open_config_menu)
+        self.gui.toggle_recording_signal.connect(self._do_toggle_recording)
+        self.gui.toggle_profiler_signal.connect(self._do_toggle_profiler)
+
+        if self.importer is None:
+            self.importer = BackgroundImporter(background_modules(self.config), self.timeline).start()
+
+        try:
+            self.crosshair_overlay = start_crosshair_thread(
+                config=self.config.get("crosshair"),
+                on_ready=self.gui.crosshair_ready_signal.emit
+            )
+            self.visibility_state.register("crosshair", self.crosshair_overlay)
+        except Exception as e:
+            event_log.exception(f"Crosshair overlay failed: {e}")
+            self.crosshair_overlay = None
+
+        try:
+            self.menu = InstructionsMenu(self.config.get("keybinds"))
+            self.menu.show_in_top_right()
+            self.visibility_state.register("menu", self.menu, follows_toggle=False, follows_auto=False)
+            self.timeline.mark("instructions shown")
+        except Exception as e:
+            event_log.exception(f"Instructions menu failed: {e}")
+            self.menu = None
+
+        self.visibility_controller = VisibilityController(self.visibility_state, mag_detection_pos)
+        # Resolution or DPI changes switch to that screen's calibrated probe
+        self.app.primaryScreenChanged.connect(self._watch_screen)
+        self._watch_screen(self.app.primaryScreen())
+        self.overlay_toggles = OverlayToggles(self.visibility_state)
+
+        QTimer.singleShot(STARTUP_REPORT_TIMEOUT_MS, self.timeline.report)
+
+        self._bind_keys()
+        threading.Thread(target=self._key_poller, name="key-poller", daemon=True).start()
+        self._start_control_server()
+
+        keybinds = self.config.get("keybinds", {})
+        event_log.info("Overlays active")
+        event_log.info(f"Detection position: {mag_detection_pos}" + (f" (calibrated for {screen})" if screen else ""))
+        event_log.info("Auto-detection is OFF by default")
+        event_log.info("Hotkeys:")
+        event_log.info(f"  - {format_key_name(keybinds['auto_detect'])}: Toggle auto-detection")
+        event_log.info(f"  - {format_key_name(keybinds['exit'])}: Exit")
+        event_log.info(f"  - {format_key_name(keybinds['hide_all'])}: Hide all overlays")
+        event_log.info(f"  - {format_key_name(keybinds['toggle_magnifier'])}: Toggle magnifier")
+        event_log.info(f"  - {format_key_name(keybinds['toggle_crosshair'])}: Toggle crosshair")
+        event_log.info(f"  - {format_key_name(keybinds['dump_log'])}: Dump recent events")
+        event_log.info(f"  - {format_key_name(keybinds['open_config'])}: Open config menu")
+        event_log.info(f"  - {format_key_name(keybinds['toggle_recording'])}: Start/stop session recording")
+        event_log.info(f"  - {format_key_name(keybinds['toggle_profiler'])}: Start/stop profiler")
+        event_log.info("Running...")
+
+        # VIEWFINDER_PROFILE=<seconds> profiles from startup without a keypress
+        profile_s = os.environ.get(PROFILE_ENV)
+        if profile_s:
+            try:
+                self.start_profiler(float(profile_s))
+            except ValueError:
+                event_log.warn(f"{PROFILE_ENV} should be a number of seconds, got '{profile_s}'")
+
+        QTimer.singleShot(0, lambda: self.timeline.mark("event loop started"))
+
+        # Hooked up last: if the imports already finished (launcher flow) the
+        # magnifier is created right here
+        self.importer.when_ready(self.gui.modules_ready_signal.emit)
+
+    def detection_pos(self, mag_config):
+        # Cached calibration for the current screen, else the configured pixel;
+        # returns the position and the screen key it was calibrated for
+        key = screen_key()
+        cached = cached_probe(mag_config, key)
+        if cached is not None:
+            return cached, key
+        return tuple(mag_config.get("mag_detection_pos", [1718, 877])), None
+
+    def _watch_screen(self, screen):
+        if screen is None:
+            return
+        screen.geometryChanged.connect(self._on_screen_changed)
+        screen.logicalDotsPerInchChanged.connect(self._on_screen_changed)
+        self._on_screen_changed()
+
+    def _on_screen_changed(self, *args):
+        if self.visibility_controller is None:
+            return
+        pos, key = self.detection_pos(self.config.get("magnifier", {}))
+        if pos != self.visibility_controller.mag_detection_pos:
+            self.visibility_controller.mag_detection_pos = pos
+            event_log.info(f"Screen is now {screen_key()}; detection position {pos}" + (" (calibrated)" if key else " (not calibrated)"))
+
+    def apply_config(self, config):
+        if tracer.enabled:
+            tracer.begin("apply config", "config")
+        self.config = merge_config(config)
+        event_log.configure(self.config.get("logging"))
+        trace_log.configure(self.config.get("tracing"))
+
+        mag_config = self.config.get("magnifier", {})
+        if self.magnifier_overlay:
+            try:
+                self.magnifier_overlay.reload_config(mag_config)
+            except Exception as e:
+                event_log.exception(f"Magnifier reload failed: {e}")
+        if self.visibility_controller:
+            self.visibility_controller.mag_detection_pos = self.detection_pos(mag_config)[0]
+
+        if self.crosshair_overlay:
+            self.crosshair_overlay.reload_config(self.config.get("crosshair"))
+
+        if self.menu:
+            self.menu.set_keybinds(self.config.get("keybinds"))
+
+        control = self.config.get("control", {})
+        if self.control_server is None or control != self.control_server.config:
+            self._start_control_server()
+
+        self._bind_keys()
+        event_log.info("Configuration applied")
+        if tracer.enabled:
+            tracer.end("apply config", "config")
+
+    def open_config_menu(self):
+        if self.config_menu is not None and self.config_menu.isVisible():
+            self.config_menu.raise_()
+            self.config_menu.activateWindow()
+            return
+        from config_menu import MainConfigMenu
+        self.config_menu = MainConfigMenu(config=copy.deepcopy(self.config))
+        self.config_menu.run_requested.connect(self.apply_config)
+        self.config_menu.show()
+
+    def get_stats(self):
+        stats = {"visibility": self.visibility_state.get_stats()}
+        if self.magnifier_overlay:
+            stats["magnifier"] = self.magnifier_overlay.get_stats()
+        if self.crosshair_overlay:
+            stats["crosshair"] = self.crosshair_overlay.get_stats()
+        if self.recorder is not None:
+            stats["recording"] = self.recorder.get_stats()
+        if tracer.enabled:
+            stats["tracing"] = tracer.get_stats()
+        if self.control_server is not None:
+            stats["control"] = self.control_server.get_stats()
+        return stats
+
+    def _start_control_server(self):
+        if self.control_server is not None:
+            self.control_server.close()
+            self.control_server = None
+        control = self.config.get("control", {})
+        if not control.get("enabled"):
+            return
+        from control_server import ControlServer
+        server = ControlServer(self, dict(control))
+        if server.start():
+            self.control_server = server
+
+    # Entry points for the control socket; they run on the GUI thread like
+    # the hotkey handlers
+
+    def control_toggle(self, overlay):
+        state = self.visibility_state
+        if overlay == "all":
+            self._do_toggle_all_visibility()
+            return not state.hide_all
+        self.overlay_toggles.toggle(overlay)
+        return state.is_manual_on(overlay)
+
+    def set_magnifier_scale(self, scale):
+        self.config["magnifier"]["scale"] = scale
+        if self.magnifier_overlay is None:
+            return False
+        self.magnifier_overlay.set_scale(scale)
+        event_log.info(f"Magnifier zoom {scale}x", key="control.zoom")
+        return True
+
+    def set_auto_detect(self, enabled):
+        if enabled != self.visibility_state.auto_detect:
+            self.visibility_state.set_auto_detect(enabled)
+            event_log.info(f"Auto-detection {'ENABLED' if enabled else 'DISABLED'}")
+
+    def reload_config(self):
+        self.apply_config(load_config())
+
+    def control_stats(self):
+        state = self.visibility_state
+        stats = {
+            "auto_detect": state.auto_detect,
+            "detected": state.detected,
+            "hide_all": state.hide_all,
+            "magnifier": state.has_overlay("magnifier") and state.desired("magnifier"),
+            "recording": self.recording(),
+        }
+        lens = self.magnifier_overlay.lens_window if self.magnifier_overlay else None
+        if lens is not None:
+            stats.update(
+                frames=lens.frames,
+                scale=lens.pipeline.scale,
+                tier=lens.pipeline.interpolation,
+                tick_ms=round(lens.tick_ms, 2),
+                paint_ms=round(lens.magnified_window.paint_ms, 2),
+                latency_ms=round(lens.magnified_window.latency_s * 1000.0, 1),
+            )
+        return stats
+
+    def _maybe_report_startup(self):
+        if self.timeline.has_mark("first magnifier frame") and (self.crosshair_overlay is None or self.timeline.has_mark("crosshair ready")):
+            self.timeline.report()
+
+    def _on_first_frame(self):
+        self.timeline.mark("first magnifier frame")
+        self._maybe_report_startup()
+
+    def _on_crosshair_ready(self):
+        self.timeline.mark("crosshair ready")
+        self._maybe_report_startup()
+
+    def _on_modules_ready(self):
+        if "magnifier_overlay" in self.importer.failed:
+            event_log.error(f"Magnifier overlay failed: {self.importer.failed['magnifier_overlay']}")
+            return
+        from magnifier_overlay import MagnifierOverlay
+        try:
+            magnifier_overlay = MagnifierOverlay(config=self.config.get("magnifier", {}), on_first_frame=self._on_first_frame)
+            # Created hidden if the current state says so, instead of flashing up
+            magnifier_overlay.visible = self.visibility_state.desired("magnifier")
+            magnifier_overlay.create_windows()
+            self.timeline.mark("magnifier windows created")
+        except Exception as e:
+            event_log.exception(f"Magnifier overlay failed: {e}")
+            return
+        self.magnifier_overlay = magnifier_overlay
+        self.visibility_state.register("magnifier", magnifier_overlay)
+
+    def _do_toggle_all_visibility(self):
+        state = self.visibility_state
+        state.set_hide_all(not state.hide_all)
+        if state.hide_all:
+            event_log.info("Hiding ALL overlays (manual override)")
+        else:
+            # Re-detect from scratch rather than trust a result from before the hide
+            state.set_detected(None)
+            event_log.info("Restoring ALL overlays")
+
+    def _do_toggle_auto(self):
+        self.visibility_controller.toggle_auto_detect()
+
+    def _set_recorder(self, recorder):
+        self.recorder = recorder
+        self.visibility_controller.recorder = recorder
+        if self.magnifier_overlay:
+            self.magnifier_overlay.set_recorder(recorder)
+
+    def recording(self):
+        return self.recorder is not None and not self.recorder.closed
+
+    def _do_toggle_recording(self):
+        if self.recording():
+            recorder = self.recorder
+            self._set_recorder(None)
+            recorder.close()
+            return
+        # A recorder that stopped itself (frame size change, minute limit)
+        # is dropped here so this press starts a new recording
+        self._set_recorder(None)
+        if self.magnifier_overlay is None:
+            event_log.warn("Recording needs the magnifier to be running")
+            return
+        from session_recorder import SessionRecorder, session_path
+        config = self.config.get("recording", {})
+        self._set_recorder(SessionRecorder(session_path(config), config))
+        event_log.info("Session recording started")
+
+    def start_profiler(self, duration_s=None):
+        from sampling_profiler import SamplingProfiler
+        self.profiler = SamplingProfiler(self.config.get("profiling"), duration_s).start()
+
+    def _do_toggle_profiler(self):
+        if self.profiler is not None and self.profiler.running:
+            event_log.info("Stopping profiler...")
+            self.profiler.stop()
+            return
+        self.start_profiler()
+
+    def _do_dump_log(self):
+        for name, stats in self.get_stats().items():
+            event_log.info(f"Stats {name}: {stats}")
+        event_log.dump()
+        if tracer.enabled:
+            try:
+                path, count = tracer.export()
+                event_log.info(f"Exported {count} trace events to {path}")
+            except Exception as e:
+                event_log.warn(f"Could not export trace: {e}")
+
+    def _do_exit(self):
+        event_log.info("Exiting...")
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.control_server is not None:
+            self.control_server.close()
+        if self.magnifier_overlay is not None:
+            self.magnifier_overlay.close()
+        try:
+            keyboard.unhook_all()
+        except Exception:
+            pass
+        try:
+            if self.crosshair_overlay:
+                self.crosshair_overlay.quit()
+        except Exception:
+            pass
+        try:
+            self.app.quit()
+        except Exception:
+            pass
+        sys.exit(0)
+
+    def _bind_keys(self):
+        keybinds = self.config.get("keybinds", {})
+        # Swapped in one assignment so the poller never sees a half-built list
+        self.key_bindings = [
+            ("auto_detect", keybinds["auto_detect"], self.gui.toggle_auto_signal.emit),
+            ("hide_all", keybinds["hide_all"], self.gui.toggle_all_signal.emit),
+            ("exit", keybinds["exit"], self.gui.exit_signal.emit),
+            ("toggle_magnifier", keybinds["toggle_magnifier"], self.overlay_toggles.toggle_magnifier_signal.emit),
+            ("toggle_crosshair", keybinds["toggle_crosshair"], self.overlay_toggles.toggle_crosshair_signal.emit),
+            ("dump_log", keybinds["dump_log"], self.gui.dump_log_signal.emit),
+            ("open_config", keybinds["open_config"], self.gui.open_config_signal.emit),
+            ("toggle_recording", keybinds["toggle_recording"], self.gui.toggle_recording_signal.emit),
+            ("toggle_profiler", keybinds["toggle_profiler"], self.gui.toggle_profiler_signal.emit),
+        ]
+
+    def _key_poller(self):
+        debounce_times = {}
+        while True:
+            now = time.time()
+            for action, key, emit in self.key_bindings:
+                try:
+                    pressed = keyboard.is_pressed(key)
+                except ValueError as e:
+                    event_log.warn(f"Invalid keybind for {action}: {e}", key=f"keybind.{action}")
+                    continue
+                if pressed and now - debounce_times.get(action, 0) > KEY_DEBOUNCE_S:
+                    if tracer.enabled:
+                        tracer.instant(f"hotkey {action}", "hotkey")
+                    emit()
+                    debounce_times[action] = now
+            time.sleep(0.01)
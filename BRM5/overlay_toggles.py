@@ -4,40 +4,44 @@
 
 from PyQt5.QtCore import QObject, pyqtSignal
 
+import event_log
+
+OVERLAY_NAMES = {"magnifier": "Magnifier", "crosshair": "Crosshair"}
+
 class OverlayToggles(QObject):
     toggle_magnifier_signal = pyqtSignal()
     toggle_crosshair_signal = pyqtSignal()
 
-    def __init__(self, magnifier_overlay, crosshair_overlay):
+    def __init__(self, visibility_state):
         super().__init__()
-        self.magnifier_overlay = magnifier_overlay
-        self.crosshair_overlay = crosshair_overlay
-        self.magnifier_visible = True
-        self.crosshair_visible = True
+        self.visibility_state = visibility_state
 
         self.toggle_magnifier_signal.connect(self._toggle_magnifier)
         self.toggle_crosshair_signal.connect(self._toggle_crosshair)
 
-    def _toggle_overlay(self, overlay, is_visible, name):
-        if overlay is None:
-            print(f"[WARN] {name} overlay not initialized")
-            return False
-        try:
-            overlay.set_visibility(is_visible)
-            print(f"[INFO] {name} {'ON' if is_visible else 'OFF'}")
-            return True
-        except Exception as e:
-            print(f"[ERROR] Failed to toggle {name}: {e}")
+    @property
+    def magnifier_visible(self):
+        return self.visibility_state.is_manual_on("magnifier")
+
+    @property
+    def crosshair_visible(self):
+        return self.visibility_state.is_manual_on("crosshair")
+
+    def _toggle_overlay(self, key, name):
+        visible = self.visibility_state.toggle_manual(key)
+        if visible is None:
+            event_log.warn(f"{name} overlay not initialized", key=f"toggle.{name}.missing")
             return False
+        event_log.info(f"{name} {'ON' if visible else 'OFF'}")
+        return True
+
+    # For callers already on the GUI thread; hotkeys go through the signals
+    def toggle(self, key):
+        return self._toggle_overlay(key, OVERLAY_NAMES[key])
 
     def _toggle_magnifier(self):
-        self.magnifier_visible = not self.magnifier_visible
-        if not self._toggle_overlay(self.magnifier_overlay, self.magnifier_visible, "Magnifier"):
-            self.magnifier_visible = not self.magnifier_visible
+        self.toggle("magnifier")
 
     def _toggle_crosshair(self):
-        self.crosshair_visible = not self.crosshair_visible
-        if not self._toggle_overlay(self.crosshair_overlay, self.crosshair_visible, "Crosshair"):
-            self.crosshair_visible = not self.crosshair_visible
-
+        self.toggle("crosshair")
 
@@ -0,0 +1,140 @@
+# ============================================================================
+#                          probe_calibration.py
+# ============================================================================
+
+import math
+import time
+
+import event_log
+from detection import yellow_mask
+
+# Where the weapon HUD sits at the resolution the default probe was tuned for;
+# used to rank candidates at other resolutions
+DEFAULT_PROBE_POS = (1718, 877)
+REFERENCE_SIZE = (1920, 1080)
+# The runtime samples a 5x5 patch around the probe and needs 2+ yellow pixels
+PATCH_RADIUS = 2
+MIN_COMPONENT_AREA = 8
+MAX_COMPONENT_FRACTION = 0.01
+MAX_CANDIDATES_TRIED = 8
+# Cell size of the NumPy fallback's coarse connected-components pass
+BLOCK = 4
+
+def screen_key(screen=None):
+    # "1920x1080@96": physical resolution and logical DPI of the screen
+    from PyQt5.QtGui import QGuiApplication
+    screen = screen or QGuiApplication.primaryScreen()
+    if screen is None:
+        return None
+    ratio = screen.devicePixelRatio()
+    size = screen.geometry().size()
+    return f"{round(size.width() * ratio)}x{round(size.height() * ratio)}@{round(screen.logicalDotsPerInch())}"
+
+def cached_probe(config, key):
+    pos = config.get("probe_cache", {}).get(key) if key else None
+    return tuple(pos) if pos else None
+
+def grab_screen():
+    import numpy as np
+    from mss import mss
+    with mss() as sct:
+        monitor = sct.monitors[1]
+        return np.array(sct.grab(monitor)), (monitor["left"], monitor["top"])
+
+def find_components(mask, use_opencv=True):
+    # Bounding boxes (x, y, w, h, area) of 8-connected regions of the mask
+    import numpy as np
+    if use_opencv:
+        try:
+            import cv2
+            _, _, stats, _ = cv2.connectedComponentsWithStats(mask.view(np.uint8), connectivity=8)
+            return [tuple(int(v) for v in row) for row in stats[1:]]
+        except ImportError:
+            pass
+    return _block_components(mask)
+
+def _block_components(mask):
+    # Without OpenCV: label BLOCK x BLOCK cells that contain any masked pixel.
+    # Coarser than per-pixel labeling (regions closer than a cell merge) but
+    # only touches occupied cells in Python.
+    import numpy as np
+    h, w = mask.shape
+    bh, bw = -(-h // BLOCK), -(-w // BLOCK)
+    padded = np.zeros((bh * BLOCK, bw * BLOCK), bool)
+    padded[:h, :w] = mask
+    counts = padded.reshape(bh, BLOCK, bw, BLOCK).sum(axis=(1, 3))
+    cells = zip(*(axis.tolist() for axis in np.nonzero(counts)))
+    occupied = (counts > 0).tolist()
+    counts = counts.tolist()
+    seen = set()
+    components = []
+    for by, bx in cells:
+        if (by, bx) in seen:
+            continue
+        seen.add((by, bx))
+        stack = [(by, bx)]
+        y0 = y1 = by
+        x0 = x1 = bx
+        area = 0
+        while stack:
+            cy, cx = stack.pop()
+            area += counts[cy][cx]
+            y0, y1, x0, x1 = min(y0, cy), max(y1, cy), min(x0, cx), max(x1, cx)
+            for ny in (cy - 1, cy, cy + 1):
+                if 0 <= ny < bh:
+                    row = occupied[ny]
+                    for nx in (cx - 1, cx, cx + 1):
+                        if 0 <= nx < bw and row[nx] and (ny, nx) not in seen:
+                            seen.add((ny, nx))
+                            stack.append((ny, nx))
+        left, top = x0 * BLOCK, y0 * BLOCK
+        components.append((left, top, min((x1 + 1) * BLOCK, w) - left, min((y1 + 1) * BLOCK, h) - top, area))
+    return components
+
+def probe_in_component(mask, box):
+    # The masked pixel in the box with the most masked pixels in its patch,
+    # nearest the box centre on ties; None if no patch would pass is_yellow
+    import numpy as np
+    x, y, w, h, _ = box
+    crop = mask[y:y + h, x:x + w]
+    size = 2 * PATCH_RADIUS + 1
+    integral = np.pad(np.pad(crop.astype(np.int32), PATCH_RADIUS).cumsum(0).cumsum(1), ((1, 0), (1, 0)))
+    counts = (integral[size:, size:] - integral[:-size, size:]
+              - integral[size:, :-size] + integral[:-size, :-size])
+    counts = np.where(crop, counts, 0)
+    best = int(counts.max()) if counts.size else 0
+    if best <= 1:
+        return None
+    ys, xs = np.nonzero(counts == best)
+    i = int(np.argmin((xs - w / 2.0) ** 2 + (ys - h / 2.0) ** 2))
+    return (x + int(xs[i]), y + int(ys[i])), best
+
+def calibrate(frame, use_opencv=True):
+    # Picks a probe pixel on the weapon HUD in a full-screen BGRA frame.
+    # Returns {"pos": [x, y] or None, "candidates": n, "fill": yellow pixels
+    # in the probe patch}, positions relative to the frame
+    h, w = frame.shape[:2]
+    mask = yellow_mask(frame)
+    expected = (DEFAULT_PROBE_POS[0] * w / REFERENCE_SIZE[0], DEFAULT_PROBE_POS[1] * h / REFERENCE_SIZE[1])
+    max_area = MAX_COMPONENT_FRACTION * w * h
+    candidates = [c for c in find_components(mask, use_opencv) if MIN_COMPONENT_AREA <= c[4] <= max_area]
+    candidates.sort(key=lambda c: math.hypot(c[0] + c[2] / 2.0 - expected[0], c[1] + c[3] / 2.0 - expected[1]))
+    for box in candidates[:MAX_CANDIDATES_TRIED]:
+        probe = probe_in_component(mask, box)
+        if probe is not None:
+            return {"pos": list(probe[0]), "candidates": len(candidates), "fill": probe[1]}
+    return {"pos": None, "candidates": len(candidates), "fill": 0}
+
+def calibrate_screen(use_opencv=True):
+    # One full-screen grab plus search; the position is in screen coordinates
+    frame, (left, top) = grab_screen()
+    start = time.perf_counter()
+    result = calibrate(frame, use_opencv)
+    result["ms"] = round((time.perf_counter() - start) * 1000.0, 1)
+    result["size"] = [frame.shape[1], frame.shape[0]]
+    if result["pos"] is not None:
+        result["pos"] = [result["pos"][0] + left, result["pos"][1] + top]
+        event_log.info(f"Probe calibrated at {tuple(result['pos'])} from {result['candidates']} candidate regions ({result['ms']} ms)")
+    else:
+        event_log.warn(f"Probe calibration found no weapon HUD ({result['candidates']} candidate regions)")
+    return result
@@ -0,0 +1,104 @@
+# ============================================================================
+#                          quality_governor.py
+# ============================================================================
+
+from image_backend import INTERPOLATIONS
+
+# Step down when the smoothed frame cost passes DOWN_RATIO of the budget for
+# DOWN_FRAMES frames in a row; step back up only after UP_FRAMES frames under
+# UP_RATIO. The gap between the two ratios is the hysteresis band.
+DOWN_RATIO = 0.85
+UP_RATIO = 0.5
+DOWN_FRAMES = 5
+UP_FRAMES = 90
+COST_EMA = 0.2
+
+# A step down soon after a step up means the higher tier doesn't fit; wait
+# longer before trying it again (up to MAX_BACKOFF times UP_FRAMES)
+MAX_BACKOFF = 8
+
+class QualityGovernor:
+    def __init__(self, tiers, ceiling, budget_ms):
+        self.tiers = [tier for tier in INTERPOLATIONS if tier in tiers]
+        self.ceiling = self._index_for(ceiling)
+        self.level = self.ceiling
+        self.budget_ms = budget_ms
+        self.cost_ms = None
+        self.over = 0
+        self.under = 0
+        self.backoff = 1
+        self.frames_since_up = None
+        self.steps_down = 0
+        self.steps_up = 0
+        # Smoothed cost seen at each tier, so load that isn't ours (a lower
+        # tier that wouldn't be cheaper) doesn't drag quality down for nothing
+        self.tier_cost = {}
+
+    def _index_for(self, tier):
+        # Backends serve interpolations they don't have as linear (NumPy has
+        # no cubic/lanczos), so that is the ceiling; ranking by position
+        # would pick "area", which is nearest when enlarging by whole factors
+        if tier not in self.tiers:
+            tier = "linear"
+        # Highest supported tier that is not above the requested one
+        rank = INTERPOLATIONS.index(tier) if tier in INTERPOLATIONS else INTERPOLATIONS.index("linear")
+        allowed = [i for i, t in enumerate(self.tiers) if INTERPOLATIONS.index(t) <= rank]
+        return allowed[-1] if allowed else 0
+
+    @property
+    def tier(self):
+        return self.tiers[self.level]
+
+    def record(self, cost_ms):
+        if self.cost_ms is None:
+            self.cost_ms = cost_ms
+        else:
+            self.cost_ms += COST_EMA * (cost_ms - self.cost_ms)
+        self.tier_cost[self.tier] = self.cost_ms
+        if self.frames_since_up is not None:
+            self.frames_since_up += 1
+            if self.frames_since_up >= UP_FRAMES:
+                # The step up held
+                self.backoff = 1
+                self.frames_since_up = None
+
+        if self.cost_ms > self.budget_ms * DOWN_RATIO:
+            self.over += 1
+            self.under = 0
+        elif self.cost_ms < self.budget_ms * UP_RATIO:
+            self.under += 1
+            self.over = 0
+        else:
+            self.over = self.under = 0
+
+        if self.over >= DOWN_FRAMES and self.level > 0 and not self._lower_no_cheaper():
+            if self.frames_since_up is not None and self.frames_since_up < UP_FRAMES:
+                self.backoff = min(self.backoff * 2, MAX_BACKOFF)
+            self.level -= 1
+            self.steps_down += 1
+            self.over = 0
+            self.frames_since_up = None
+        elif self.under >= UP_FRAMES * self.backoff and self.level < self.ceiling:
+            self.level += 1
+            self.steps_up += 1
+            self.under = 0
+            self.frames_since_up = 0
+        return self.tier
+
+    def _lower_no_cheaper(self):
+        lower = self.tier_cost.get(self.tiers[self.level - 1])
+        if lower is not None and lower >= self.cost_ms * 0.95:
+            self.over = 0
+            return True
+        return False
+
+    def get_stats(self):
+        return {
+            "tier": self.tier,
+            "ceiling": self.tiers[self.ceiling],
+            "cost_ms": round(self.cost_ms, 3) if self.cost_ms is not None else None,
+            "budget_ms": self.budget_ms,
+            "steps_down": self.steps_down,
+            "steps_up": self.steps_up,
+            "backoff": self.backoff,
+        }
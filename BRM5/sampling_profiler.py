@@ -0,0 +1,145 @@
+# ============================================================================
+#                          sampling_profiler.py
+# ============================================================================
+
+import os
+import sys
+import time
+import threading
+import tracemalloc
+from collections import Counter
+
+import event_log
+
+DEFAULT_PROFILING_CONFIG = {
+    "interval_ms": 5,
+    "duration_s": 30,
+    "directory": "profiles",
+    "tracemalloc": True,
+    "tracemalloc_top": 25,
+}
+
+# Set to a number of seconds to profile from startup
+PROFILE_ENV = "VIEWFINDER_PROFILE"
+
+def frame_label(code):
+    # Grouped by function (first line), not the line currently executing, so
+    # a hot loop folds into one box in the flame graph
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def collapse_stack(frame):
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+# Periodic stack sampler over every Python thread (GUI, key poller,
+# crosshair, resize workers), run for a fixed window from its own daemon
+# thread. Writes collapsed stacks ("thread;outer;...;inner count" per line,
+# the input format of flamegraph.pl, speedscope and inferno) and, when
+# enabled, the tracemalloc allocation growth over the same window.
+class SamplingProfiler:
+    def __init__(self, config=None, duration_s=None):
+        self.config = {**DEFAULT_PROFILING_CONFIG, **(config or {})}
+        self.interval_s = max(0.001, float(self.config["interval_ms"]) / 1000.0)
+        self.duration_s = float(duration_s if duration_s is not None else self.config["duration_s"])
+        self.stacks = Counter()
+        self.samples = 0
+        self.sample_s = 0.0
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.started_tracemalloc = False
+        self.baseline = None
+        self.outputs = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        if self.config["tracemalloc"]:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started_tracemalloc = True
+            self.baseline = tracemalloc.take_snapshot()
+        self.thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self.thread.start()
+        event_log.info(f"Profiling for {self.duration_s:.0f}s (sampling every {self.interval_s * 1000:.0f} ms)")
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _run(self):
+        own = threading.get_ident()
+        started = time.perf_counter()
+        deadline = started + self.duration_s
+        while not self.stop_event.is_set() and time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            self.sample(own)
+            self.sample_s += time.perf_counter() - t0
+            self.stop_event.wait(self.interval_s)
+        self.wall_s = time.perf_counter() - started
+        try:
+            self.outputs = self.write()
+            event_log.info(f"Profile written: {', '.join(self.outputs)}")
+        except Exception as e:
+            event_log.warn(f"Could not write profile: {e}")
+        finally:
+            if self.started_tracemalloc:
+                tracemalloc.stop()
+
+    def sample(self, skip_ident=None):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == skip_ident:
+                continue
+            thread_name = names.get(ident, f"thread-{ident}")
+            self.stacks[";".join([thread_name] + collapse_stack(frame))] += 1
+        self.samples += 1
+
+    def allocation_report(self):
+        if self.baseline is None or not tracemalloc.is_tracing():
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ])
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"traced now {current / 1024:.0f} KiB, peak {peak / 1024:.0f} KiB", "",
+                 f"Top {self.config['tracemalloc_top']} allocation sites by growth over the window:"]
+        for stat in snapshot.compare_to(self.baseline, "lineno")[:int(self.config["tracemalloc_top"])]:
+            lines.append(f"  {stat}")
+        return lines
+
+    def write(self):
+        directory = self.config["directory"]
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, time.strftime("viewfinder_profile_%Y%m%d_%H%M%S"))
+        folded = base + ".folded"
+        with open(folded, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        per_sample_ms = self.sample_s / self.samples * 1000.0 if self.samples else 0.0
+        report = base + ".txt"
+        lines = [
+            f"{self.samples} samples over {self.wall_s:.1f}s "
+            f"(target interval {self.interval_s * 1000:.0f} ms, sampler {per_sample_ms:.3f} ms per sample, "
+            f"{self.sample_s / max(self.wall_s, 1e-9) * 100:.1f}% of wall time)",
+            "",
+            "Hottest leaf functions (share of samples, per thread):",
+        ]
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            parts = stack.split(";")
+            leaves[(parts[0], parts[-1])] += count
+        for (thread_name, leaf), count in leaves.most_common(20):
+            lines.append(f"  {count / max(self.samples, 1) * 100:5.1f}%  [{thread_name}] {leaf}")
+        lines.append("")
+        lines.extend(self.allocation_report() or ["tracemalloc disabled"])
+        with open(report, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return [folded, report]
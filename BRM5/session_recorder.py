@@ -0,0 +1,361 @@
+# ============================================================================
+#                          session_recorder.py
+# ============================================================================
+
+import os
+import mmap
+import time
+import zlib
+import numpy as np
+
+import event_log
+from config_defaults import DEFAULT_RECORDING_CONFIG
+
+RECORDING_MODES = ("delta", "sparse")
+
+# File layout: a 64-byte header, a preallocated index of fixed-size records
+# (one per capture tick) and a payload arena that grows in large chunks.
+# Keyframes store the whole frame; delta frames store a changed-tile mask
+# plus only the tiles whose mean absolute difference from the previous
+# stored frame exceeds change_threshold. Frame and tile payloads are zlib
+# compressed at COMPRESS_LEVEL. Sparse mode stores an image every
+# sparse_every ticks and cursor/detection data for the rest.
+MAGIC = b"VFSESS02"
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("width", "<u4"), ("height", "<u4"), ("channels", "<u4"), ("tile", "<u4"),
+    ("mode", "<u4"), ("keyframe_interval", "<u4"), ("sparse_every", "<u4"),
+    ("capacity", "<u4"), ("count", "<u8"), ("data_start", "<u8"), ("data_end", "<u8"),
+])
+HEADER_SIZE = 64
+
+DETECTION_PATCH = (5, 5, 4)
+INDEX_DTYPE = np.dtype([
+    ("t", "<f8"), ("x", "<i4"), ("y", "<i4"), ("kind", "u1"),
+    ("offset", "<u8"), ("length", "<u4"),
+    ("has_patch", "u1"), ("patch", "u1", DETECTION_PATCH),
+])
+
+KIND_KEY = 0
+KIND_DELTA = 1
+KIND_CURSOR = 2
+
+ARENA_CHUNK = 32 * 1024 * 1024
+COMPRESS_LEVEL = 1
+MAX_FPS = 60
+
+def tile_grid(height, width, tile):
+    return -(-height // tile), -(-width // tile)
+
+# Appends capture ticks to a memory-mapped file. Frames are tiled and
+# differenced in preallocated NumPy buffers and index records are written
+# through field views of the mapping; the only per-frame object is the
+# compressed payload.
+class SessionRecorder:
+    def __init__(self, path, config=None):
+        self.path = path
+        self.config = {**DEFAULT_RECORDING_CONFIG, **(config or {})}
+        if self.config["mode"] not in RECORDING_MODES:
+            event_log.warn(f"Unknown recording mode '{self.config['mode']}', using delta")
+            self.config["mode"] = "delta"
+        self.file = None
+        self.mm = None
+        self.shape = None
+        self.closed = False
+        self.count = 0
+        self.stored = 0
+        self.since_key = 0
+        self.patch = np.zeros(DETECTION_PATCH, np.uint8)
+        self.has_patch = False
+
+    def set_detection_patch(self, patch):
+        if patch is not None and patch.shape == DETECTION_PATCH:
+            self.patch[...] = patch
+            self.has_patch = True
+
+    def _open(self, shape):
+        h, w, ch = shape
+        tile = self.config["tile"]
+        self.shape = shape
+        self.ty, self.tx = tile_grid(h, w, tile)
+        self.tile_bytes = tile * tile * ch
+        self.mask_bytes = self.ty * self.tx
+        self.capacity = int(self.config["max_minutes"] * 60 * MAX_FPS)
+        self.data_start = HEADER_SIZE + self.capacity * INDEX_DTYPE.itemsize
+        self.data_end = self.data_start
+
+        # Working buffers: padded frame plus current/previous in tile-major order
+        self.padded = np.zeros((self.ty * tile, self.tx * tile, ch), np.uint8)
+        self.padded_tiles = self.padded.reshape(self.ty, tile, self.tx, tile, ch).swapaxes(1, 2)
+        self.cur = np.zeros((self.ty, self.tx, tile, tile, ch), np.uint8)
+        self.prev = np.zeros_like(self.cur)
+        self.diff = np.zeros(self.cur.shape, np.int16)
+        self.tile_sums = np.zeros((self.ty, self.tx), np.int32)
+        self.mask = np.zeros((self.ty, self.tx), bool)
+        self.mask_tiles = self.mask[:, :, None, None, None]
+        self.changed = np.zeros((self.mask_bytes, self.tile_bytes), np.uint8)
+        self.threshold = max(0, self.config["change_threshold"]) * self.tile_bytes
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, "w+b")
+        self.file.truncate(self.data_start + ARENA_CHUNK)
+        self._map()
+
+        header = self.header[0]
+        header["magic"] = MAGIC
+        header["width"], header["height"], header["channels"], header["tile"] = w, h, ch, tile
+        header["mode"] = RECORDING_MODES.index(self.config["mode"])
+        header["keyframe_interval"] = self.config["keyframe_interval"]
+        header["sparse_every"] = self.config["sparse_every"]
+        header["capacity"] = self.capacity
+        header["data_start"] = header["data_end"] = self.data_start
+        event_log.info(f"Recording session to {self.path}")
+
+    def _map(self):
+        self.mm = mmap.mmap(self.file.fileno(), 0)
+        self.header = np.frombuffer(self.mm, HEADER_DTYPE, count=1)
+        self.index = np.frombuffer(self.mm, INDEX_DTYPE, count=self.capacity, offset=HEADER_SIZE)
+        self.arena = np.frombuffer(self.mm, np.uint8)
+        self.fields = {name: self.index[name] for name in INDEX_DTYPE.names}
+        self.header_count = self.header["count"]
+        self.header_end = self.header["data_end"]
+
+    def _unmap(self):
+        # Views into the mapping must go before it can be closed
+        self.header = self.index = self.arena = self.fields = None
+        self.header_count = self.header_end = None
+        self.mm.flush()
+        self.mm.close()
+        self.mm = None
+
+    def _reserve(self, size):
+        if self.data_end + size <= len(self.mm):
+            return
+        new_size = len(self.mm) + max(ARENA_CHUNK, size)
+        self._unmap()
+        self.file.truncate(new_size)
+        self._map()
+
+    def append(self, t, x, y, frame):
+        if self.closed:
+            return False
+        if self.mm is None:
+            self._open(frame.shape)
+        elif frame.shape != self.shape:
+            event_log.warn(f"Recording stopped: frame size changed to {frame.shape[1]}x{frame.shape[0]}")
+            self.close()
+            return False
+        if self.count >= self.capacity:
+            event_log.warn(f"Recording stopped: {self.config['max_minutes']} minute limit reached")
+            self.close()
+            return False
+
+        kind, payload, size = KIND_CURSOR, None, 0
+        sparse = self.config["mode"] == "sparse"
+        if not (sparse and self.count % self.config["sparse_every"]):
+            h, w = self.shape[:2]
+            self.padded[:h, :w] = frame
+            self.cur[...] = self.padded_tiles
+            if self.stored == 0 or self.since_key >= self.config["keyframe_interval"]:
+                kind = KIND_KEY
+                payload = zlib.compress(self.cur, COMPRESS_LEVEL)
+                size = len(payload)
+            else:
+                np.subtract(self.cur, self.prev, out=self.diff, dtype=np.int16)
+                np.abs(self.diff, out=self.diff)
+                np.sum(self.diff, axis=(2, 3, 4), out=self.tile_sums)
+                np.greater(self.tile_sums, self.threshold, out=self.mask)
+                kind = KIND_DELTA
+                changed = int(np.count_nonzero(self.mask))
+                if changed:
+                    out = self.changed[:changed]
+                    np.compress(self.mask.reshape(-1), self.cur.reshape(self.mask_bytes, self.tile_bytes), axis=0, out=out)
+                    payload = zlib.compress(out, COMPRESS_LEVEL)
+                size = self.mask_bytes + (len(payload) if payload is not None else 0)
+            # May remap, so nothing below may hold a view from before this
+            self._reserve(size)
+
+        start = self.data_end
+        if kind == KIND_KEY:
+            self.arena[start:start + size] = np.frombuffer(payload, np.uint8)
+            self.cur, self.prev = self.prev, self.cur
+            self.since_key = 0
+        elif kind == KIND_DELTA:
+            self.arena[start:start + self.mask_bytes] = self.mask.reshape(-1)
+            if payload is not None:
+                self.arena[start + self.mask_bytes:start + size] = np.frombuffer(payload, np.uint8)
+            # Tiles under the threshold were not stored, so the previous frame
+            # keeps what the reader will reconstruct rather than the capture
+            np.copyto(self.prev, self.cur, where=self.mask_tiles)
+            self.since_key += 1
+        if kind != KIND_CURSOR:
+            self.data_end += size
+            self.stored += 1
+
+        i, fields = self.count, self.fields
+        fields["t"][i], fields["x"][i], fields["y"][i], fields["kind"][i] = t, x, y, kind
+        fields["offset"][i], fields["length"][i] = start, size
+        fields["has_patch"][i] = self.has_patch
+        fields["patch"][i] = self.patch
+
+        self.count += 1
+        self.header_count[0], self.header_end[0] = self.count, self.data_end
+        return True
+
+    def get_stats(self):
+        return {
+            "path": self.path,
+            "records": self.count,
+            "frames_stored": self.stored,
+            "bytes": self.data_end,
+        }
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.mm is None:
+            return
+        self._unmap()
+        # Drop the unused tail of the last arena chunk
+        self.file.truncate(self.data_end)
+        self.file.close()
+        event_log.info(f"Recording saved: {self.count} ticks, {self.stored} frames, {self.data_end / (1024 * 1024):.1f} MB")
+
+class SessionReader:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = np.frombuffer(self.mm, HEADER_DTYPE, count=1)[0]
+        if header["magic"] != MAGIC:
+            raise ValueError(f"{path} is not a ViewFinder session recording")
+        self.width, self.height = int(header["width"]), int(header["height"])
+        self.channels, self.tile = int(header["channels"]), int(header["tile"])
+        self.mode = RECORDING_MODES[int(header["mode"])]
+        self.count = int(header["count"])
+        self.index = np.frombuffer(self.mm, INDEX_DTYPE, count=self.count, offset=HEADER_SIZE)
+        self.arena = np.frombuffer(self.mm, np.uint8)
+
+        self.ty, self.tx = tile_grid(self.height, self.width, self.tile)
+        self.tile_bytes = self.tile * self.tile * self.channels
+        self.tiles = np.zeros((self.ty, self.tx, self.tile, self.tile, self.channels), np.uint8)
+        self.frame = np.zeros((self.height, self.width, self.channels), np.uint8)
+        self.position = 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def duration(self):
+        if self.count < 2:
+            return 0.0
+        return float(self.index[-1]["t"] - self.index[0]["t"])
+
+    def _apply(self, record):
+        offset, length = int(record["offset"]), int(record["length"])
+        flat = self.tiles.reshape(self.ty * self.tx, self.tile_bytes)
+        if record["kind"] == KIND_KEY:
+            data = zlib.decompress(self.arena[offset:offset + length])
+            self.tiles.reshape(-1)[...] = np.frombuffer(data, np.uint8)
+        else:
+            mask = self.arena[offset:offset + self.ty * self.tx].view(bool)
+            if length > mask.size:
+                data = zlib.decompress(self.arena[offset + mask.size:offset + length])
+                flat[mask] = np.frombuffer(data, np.uint8).reshape(-1, self.tile_bytes)
+        self.frame[...] = self.tiles.swapaxes(1, 2).reshape(self.ty * self.tile, self.tx * self.tile, self.channels)[:self.height, :self.width]
+
+    def seek(self, i):
+        # Rebuild from the nearest keyframe at or before i
+        kinds = self.index["kind"][:i + 1]
+        keys = np.flatnonzero(kinds == KIND_KEY)
+        start = int(keys[-1]) if keys.size else 0
+        for j in range(start, i + 1):
+            if self.index[j]["kind"] != KIND_CURSOR:
+                self._apply(self.index[j])
+        self.position = i + 1
+
+    def read(self):
+        # Next record as (record, frame or None); the frame buffer is reused
+        if self.position >= self.count:
+            return None, None
+        record = self.index[self.position]
+        self.position += 1
+        if record["kind"] == KIND_CURSOR:
+            return record, None
+        self._apply(record)
+        return record, self.frame
+
+    def close(self):
+        self.index = self.arena = None
+        self.mm.close()
+
+# Stands in for an mss instance: grab() returns the recorded lens frame (or
+# the recorded detection patch for 5x5 regions), either paced by the recorded
+# timestamps or one record per lens grab.
+class ReplaySource:
+    def __init__(self, path, realtime=True, loop=False):
+        self.reader = SessionReader(path)
+        self.realtime = realtime
+        self.loop = loop
+        self.record = None
+        self.exhausted = False
+        self.started = None
+        self.t0 = float(self.reader.index[0]["t"]) if len(self.reader) else 0.0
+
+    def cursor_pos(self):
+        if self.record is None:
+            return 0, 0
+        return int(self.record["x"]), int(self.record["y"])
+
+    def _advance(self):
+        if self.realtime:
+            now = time.perf_counter()
+            if self.started is None:
+                self.started = now
+            target = self.t0 + (now - self.started)
+            while not self.exhausted:
+                pos = self.reader.position
+                if pos >= len(self.reader):
+                    # Past the last record: end (or wrap) once its time is up
+                    if target > self.reader.index[-1]["t"]:
+                        self._read_one()
+                    break
+                if self.reader.index[pos]["t"] > target:
+                    break
+                self._read_one()
+            if self.record is None:
+                self._read_one()
+        else:
+            self._read_one()
+            while self.record is not None and self.record["kind"] == KIND_CURSOR:
+                self._read_one()
+
+    def _read_one(self):
+        record, _ = self.reader.read()
+        if record is None:
+            if not self.loop:
+                self.exhausted = True
+                return
+            self.reader.position = 0
+            self.started = None
+            record, _ = self.reader.read()
+        self.record = record
+
+    def grab(self, monitor):
+        if (monitor["height"], monitor["width"]) == DETECTION_PATCH[:2]:
+            if self.record is None or not self.record["has_patch"]:
+                return np.zeros(DETECTION_PATCH, np.uint8)
+            return self.record["patch"]
+        self._advance()
+        return self.reader.frame
+
+    def close(self):
+        self.record = None
+        self.reader.close()
+
+def session_path(config):
+    directory = config.get("directory", DEFAULT_RECORDING_CONFIG["directory"])
+    return os.path.join(directory, time.strftime("viewfinder_session_%Y%m%d_%H%M%S.vfr"))
@@ -0,0 +1,123 @@
+# ============================================================================
+#                          startup_timeline.py
+# ============================================================================
+
+import os
+import sys
+import json
+import time
+import threading
+import importlib
+
+import event_log
+
+STARTUP_REPORT_ENV = "VIEWFINDER_STARTUP_REPORT"
+
+_PROCESS_T0 = time.perf_counter()
+
+class StartupTimeline:
+    def __init__(self, t0=None):
+        self.t0 = _PROCESS_T0 if t0 is None else t0
+        self.marks = []
+        self.imports = []
+        self.lock = threading.Lock()
+        self.reported = False
+
+    def now_ms(self):
+        return (time.perf_counter() - self.t0) * 1000.0
+
+    def mark(self, name):
+        with self.lock:
+            if any(existing == name for existing, _, _ in self.marks):
+                return
+            self.marks.append((name, self.now_ms(), threading.current_thread().name))
+
+    def has_mark(self, name):
+        with self.lock:
+            return any(existing == name for existing, _, _ in self.marks)
+
+    def record_import(self, name, start_ms, duration_ms, ok=True):
+        with self.lock:
+            self.imports.append({
+                "module": name,
+                "start_ms": round(start_ms, 2),
+                "duration_ms": round(duration_ms, 2),
+                "thread": threading.current_thread().name,
+                "ok": ok,
+            })
+
+    def as_dict(self):
+        with self.lock:
+            marks = list(self.marks)
+            imports = list(self.imports)
+        return {
+            "python": sys.version.split()[0],
+            "frozen": bool(getattr(sys, "frozen", False)),
+            "marks": [{"name": n, "ms": round(ms, 2), "thread": t} for n, ms, t in marks],
+            "imports": imports,
+        }
+
+    def report(self, path=None):
+        if self.reported:
+            return
+        self.reported = True
+        data = self.as_dict()
+
+        event_log.info("Startup timeline:")
+        previous = 0.0
+        for mark in data["marks"]:
+            event_log.info(f"  {mark['ms']:8.1f} ms  (+{mark['ms'] - previous:7.1f})  {mark['name']}")
+            previous = mark["ms"]
+        for entry in data["imports"]:
+            status = "" if entry["ok"] else "  FAILED"
+            event_log.info(f"  import {entry['module']:<20} {entry['duration_ms']:7.1f} ms  [{entry['thread']}]{status}")
+
+        path = path or os.environ.get(STARTUP_REPORT_ENV)
+        if path:
+            try:
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2)
+            except Exception as e:
+                event_log.warn(f"Could not write startup report to {path}: {e}")
+
+# Imports modules on a worker thread so the event loop can put windows on
+# screen while numpy/cv2/mss load. Ready callbacks run on the worker thread (or
+# immediately if the imports already finished), so callers should hand them a
+# queued Qt signal emit.
+class BackgroundImporter:
+    def __init__(self, module_names, timeline, on_ready=None):
+        self.module_names = list(module_names)
+        self.timeline = timeline
+        self.callbacks = [on_ready] if on_ready else []
+        self.failed = {}
+        self.done = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="importer", daemon=True)
+        self.thread.start()
+        return self
+
+    def when_ready(self, callback):
+        with self.lock:
+            if not self.done.is_set():
+                self.callbacks.append(callback)
+                return
+        callback()
+
+    def _run(self):
+        for name in self.module_names:
+            start = self.timeline.now_ms()
+            try:
+                importlib.import_module(name)
+                self.timeline.record_import(name, start, self.timeline.now_ms() - start)
+            except Exception as e:
+                self.failed[name] = str(e)
+                self.timeline.record_import(name, start, self.timeline.now_ms() - start, ok=False)
+        self.timeline.mark("background imports done")
+        with self.lock:
+            self.done.set()
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
@@ -0,0 +1,148 @@
+# ============================================================================
+#                            tiled_resize.py
+# ============================================================================
+
+import os
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import event_log
+from image_backend import output_size
+
+# 0 = one thread per core, up to MAX_AUTO_THREADS
+DEFAULT_RESIZE_THREADS = 0
+MAX_AUTO_THREADS = 4
+# Below this many output pixels thread hand-off costs more than it saves
+DEFAULT_TILE_MIN_PIXELS = 300000
+# Source rows of context each band needs beyond its own
+MARGIN_ROWS = 4
+# Kernels whose row bands resize exactly like the whole image. NumPy linear
+# goes through Qt's smooth scale, and OpenCV's wider kernels (lanczos), round
+# differently per band and leave seams, so those stay single-threaded.
+BAND_EXACT = {
+    "opencv": ("nearest", "linear", "area"),
+    "numpy": ("nearest",),
+}
+
+def resolve_threads(threads):
+    if threads and threads > 0:
+        return int(threads)
+    return max(1, min(os.cpu_count() or 1, MAX_AUTO_THREADS))
+
+def band_plan(height, out_height, bands):
+    # Bands start on rows where the source and output grids line up exactly,
+    # so each band resized on its own samples the same positions as a full
+    # resize. Returns [(src_top, src_bottom, out_top, out_bottom, keep_offset)]
+    # or None when the grids only line up at the image edges.
+    g = math.gcd(height, out_height)
+    unit_src, unit_out = height // g, out_height // g
+    bands = min(bands, g)
+    if bands < 2:
+        return None
+    margin = -(-MARGIN_ROWS // unit_src)
+    plan = []
+    for i in range(bands):
+        u0, u1 = g * i // bands, g * (i + 1) // bands
+        m0, m1 = max(u0 - margin, 0), min(u1 + margin, g)
+        plan.append((m0 * unit_src, m1 * unit_src, u0 * unit_out, u1 * unit_out, (u0 - m0) * unit_out))
+    return plan
+
+# OpenCV's thread count is process-wide and pipelines are rebuilt on every
+# config reload (and by the cost estimator per settings change), so it is
+# set, and the setting logged, only when the resolved value changes
+_applied = {}
+
+def apply_threads(backend, threads, min_pixels):
+    cv2 = getattr(backend, "cv2", None)
+    if cv2 is not None:
+        default = _applied.setdefault("cv2_default", cv2.getNumThreads())
+        # Keep OpenCV's own pool (used by every other cv2 call) at the tiling
+        # width so the two don't oversubscribe the cores; untouched when off
+        width = threads if threads > 1 else default
+        if _applied.get("cv2") != width:
+            cv2.setNumThreads(width)
+            _applied["cv2"] = width
+    if _applied.get("setting") != (threads, min_pixels):
+        if threads > 1:
+            event_log.info(f"Tiled resize: {threads} threads from {min_pixels} output pixels")
+        elif "setting" in _applied:
+            event_log.info("Tiled resize: off")
+        _applied["setting"] = (threads, min_pixels)
+
+# Wraps an image backend and splits large resizes into horizontal bands run
+# on a thread pool. OpenCV and NumPy release the GIL inside their kernels, so
+# the bands run in parallel. Kernels outside BAND_EXACT, small outputs,
+# downscales and scales whose sampling grid doesn't divide into bands use the
+# plain single-threaded call.
+class TiledResizer:
+    def __init__(self, backend, threads=DEFAULT_RESIZE_THREADS, min_pixels=DEFAULT_TILE_MIN_PIXELS):
+        self.backend = backend
+        self.name = backend.name
+        self.channels = backend.channels
+        self.interpolations = backend.interpolations
+        self.exact = BAND_EXACT.get(backend.name, ())
+        self.threads = resolve_threads(threads)
+        self.min_pixels = min_pixels
+        self.pool = ThreadPoolExecutor(self.threads, thread_name_prefix="resize") if self.threads > 1 else None
+        self._plans = {}
+        self.stats = {"tiled": 0, "single": 0}
+        self.last_bands = 1
+
+    @classmethod
+    def from_config(cls, config, backend, live=True):
+        threads = resolve_threads(config.get("resize_threads", DEFAULT_RESIZE_THREADS))
+        min_pixels = config.get("tile_min_pixels", DEFAULT_TILE_MIN_PIXELS)
+        # OpenCV's thread count is process-wide: only the running overlay sets it
+        if live:
+            apply_threads(backend, threads, min_pixels)
+        if threads < 2:
+            return None
+        return cls(backend, threads, min_pixels)
+
+    def _plan(self, h, w, scale, interpolation):
+        out_w, out_h = output_size(w, h, scale)
+        if self.pool is None or interpolation not in self.exact or scale <= 1 or out_w * out_h < self.min_pixels:
+            return None
+        key = (w, h, out_w, out_h)
+        if key not in self._plans:
+            plan = band_plan(h, out_h, self.threads)
+            # Bands are resized by the row ratio; the width has to come out the same
+            if output_size(w, h, out_h / h)[0] != out_w:
+                plan = None
+            self._plans[key] = plan
+        return self._plans[key]
+
+    def resize(self, frame, scale, interpolation="linear"):
+        h, w = frame.shape[:2]
+        plan = self._plan(h, w, scale, interpolation)
+        if plan is None:
+            self.stats["single"] += 1
+            self.last_bands = 1
+            return self.backend.resize(frame, scale, interpolation)
+
+        out_w, out_h = output_size(w, h, scale)
+        out = np.empty((out_h, out_w) + frame.shape[2:], frame.dtype)
+        band_scale = out_h / h
+
+        def run(band):
+            src_top, src_bottom, out_top, out_bottom, keep = band
+            part = self.backend.resize(frame[src_top:src_bottom], band_scale, interpolation)
+            out[out_top:out_bottom] = part[keep:keep + out_bottom - out_top]
+
+        futures = [self.pool.submit(run, band) for band in plan[1:]]
+        run(plan[0])
+        for future in futures:
+            future.result()
+        self.stats["tiled"] += 1
+        self.last_bands = len(plan)
+        return out
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+
+    def get_stats(self):
+        return dict(self.stats, threads=self.threads, bands=self.last_bands)
@@ -0,0 +1,107 @@
+# ============================================================================
+#                              trace_log.py
+# ============================================================================
+
+import os
+import json
+import time
+import threading
+import itertools
+
+DEFAULT_TRACING_CONFIG = {
+    "enabled": False,
+    "buffer_events": 65536,
+    "directory": "traces",
+}
+
+# Also switches tracing on, regardless of the config file
+TRACE_ENV = "VIEWFINDER_TRACE"
+
+# Timestamped begin/end spans in a fixed-size ring shared by every thread.
+# Each event is one tuple stored into a preallocated slot, so writers never
+# lock: the slot index comes from itertools.count, which is atomic under the
+# GIL. Call sites guard with `if tracer.enabled:` so a disabled tracer costs
+# one attribute check. export() writes Chrome Trace Event JSON, readable by
+# Perfetto (ui.perfetto.dev) and chrome://tracing.
+class Tracer:
+    def __init__(self):
+        self.config = DEFAULT_TRACING_CONFIG.copy()
+        self.enabled = os.environ.get(TRACE_ENV, "") not in ("", "0")
+        self._allocate(self.config["buffer_events"])
+
+    def _allocate(self, capacity):
+        self.capacity = max(1024, int(capacity))
+        self.events = [None] * self.capacity
+        self._counter = itertools.count()
+
+    def configure(self, config=None):
+        self.config = {**DEFAULT_TRACING_CONFIG, **(config or {})}
+        if int(self.config["buffer_events"]) != self.capacity:
+            self._allocate(self.config["buffer_events"])
+        self.enabled = bool(self.config["enabled"]) or os.environ.get(TRACE_ENV, "") not in ("", "0")
+
+    def begin(self, name, cat="app"):
+        self.events[next(self._counter) % self.capacity] = ("B", name, cat, time.perf_counter(), threading.get_ident(), None)
+
+    def end(self, name, cat="app"):
+        self.events[next(self._counter) % self.capacity] = ("E", name, cat, time.perf_counter(), threading.get_ident(), None)
+
+    def complete(self, name, start, cat="app", end=None):
+        # For spans whose start time the caller already took
+        end = time.perf_counter() if end is None else end
+        self.events[next(self._counter) % self.capacity] = ("X", name, cat, start, threading.get_ident(), end - start)
+
+    def instant(self, name, cat="app"):
+        self.events[next(self._counter) % self.capacity] = ("i", name, cat, time.perf_counter(), threading.get_ident(), None)
+
+    def snapshot(self):
+        # Oldest to newest. Taking an index skips one slot, which at worst
+        # drops the oldest event
+        count = next(self._counter)
+        first = max(0, count - self.capacity + 1)
+        events = [self.events[i % self.capacity] for i in range(first, count)]
+        return [event for event in events if event is not None]
+
+    def chrome_events(self):
+        pid = os.getpid()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        out = []
+        open_spans = {}
+        for phase, name, cat, stamp, tid, dur in self.snapshot():
+            # A wrapped ring can start with the end of a span it lost the
+            # beginning of; Perfetto draws those badly, so drop them
+            if phase == "B":
+                open_spans[tid] = open_spans.get(tid, 0) + 1
+            elif phase == "E":
+                if not open_spans.get(tid):
+                    continue
+                open_spans[tid] -= 1
+            event = {"ph": phase, "name": name, "cat": cat, "ts": stamp * 1e6, "pid": pid, "tid": tid}
+            if phase == "X":
+                event["dur"] = dur * 1e6
+            elif phase == "i":
+                event["s"] = "t"
+            out.append(event)
+        for tid in {event["tid"] for event in out}:
+            out.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": tid,
+                        "args": {"name": names.get(tid, f"thread {tid}")}})
+        return out
+
+    def export(self, path=None):
+        if path is None:
+            directory = self.config["directory"]
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, time.strftime("viewfinder_trace_%Y%m%d_%H%M%S.json"))
+        events = self.chrome_events()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return path, len(events)
+
+    def get_stats(self):
+        written = next(self._counter)
+        return {"enabled": self.enabled, "events": written, "capacity": self.capacity, "wrapped": written > self.capacity}
+
+tracer = Tracer()
+
+def configure(config=None):
+    tracer.configure(config)
@@ -0,0 +1,136 @@
+# ============================================================================
+#                           visibility_state.py
+# ============================================================================
+
+from PyQt5.QtCore import QTimer
+
+import event_log
+from trace_log import tracer
+
+class OverlayEntry:
+    def __init__(self, name, overlay, follows_toggle, follows_auto):
+        self.name = name
+        self.overlay = overlay
+        self.follows_toggle = follows_toggle
+        self.follows_auto = follows_auto
+        self.manual = True
+        self.applied = None
+
+# Single owner of overlay visibility. Inputs (manual toggles, hide-all,
+# auto-detect and the last detection result) only update state; the desired
+# visibility of every overlay is derived from them and applied once per
+# event-loop turn, and only where it differs from what was last applied.
+class VisibilityStateMachine:
+    def __init__(self):
+        self.entries = {}
+        self.hide_all = False
+        self.auto_detect = False
+        self.detected = None
+        self._flush_pending = False
+        self.stats = {
+            "requests": 0,
+            "flushes": 0,
+            "transitions": 0,
+            "failures": 0,
+        }
+
+    def register(self, name, overlay, follows_toggle=True, follows_auto=True):
+        entry = self.entries.get(name)
+        if entry is None:
+            entry = self.entries[name] = OverlayEntry(name, overlay, follows_toggle, follows_auto)
+        else:
+            entry.overlay = overlay
+            entry.applied = None
+        self._request()
+        return entry
+
+    def unregister(self, name):
+        self.entries.pop(name, None)
+
+    def has_overlay(self, name):
+        entry = self.entries.get(name)
+        return entry is not None and entry.overlay is not None
+
+    def desired(self, name):
+        entry = self.entries[name]
+        if self.hide_all:
+            return False
+        if entry.follows_toggle and not entry.manual:
+            return False
+        if entry.follows_auto and self.auto_detect and self.detected is False:
+            return False
+        return True
+
+    def is_manual_on(self, name):
+        entry = self.entries.get(name)
+        return entry is None or entry.manual
+
+    def toggle_manual(self, name):
+        entry = self.entries.get(name)
+        if entry is None or entry.overlay is None:
+            return None
+        entry.manual = not entry.manual
+        self._request()
+        return entry.manual
+
+    def set_hide_all(self, hidden):
+        if hidden != self.hide_all:
+            self.hide_all = hidden
+            self._request()
+
+    def set_auto_detect(self, enabled):
+        if enabled != self.auto_detect:
+            self.auto_detect = enabled
+            self.detected = None
+            self._request()
+
+    def set_detected(self, detected):
+        if detected != self.detected:
+            self.detected = detected
+            self._request()
+            return True
+        return False
+
+    def invalidate(self, name):
+        entry = self.entries.get(name)
+        if entry is not None:
+            entry.applied = None
+            self._request()
+
+    def _request(self):
+        self.stats["requests"] += 1
+        if not self._flush_pending:
+            self._flush_pending = True
+            QTimer.singleShot(0, self.flush)
+
+    def flush(self):
+        self._flush_pending = False
+        self.stats["flushes"] += 1
+        if tracer.enabled:
+            tracer.begin("visibility flush", "visibility")
+        for entry in self.entries.values():
+            if entry.overlay is None:
+                continue
+            want = self.desired(entry.name)
+            if want == entry.applied:
+                continue
+            try:
+                if tracer.enabled:
+                    tracer.instant(f"{entry.name} {'show' if want else 'hide'}", "visibility")
+                entry.overlay.set_visibility(want)
+                entry.applied = want
+                self.stats["transitions"] += 1
+            except Exception as e:
+                self.stats["failures"] += 1
+                event_log.warn(f"{entry.name} visibility change failed: {e}", key=f"visibility.{entry.name}")
+        if tracer.enabled:
+            tracer.end("visibility flush", "visibility")
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats["native_ops"] = {
+            name: getattr(entry.overlay, "native_ops", None)
+            for name, entry in self.entries.items()
+        }
+        stats["applied"] = {name: entry.applied for name, entry in self.entries.items()}
+        return stats
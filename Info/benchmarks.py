@@ -0,0 +1,819 @@
+"""
+ViewFinder Benchmarks
+Measures the magnifier pipeline outside the game so changes can be compared
+on the same machine. Runs headless (Qt offscreen) with synthetic frames.
+
+Usage:
+    python Info/benchmarks.py backends
+    python Info/benchmarks.py paint
+    python Info/benchmarks.py predict [--track cursor.csv | --record 30 --out cursor.csv]
+    python Info/benchmarks.py replay recordings/viewfinder_session_*.vfr [--realtime] [--motion 2.0]
+    python Info/benchmarks.py tiers
+    python Info/benchmarks.py enhance
+    python Info/benchmarks.py threads [--max-threads 8]
+    python Info/benchmarks.py shm [--fps 60 --window-size 800 --seconds 5]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+BRM5_DIR = Path(__file__).resolve().parent.parent / "BRM5"
+sys.path.insert(0, str(BRM5_DIR))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def print_header(text):
+    """Print a formatted header"""
+    print("\n" + "=" * 60)
+    print(f"  {text}")
+    print("=" * 60 + "\n")
+
+
+_app = None
+
+
+def get_app():
+    """Create (once) the QApplication needed for QImage/QPixmap work"""
+    global _app
+    if _app is None:
+        from PyQt5.QtWidgets import QApplication
+        _app = QApplication.instance() or QApplication(sys.argv[:1])
+    return _app
+
+
+def synthetic_frame(radius, seed=0):
+    """A BGRA frame shaped like an mss grab of a 2r x 2r lens"""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 256, (radius * 2, radius * 2, 4), dtype=np.uint8)
+    frame[..., 3] = 255
+    return frame
+
+
+def time_call(func, repeat, warmup=3):
+    """Return per-call times in milliseconds"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "median_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+    }
+
+
+def distribution_size_mb(names):
+    """Installed size of the first distribution found in names (None if absent)"""
+    from importlib import metadata
+    for name in names:
+        try:
+            dist = metadata.distribution(name)
+        except metadata.PackageNotFoundError:
+            continue
+        total = 0
+        for file in dist.files or []:
+            try:
+                total += os.path.getsize(dist.locate_file(file))
+            except OSError:
+                pass
+        return name, round(total / (1024 * 1024), 1)
+    return None, None
+
+
+# ---------------------------------------------------------------------------
+# backends: OpenCV vs NumPy/Qt image kernels
+# ---------------------------------------------------------------------------
+
+STARTUP_SNIPPET = (
+    "import sys, time; sys.path.insert(0, {path!r}); t = time.perf_counter(); "
+    "import image_backend; b = image_backend.get_backend({name!r}); "
+    "print(b.name, (time.perf_counter() - t) * 1000)"
+)
+
+
+def bench_backend_startup(name, runs):
+    """Cold import + backend construction, each run in a fresh interpreter"""
+    samples = []
+    resolved = name
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", STARTUP_SNIPPET.format(path=str(BRM5_DIR), name=name)],
+            capture_output=True, text=True, env=env
+        )
+        if out.returncode != 0:
+            return None, out.stderr.strip().splitlines()[-1:]
+        resolved, ms = out.stdout.split()
+        samples.append(float(ms))
+    return resolved, summarize(samples)
+
+
+def bench_backend_frames(backend, radius, scale, repeat):
+    """Pipeline + display conversion cost for one frame"""
+    from PyQt5.QtGui import QPixmap
+    from magnifier_overlay import MagnifierPipeline
+    from image_backend import wrap_qimage
+
+    pipeline = MagnifierPipeline(scale, backend)
+    frame = synthetic_frame(radius)
+
+    def one_frame():
+        out = pipeline.process(frame)
+        QPixmap.fromImage(wrap_qimage(out))
+
+    return summarize(time_call(one_frame, repeat))
+
+
+def run_backends(args):
+    import image_backend
+    get_app()
+
+    names = ["numpy"] + (["opencv"] if image_backend.opencv_available() else [])
+    results = {"startup": {}, "build_size_mb": {}, "frame": {}}
+
+    print_header("Startup (fresh interpreter, import + backend init)")
+    for name in names:
+        resolved, stats = bench_backend_startup(name, args.runs)
+        results["startup"][name] = stats
+        print(f"  {name:<8} {stats}")
+
+    print_header("Installed size (upper bound for the frozen build)")
+    for label, candidates in (
+        ("opencv", ["opencv-python", "opencv-python-headless", "opencv-contrib-python"]),
+        ("numpy", ["numpy"]),
+        ("PyQt5", ["PyQt5-Qt5", "PyQt5"]),
+    ):
+        dist, size = distribution_size_mb(candidates)
+        results["build_size_mb"][label] = size
+        print(f"  {label:<8} {dist or 'not installed':<24} {size if size is not None else '-'} MB")
+
+    print_header("Per-frame cost (pipeline + QPixmap conversion)")
+    for radius in args.radii:
+        for scale in args.scales:
+            row = {}
+            for name in names:
+                row[name] = bench_backend_frames(image_backend.get_backend(name), radius, scale, args.repeat)
+            results["frame"][f"r{radius}_x{scale}"] = row
+            cells = "  ".join(f"{name}: {row[name]['median_ms']:7.2f} ms" for name in names)
+            print(f"  radius {radius:>3}  scale {scale:>4}  {cells}")
+
+    return results
+
+
+# ---------------------------------------------------------------------------
+# paint: QLabel.setPixmap vs paintEvent/drawImage for the magnified view
+# ---------------------------------------------------------------------------
+
+def make_label_view(window_size):
+    """The pre-paintEvent MagnifiedView: a new QPixmap + QLabel.setPixmap per frame"""
+    from PyQt5.QtWidgets import QWidget, QLabel
+    from PyQt5.QtGui import QPixmap
+    from PyQt5.QtCore import Qt
+    from image_backend import wrap_qimage
+    import numpy as np
+
+    class LabelView(QWidget):
+        def __init__(self):
+            super().__init__()
+            self.label = QLabel(self)
+            self.label.setAlignment(Qt.AlignCenter)
+            self.setFixedSize(window_size, window_size)
+            self.label.resize(self.size())
+
+        def update_image(self, frame):
+            frame = np.ascontiguousarray(frame)
+            h, w = frame.shape[:2]
+            pixmap = QPixmap.fromImage(wrap_qimage(frame).copy())
+            if w < window_size or h < window_size:
+                pixmap = pixmap.scaled(window_size, window_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            self.label.setPixmap(pixmap)
+
+    return LabelView()
+
+
+def bench_paint_view(view, frames, fps, seconds):
+    """Drive update_image from a QTimer at fps and time the GUI-thread work.
+
+    update_ms is the update_image call, paint_ms is the synchronous repaint
+    that follows (what the event loop would do on the next turn)."""
+    from PyQt5.QtCore import QTimer, QEventLoop
+    app = get_app()
+    view.show()
+    app.processEvents()
+
+    update_ms, paint_ms = [], []
+    count = int(fps * seconds)
+    state = {"i": 0}
+    loop = QEventLoop()
+
+    def tick():
+        frame = frames[state["i"] % len(frames)]
+        start = time.perf_counter()
+        view.update_image(frame)
+        mid = time.perf_counter()
+        view.repaint()
+        end = time.perf_counter()
+        update_ms.append((mid - start) * 1000.0)
+        paint_ms.append((end - mid) * 1000.0)
+        state["i"] += 1
+        if state["i"] >= count:
+            timer.stop()
+            loop.quit()
+
+    timer = QTimer()
+    timer.timeout.connect(tick)
+    timer.start(int(1000 / fps))
+    wall = time.perf_counter()
+    loop.exec_()
+    wall = time.perf_counter() - wall
+    view.hide()
+
+    total = [u + p for u, p in zip(update_ms[3:], paint_ms[3:])]
+    return {
+        "update": summarize(update_ms[3:]),
+        "paint": summarize(paint_ms[3:]),
+        "gui_thread": summarize(total),
+        "gui_busy_pct": round(100.0 * sum(total) / 1000.0 / wall, 1),
+    }
+
+
+def run_paint(args):
+    from magnifier_overlay import MagnifiedView, MagnifierPipeline
+    import image_backend
+    get_app()
+
+    backend = image_backend.get_backend(args.backend)
+    results = {"window_size": args.window_size, "fps": args.fps, "backend": backend.name, "cases": {}}
+    print_header(f"Magnified view at {args.fps} FPS, window_size {args.window_size} ({backend.name} backend)")
+
+    for radius, scale in args.cases:
+        radius = int(radius)
+        pipeline = MagnifierPipeline(scale, backend)
+        frames = [pipeline.process(synthetic_frame(radius, seed)) for seed in range(4)]
+        row = {}
+        for name, view in (("label", make_label_view(args.window_size)), ("paint", MagnifiedView(args.window_size, backend))):
+            row[name] = bench_paint_view(view, frames, args.fps, args.seconds)
+        results["cases"][f"r{radius}_x{scale}"] = row
+        h, w = frames[0].shape[:2]
+        print(f"  radius {radius} scale {scale} -> frame {w}x{h}")
+        for name in ("label", "paint"):
+            r = row[name]
+            print(f"    {name:<6} update {r['update']['median_ms']:6.2f} ms  paint {r['paint']['median_ms']:6.2f} ms  "
+                  f"gui {r['gui_thread']['median_ms']:6.2f} ms (p95 {r['gui_thread']['p95_ms']:6.2f})  busy {r['gui_busy_pct']:5.1f}%")
+
+    return results
+
+
+# ---------------------------------------------------------------------------
+# predict: cursor predictor error replayed against cursor tracks
+# ---------------------------------------------------------------------------
+
+def synthetic_tracks(seed=0):
+    """Door-gun style motions sampled every millisecond: (name, t_s, x, y)"""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    t = np.arange(0, 4.0, 0.001)
+    tracks = []
+
+    # Smooth pans that speed up and reverse
+    x = 960 + 700 * np.sin(2 * np.pi * 0.35 * t) * np.minimum(1, t)
+    y = 540 + 120 * np.sin(2 * np.pi * 0.2 * t)
+    tracks.append(("pan", t, x, y))
+
+    # Flicks: rest, fast move to a new target, rest
+    x = np.full_like(t, 960.0)
+    y = np.full_like(t, 540.0)
+    pos = np.array([960.0, 540.0])
+    for start in np.arange(0.3, 3.8, 0.5):
+        target = pos + rng.uniform(-400, 400, 2)
+        ramp = np.clip((t - start) / 0.12, 0, 1)
+        ease = ramp * ramp * (3 - 2 * ramp)
+        mask = t >= start
+        x[mask] = pos[0] + (target[0] - pos[0]) * ease[mask]
+        y[mask] = pos[1] + (target[1] - pos[1]) * ease[mask]
+        pos = target
+    tracks.append(("flick", t, x, y))
+
+    # Tracking a circling target with hand jitter (integer mouse positions)
+    x = 960 + 300 * np.cos(2 * np.pi * 0.5 * t) + rng.normal(0, 1.5, t.size)
+    y = 540 + 200 * np.sin(2 * np.pi * 0.5 * t) + rng.normal(0, 1.5, t.size)
+    tracks.append(("jitter", t, np.round(x), np.round(y)))
+    return tracks
+
+
+def load_track(path):
+    """CSV of t_ms,x,y rows (as written by --record)"""
+    import numpy as np
+    data = np.loadtxt(path, delimiter=",", comments="#", ndmin=2)
+    return Path(path).stem, (data[:, 0] - data[0, 0]) / 1000.0, data[:, 1], data[:, 2]
+
+
+def record_track(seconds, out_path, rate_hz=500):
+    """Sample the real cursor (needs a display) and save it for later replays"""
+    from PyQt5.QtGui import QCursor
+    get_app()
+    rows = []
+    start = time.perf_counter()
+    print(f"Recording cursor for {seconds:.0f}s - move the mouse like in game...")
+    while time.perf_counter() - start < seconds:
+        pos = QCursor.pos()
+        rows.append(f"{(time.perf_counter() - start) * 1000:.2f},{pos.x()},{pos.y()}")
+        time.sleep(1.0 / rate_hz)
+    with open(out_path, "w") as f:
+        f.write("# t_ms,x,y\n" + "\n".join(rows) + "\n")
+    print(f"Saved {len(rows)} samples to {out_path}")
+
+
+def replay_predictor(predictor, track, sample_s, capture_s, lead_s):
+    """Feed samples at display rate, predict at each capture; return pixel errors
+    for the predictor and for the no-prediction baseline"""
+    import numpy as np
+    from cursor_predictor import clamp_offset
+    _, t, x, y = track
+    sample_times = np.arange(t[0], t[-1] - lead_s, sample_s)
+    sx = np.round(np.interp(sample_times, t, x))
+    sy = np.round(np.interp(sample_times, t, y))
+    next_capture = sample_times[0] + 0.1
+    errors, baseline = [], []
+    for ts, px, py in zip(sample_times, sx, sy):
+        if predictor is not None:
+            predictor.add(ts, px, py)
+        if ts < next_capture:
+            continue
+        next_capture += capture_s
+        ax, ay = np.interp(ts + lead_s, t, x), np.interp(ts + lead_s, t, y)
+        baseline.append(float(np.hypot(ax - px, ay - py)))
+        if predictor is not None:
+            qx, qy = predictor.predict(lead_s, ts)
+            dx, dy = clamp_offset(qx - px, qy - py, 120)
+            errors.append(float(np.hypot(ax - px - dx, ay - py - dy)))
+    return errors, baseline
+
+
+def error_stats(errors):
+    import numpy as np
+    arr = np.asarray(errors)
+    return {"mean_px": round(float(arr.mean()), 2), "p95_px": round(float(np.percentile(arr, 95)), 2)}
+
+
+def run_predict(args):
+    from cursor_predictor import make_predictor, PREDICTORS
+
+    if args.record:
+        record_track(args.record, args.out)
+        return {}
+
+    tracks = [load_track(path) for path in args.track] if args.track else synthetic_tracks()
+    results = {}
+    sample_s = 1.0 / args.display_hz
+    capture_s = 1.0 / args.fps
+    for lead_ms in args.lead_ms:
+        print_header(f"Prediction error at {lead_ms:.0f} ms lead ({args.fps} FPS capture, {args.display_hz} Hz samples)")
+        for track in tracks:
+            row = {}
+            _, baseline = replay_predictor(None, track, sample_s, capture_s, lead_ms / 1000.0)
+            row["off"] = error_stats(baseline)
+            for name in PREDICTORS[1:]:
+                errors, _ = replay_predictor(make_predictor(name), track, sample_s, capture_s, lead_ms / 1000.0)
+                row[name] = error_stats(errors)
+            results[f"{track[0]}_lead{lead_ms:.0f}"] = row
+            cells = "  ".join(f"{name}: {stats['mean_px']:6.1f} (p95 {stats['p95_px']:6.1f})" for name, stats in row.items())
+            print(f"  {track[0]:<8} {cells}")
+    return results
+
+
+# ---------------------------------------------------------------------------
+# replay: recorded sessions through the magnifier and detection pipelines
+# ---------------------------------------------------------------------------
+
+def synthesize_session(path, seconds, radius, fps, mode):
+    """Write a recording of a panning scene with a moving target, for size
+    and throughput checks without a game session"""
+    import numpy as np
+    from session_recorder import SessionRecorder
+    rng = np.random.default_rng(0)
+    size = radius * 2
+    world = rng.integers(0, 256, (size * 4, size * 8, 4), dtype=np.uint8)
+    world[..., 3] = 255
+    recorder = SessionRecorder(path, {"mode": mode, "max_minutes": max(1, seconds / 60 + 1)})
+    frames = int(seconds * fps)
+    start = time.perf_counter()
+    for i in range(frames):
+        # Camera rests most of the time and pans now and then, like on a gun
+        pan = int(max(0, (i % (fps * 6)) - fps * 5) * 4)
+        frame = world[size:size * 2, pan % (size * 6):pan % (size * 6) + size].copy()
+        y, x = (i * 3) % (size - 12), (i * 5) % (size - 12)
+        frame[y:y + 12, x:x + 12] = (0, 220, 255, 255)
+        recorder.set_detection_patch(frame[:5, :5])
+        recorder.append(i / fps, 960, 540, frame)
+    append_ms = (time.perf_counter() - start) * 1000.0 / frames
+    recorder.close()
+    return recorder.get_stats(), append_ms
+
+
+def run_replay(args):
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtGui import QCursor
+    from magnifier_overlay import MagnifiedView, MagnifierPipeline
+    from motion_highlight import MotionHighlighter
+    from session_recorder import ReplaySource, DETECTION_PATCH
+    from detection import is_yellow
+    import image_backend
+    import numpy as np
+    app = get_app()
+    results = {}
+
+    path = args.path
+    if args.synthesize:
+        path = path or "synthetic_session.vfr"
+        print_header(f"Synthesizing {args.synthesize:.0f}s session ({args.mode}, radius {args.radius}, {args.fps} FPS)")
+        stats, append_ms = synthesize_session(path, args.synthesize, args.radius, args.fps, args.mode)
+        per_minute = stats["bytes"] / (1024 * 1024) / (args.synthesize / 60.0)
+        results["recording"] = dict(stats, append_ms=round(append_ms, 3), mb_per_minute=round(per_minute, 1))
+        raw = (args.radius * 2) ** 2 * 4 * args.fps * 60 / (1024 * 1024)
+        print(f"  {stats['bytes'] / (1024 * 1024):.1f} MB, {per_minute:.1f} MB/min (raw frames: {raw:.0f} MB/min), append {append_ms:.3f} ms/frame")
+    if not path:
+        raise SystemExit("replay needs a recording path or --synthesize SECONDS")
+
+    source = ReplaySource(path, realtime=args.realtime)
+    reader = source.reader
+    backend = image_backend.get_backend(args.backend)
+    motion = MotionHighlighter({"motion_budget_ms": args.motion}, backend) if args.motion else None
+    pipeline = MagnifierPipeline(args.scale, backend, motion=motion)
+    view = MagnifiedView(args.window_size, backend)
+    view.show()
+    size = {"left": 0, "top": 0, "width": reader.width, "height": reader.height}
+    patch_region = {"left": 0, "top": 0, "width": DETECTION_PATCH[1], "height": DETECTION_PATCH[0]}
+
+    print_header(f"Replaying {Path(path).name}: {len(reader)} ticks, {reader.duration:.1f}s, "
+                 f"{'real time' if args.realtime else 'as fast as possible'}")
+    timings = {"grab": [], "process": [], "display": [], "detect": []}
+    detections = 0
+    wall = time.perf_counter()
+
+    def tick():
+        nonlocal detections
+        t0 = time.perf_counter()
+        frame = np.array(source.grab(size))
+        t1 = time.perf_counter()
+        if source.exhausted:
+            timer.stop()
+            app.quit()
+            return
+        out = pipeline.process(frame, source.cursor_pos())
+        t2 = time.perf_counter()
+        view.update_image(out, t0)
+        view.repaint()
+        t3 = time.perf_counter()
+        detections += bool(is_yellow(source.grab(patch_region)))
+        t4 = time.perf_counter()
+        for key, value in zip(timings, (t1 - t0, t2 - t1, t3 - t2, t4 - t3)):
+            timings[key].append(value * 1000.0)
+
+    timer = QTimer()
+    timer.timeout.connect(tick)
+    timer.start(int(1000 / args.fps) if args.realtime else 0)
+    app.exec_()
+    wall = time.perf_counter() - wall
+    view.hide()
+    source.close()
+
+    frames = len(timings["grab"])
+    results["replay"] = {name: summarize(values) for name, values in timings.items() if values}
+    results["replay"].update(frames=frames, wall_s=round(wall, 2), fps=round(frames / wall, 1), detections=detections)
+    for name, values in timings.items():
+        if values:
+            stats = summarize(values)
+            print(f"  {name:<8} median {stats['median_ms']:7.3f} ms  p95 {stats['p95_ms']:7.3f} ms")
+    print(f"  {frames} frames in {wall:.1f}s ({frames / wall:.0f} FPS), yellow detected on {detections}")
+    if motion is not None:
+        results["motion"] = motion.get_stats()
+        print(f"  motion highlight: {results['motion']}")
+    return results
+
+
+# ---------------------------------------------------------------------------
+# tiers: interpolation tier cost and quality governor behaviour
+# ---------------------------------------------------------------------------
+
+def simulate_governor(tier_costs, budget_ms, ceiling, load_ms, phases):
+    """Replay a load profile through QualityGovernor using measured tier costs.
+    phases is a list of (frames, extra_load_ms); returns the governor and the
+    (frame, tier) points where the tier changed."""
+    import random
+    from quality_governor import QualityGovernor
+    rng = random.Random(0)
+    governor = QualityGovernor(list(tier_costs), ceiling, budget_ms)
+    timeline = [(0, governor.tier)]
+    frame = 0
+    for frames, extra in phases:
+        for _ in range(frames):
+            cost = tier_costs[governor.tier] + load_ms + extra
+            governor.record(cost * rng.uniform(0.9, 1.1))
+            frame += 1
+            if timeline[-1][1] != governor.tier:
+                timeline.append((frame, governor.tier))
+    return governor, timeline
+
+
+def run_tiers(args):
+    import image_backend
+    from image_backend import INTERPOLATIONS
+    from magnifier_overlay import MagnifierPipeline
+    get_app()
+
+    names = ["numpy"] + (["opencv"] if image_backend.opencv_available() else [])
+    results = {"cost": {}, "governor": {}}
+    print_header("Pipeline cost per tier (median ms)")
+    for name in names:
+        backend = image_backend.get_backend(name)
+        print(f"  {name} backend (native tiers: {', '.join(backend.interpolations)})")
+        print("    " + " " * 20 + "".join(f"{tier:>10}" for tier in INTERPOLATIONS))
+        for radius in args.radii:
+            frame = synthetic_frame(radius)
+            for scale in args.scales:
+                row = {}
+                for tier in INTERPOLATIONS:
+                    pipeline = MagnifierPipeline(scale, backend, tier)
+                    row[tier] = summarize(time_call(lambda: pipeline.process(frame), args.repeat))["median_ms"]
+                results["cost"][f"{name}_r{radius}_x{scale}"] = row
+                label = f"radius {radius} x{scale}"
+                print(f"    {label:<20}" + "".join(f"{row[tier]:10.3f}" for tier in INTERPOLATIONS))
+
+    # Governor under a load spike, using the tier costs of a typical setup
+    name = names[-1]
+    backend = image_backend.get_backend(name)
+    frame = synthetic_frame(args.governor_radius)
+    tier_costs = {}
+    for tier in backend.interpolations:
+        pipeline = MagnifierPipeline(args.governor_scale, backend, tier)
+        tier_costs[tier] = summarize(time_call(lambda: pipeline.process(frame), args.repeat))["median_ms"]
+    budget = args.budget_ms
+    phases = [(300, 0.0), (600, args.spike_ms), (900, 0.0)]
+    ceiling = list(tier_costs)[-1]
+    governor, timeline = simulate_governor(tier_costs, budget, ceiling, args.base_load_ms, phases)
+    results["governor"] = {"budget_ms": budget, "timeline": timeline, "stats": governor.get_stats()}
+    print_header(f"Governor: {name}, radius {args.governor_radius} x{args.governor_scale}, budget {budget} ms, "
+                 f"base load {args.base_load_ms} ms, +{args.spike_ms} ms for frames 300-900")
+    print("  tier cost: " + ", ".join(f"{tier} {cost:.2f} ms" for tier, cost in tier_costs.items()))
+    for frame, tier in timeline:
+        print(f"    frame {frame:>4}: {tier}")
+    stats = governor.get_stats()
+    print(f"  steps down {stats['steps_down']}, steps up {stats['steps_up']}, final tier {stats['tier']}")
+    return results
+
+
+ENHANCE_CASES = {
+    "stretch": {"contrast_stretch": True},
+    "gamma": {"gamma": 1.5},
+    "stretch+gamma": {"contrast_stretch": True, "gamma": 1.5},
+    "clahe": {"clahe": True},
+    "sharpen": {"sharpen": 1.0},
+    "all": {"contrast_stretch": True, "gamma": 1.5, "clahe": True, "sharpen": 1.0},
+}
+
+
+def run_enhance(args):
+    import image_backend
+    from image_enhance import EnhancementStage, describe
+    from magnifier_overlay import MagnifierPipeline
+
+    names = ["numpy"] + (["opencv"] if image_backend.opencv_available() else [])
+    results = {}
+    for name in names:
+        backend = image_backend.get_backend(name)
+        for radius, scale in args.cases:
+            frame = synthetic_frame(int(radius))
+            base = MagnifierPipeline(scale, backend)
+            baseline = summarize(time_call(lambda: base.process(frame), args.repeat))
+            label = f"{name}_r{int(radius)}_x{scale}"
+            out_shape = base.process(frame).shape
+            print_header(f"{name} backend, radius {int(radius)} x{scale} -> {out_shape[1]}x{out_shape[0]}")
+            print(f"  {'resize only':<16} {baseline['median_ms']:8.3f} ms")
+            row = {"resize": baseline}
+            for case, config in ENHANCE_CASES.items():
+                pipeline = MagnifierPipeline(scale, backend, enhance=EnhancementStage(config, backend))
+                stats = summarize(time_call(lambda: pipeline.process(frame), args.repeat))
+                stats["filters_ms"] = pipeline.enhance.get_stats()
+                row[case] = stats
+                added = stats["median_ms"] - baseline["median_ms"]
+                filters = ", ".join(f"{k} {v:.2f}" for k, v in stats["filters_ms"].items())
+                print(f"  {case:<16} {stats['median_ms']:8.3f} ms  (+{added:.2f})  [{describe(config)}]  {filters}")
+            results[label] = row
+    return results
+
+
+def run_threads(args):
+    import image_backend
+    from tiled_resize import TiledResizer
+    get_app()
+
+    names = ["numpy"] + (["opencv"] if image_backend.opencv_available() else [])
+    counts = list(range(1, args.max_threads + 1))
+    results = {"cpu_count": os.cpu_count(), "scaling": {}}
+    print_header(f"Tiled resize scaling, 1-{args.max_threads} threads ({os.cpu_count()} logical cores)")
+    for name in names:
+        backend = image_backend.get_backend(name)
+        cv2 = getattr(backend, "cv2", None)
+        default_threads = cv2.getNumThreads() if cv2 is not None else None
+        for radius, scale in args.cases:
+            frame = synthetic_frame(int(radius))
+            if backend.channels == 3:
+                frame = frame[..., :3]
+            for interpolation in args.interpolations:
+                label = f"{name} r{int(radius)} x{scale} {interpolation}"
+                row = {}
+                for n in counts:
+                    if n == 1:
+                        if cv2 is not None:
+                            cv2.setNumThreads(1)
+                        call = lambda: backend.resize(frame, scale, interpolation)
+                    else:
+                        resizer = TiledResizer(backend, n, min_pixels=0)
+                        call = lambda: resizer.resize(frame, scale, interpolation)
+                    row[n] = summarize(time_call(call, args.repeat))["median_ms"]
+                    if n > 1:
+                        row[f"{n}_bands"] = resizer.last_bands
+                        resizer.close()
+                if cv2 is not None:
+                    # Reference: OpenCV's internal threading at its default width
+                    cv2.setNumThreads(default_threads)
+                    row["opencv_internal"] = summarize(time_call(lambda: backend.resize(frame, scale, interpolation), args.repeat))["median_ms"]
+                results["scaling"][label] = row
+                cells = "  ".join(f"{n}t {row[n]:6.2f} ({row[1] / row[n]:.2f}x)" for n in counts)
+                extra = f"  cv2 default {row['opencv_internal']:6.2f}" if "opencv_internal" in row else ""
+                print(f"  {label:<28} {cells}{extra}")
+        if cv2 is not None:
+            cv2.setNumThreads(default_threads)
+    return results
+
+
+def run_shm(args):
+    import numpy as np
+    from frame_export import SharedFrameExporter
+
+    size = args.window_size
+    frame = np.random.default_rng(0).integers(0, 256, (size, size, args.channels), dtype=np.uint8)
+    name = f"viewfinder_bench_{os.getpid()}"
+    exporter = SharedFrameExporter(name, args.slots, frame.nbytes)
+    interval = 1.0 / args.fps
+    # The example reader in a fresh interpreter, as an external tool would be
+    process = subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve().parent / "frame_reader.py"), "--name", name,
+         "--seconds", str(args.seconds + 0.5), "--work", args.reader, "--json"],
+        stdout=subprocess.PIPE, text=True
+    )
+    # Let the reader attach before the clock starts
+    time.sleep(0.5)
+
+    publish = []
+    next_tick = time.perf_counter()
+    deadline = next_tick + args.seconds
+    while time.perf_counter() < deadline:
+        now = time.perf_counter()
+        if now < next_tick:
+            time.sleep(next_tick - now)
+        next_tick += interval
+        frame[0, 0, 0] = len(publish) & 0xFF
+        t0 = time.perf_counter()
+        exporter.publish(frame, t0)
+        publish.append((time.perf_counter() - t0) * 1000.0)
+    output, _ = process.communicate(timeout=30)
+    exporter.close()
+    seen = json.loads(output.strip().splitlines()[-1])
+
+    mb = frame.nbytes / (1024 * 1024)
+    results = {
+        "frame": f"{size}x{size}x{args.channels}",
+        "fps": args.fps,
+        "published": len(publish),
+        "publish": summarize(publish),
+        "write_mb_s": round(mb * len(publish) / max(args.seconds, 1e-9), 1),
+        "reader": {
+            "mode": args.reader,
+            "frames": seen["frames"],
+            "missed": seen["missed"],
+            "torn": seen["torn"],
+        },
+    }
+    if "latency_ms" in seen:
+        results["reader"]["latency"] = {"median_ms": seen["latency_ms"]["median"], "p95_ms": seen["latency_ms"]["p95"]}
+    print_header(f"Shared-memory export: {results['frame']} ({mb:.2f} MiB) at {args.fps} FPS, {args.slots} slots")
+    print(f"  writer: {len(publish)} frames, publish {results['publish']['median_ms']:.3f} ms median / "
+          f"{results['publish']['p95_ms']:.3f} ms p95, {results['write_mb_s']} MiB/s")
+    print(f"  reader ({args.reader}): {seen['frames']} frames, {seen['missed']} missed, {seen['torn']} torn")
+    if "latency" in results["reader"]:
+        latency = results["reader"]["latency"]
+        print(f"  capture -> reader done: {latency['median_ms']:.3f} ms median / {latency['p95_ms']:.3f} ms p95")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ViewFinder benchmarks")
+    parser.add_argument("--json", help="also write results to this file")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("backends", help="OpenCV vs NumPy/Qt image backend")
+    p.add_argument("--runs", type=int, default=5, help="fresh-interpreter startup runs")
+    p.add_argument("--repeat", type=int, default=50, help="frames per configuration")
+    p.add_argument("--radii", type=int, nargs="+", default=[50, 120, 300])
+    p.add_argument("--scales", type=float, nargs="+", default=[2.0, 3.5, 10.0])
+    p.set_defaults(func=run_backends)
+
+    p = sub.add_parser("paint", help="QLabel.setPixmap vs paintEvent magnified view")
+    p.add_argument("--fps", type=int, default=60)
+    p.add_argument("--seconds", type=float, default=3.0, help="duration per view and case")
+    p.add_argument("--window-size", type=int, default=800)
+    p.add_argument("--backend", default="auto", choices=["auto", "opencv", "numpy"])
+    p.add_argument("--cases", type=float, nargs=2, action="append", metavar=("RADIUS", "SCALE"),
+                   help="radius/scale pairs (default: 200 2, 100 4, 120 2)")
+    p.set_defaults(func=run_paint)
+
+    p = sub.add_parser("predict", help="cursor predictor error on recorded or synthetic tracks")
+    p.add_argument("--track", nargs="+", help="CSV cursor tracks (t_ms,x,y); default: synthetic pans/flicks/jitter")
+    p.add_argument("--record", type=float, metavar="SECONDS", help="record a cursor track instead of evaluating")
+    p.add_argument("--out", default="cursor_track.csv", help="where --record writes the track")
+    p.add_argument("--fps", type=int, default=30, help="capture rate")
+    p.add_argument("--display-hz", type=int, default=60, help="cursor sample rate")
+    p.add_argument("--lead-ms", type=float, nargs="+", default=[16.0, 33.0, 50.0])
+    p.set_defaults(func=run_predict)
+
+    p = sub.add_parser("replay", help="feed a recorded session through the magnifier and detection pipelines")
+    p.add_argument("path", nargs="?", help="session recording (.vfr)")
+    p.add_argument("--realtime", action="store_true", help="pace by the recorded timestamps instead of flat out")
+    p.add_argument("--synthesize", type=float, metavar="SECONDS", help="first write a synthetic recording to path")
+    p.add_argument("--mode", default="delta", choices=["delta", "sparse"], help="mode for --synthesize")
+    p.add_argument("--radius", type=int, default=120, help="lens radius for --synthesize")
+    p.add_argument("--fps", type=int, default=30, help="capture rate for --synthesize and --realtime")
+    p.add_argument("--scale", type=float, default=2.0)
+    p.add_argument("--window-size", type=int, default=400)
+    p.add_argument("--backend", default="auto", choices=["auto", "opencv", "numpy"])
+    p.add_argument("--motion", type=float, metavar="BUDGET_MS", help="enable motion highlighting with this budget")
+    p.set_defaults(func=run_replay)
+
+    p = sub.add_parser("tiers", help="interpolation tier cost and quality governor simulation")
+    p.add_argument("--repeat", type=int, default=20)
+    p.add_argument("--radii", type=int, nargs="+", default=[50, 300])
+    p.add_argument("--scales", type=float, nargs="+", default=[0.1, 10.0])
+    p.add_argument("--budget-ms", type=float, default=33.0, help="frame budget for the governor simulation")
+    p.add_argument("--base-load-ms", type=float, default=12.0, help="grab/paint cost added to every frame")
+    p.add_argument("--spike-ms", type=float, default=15.0, help="extra load during the spike")
+    p.add_argument("--governor-radius", type=int, default=120)
+    p.add_argument("--governor-scale", type=float, default=3.3)
+    p.set_defaults(func=run_tiers)
+
+    p = sub.add_parser("enhance", help="per-filter cost of the magnified-frame enhancement stage")
+    p.add_argument("--repeat", type=int, default=30)
+    p.add_argument("--cases", type=float, nargs=2, action="append", metavar=("RADIUS", "SCALE"),
+                   help="radius/scale pairs (default: 120 2, 200 2)")
+    p.set_defaults(func=run_enhance)
+
+    p = sub.add_parser("shm", help="shared-memory frame export throughput with a reader process")
+    p.add_argument("--fps", type=int, default=60)
+    p.add_argument("--window-size", type=int, default=800, help="exported frame is window_size square")
+    p.add_argument("--channels", type=int, default=4, choices=[3, 4])
+    p.add_argument("--seconds", type=float, default=5.0)
+    p.add_argument("--slots", type=int, default=3)
+    p.add_argument("--reader", default="copy", choices=["copy", "checksum", "none"],
+                   help="what the reader does with each frame it maps")
+    p.set_defaults(func=run_shm)
+
+    p = sub.add_parser("threads", help="tiled multi-threaded resize scaling across thread counts")
+    p.add_argument("--repeat", type=int, default=20)
+    p.add_argument("--max-threads", type=int, default=min(os.cpu_count() or 1, 8))
+    p.add_argument("--interpolations", nargs="+", default=["linear", "cubic"])
+    p.add_argument("--cases", type=float, nargs=2, action="append", metavar=("RADIUS", "SCALE"),
+                   help="radius/scale pairs (default: 120 3.3, 200 2, 300 2)")
+    p.set_defaults(func=run_threads)
+
+    args = parser.parse_args()
+    if getattr(args, "cases", False) is None:
+        if args.command == "threads":
+            args.cases = [(120, 3.3), (200, 2.0), (300, 2.0)]
+        elif args.command == "enhance":
+            args.cases = [(120, 2.0), (200, 2.0)]
+        else:
+            args.cases = [(200, 2.0), (100, 4.0), (120, 2.0)]
+    results = args.func(args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,15 +9,73 @@ Searches for files in subdirectories automatically.
 
 import sys
 import os
+import ast
+import json
+import time
+import shutil
+import tempfile
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QPushButton, QTextEdit, QProgressBar, QMessageBox, QGroupBox, QFileDialog
+    QPushButton, QTextEdit, QProgressBar, QMessageBox, QGroupBox, QFileDialog,
+    QComboBox, QCheckBox
 )
 from PyQt5.QtCore import QThread, pyqtSignal, Qt
 from PyQt5.QtGui import QFont
 
+# "standard" is the original single-file build. "startup" trades the single
+# .exe for a folder, so nothing is unpacked to a temp directory on launch,
+# and leaves out modules the app never imports.
+BUILD_PROFILES = {
+    "standard": {
+        "label": "Standard (single .exe)",
+        "onedir": False,
+        "trace_excludes": False,
+    },
+    "startup": {
+        "label": "Fast startup (folder, traced excludes)",
+        "onedir": True,
+        "trace_excludes": True,
+    },
+}
+
+# Modules PyInstaller can pull in through optional imports and hooks. One is
+# excluded only if neither the traced run nor any project source imports it.
+EXCLUDE_CANDIDATES = [
+    "tkinter", "PIL", "matplotlib", "scipy", "pandas", "IPython", "jedi",
+    "pytest", "setuptools", "pkg_resources", "distutils", "lib2to3",
+    "unittest", "pydoc", "doctest", "xmlrpc", "sqlite3", "pdb",
+    "PyQt5.QtNetwork", "PyQt5.QtQml", "PyQt5.QtQuick", "PyQt5.QtSql",
+    "PyQt5.QtMultimedia", "PyQt5.QtWebEngineCore", "PyQt5.QtWebEngineWidgets",
+    "PyQt5.QtBluetooth", "PyQt5.QtSvg", "PyQt5.QtOpenGL", "PyQt5.QtPrintSupport",
+]
+
+TRACE_SECONDS = 8
+LAUNCH_TIMEOUT_S = 30
+# Entry points that write a startup timeline once the first frame is shown
+LAUNCH_REPORT_TARGETS = {"ViewFinder_0.9.pyw"}
+STARTUP_REPORT_ENV = "VIEWFINDER_STARTUP_REPORT"
+MAX_PARALLEL_BUILDS = 3
+
+# Runs an entry point for a few seconds, then writes sys.modules as JSON
+TRACE_SCRIPT = r"""
+import json, os, runpy, sys, threading
+out, target, seconds = sys.argv[1], sys.argv[2], float(sys.argv[3])
+def dump():
+    with open(out, "w") as f:
+        json.dump(sorted(sys.modules), f)
+    os._exit(0)
+threading.Timer(seconds, dump).start()
+sys.argv = [target]
+sys.path.insert(0, os.path.dirname(target))
+try:
+    runpy.run_path(target, run_name="__main__")
+finally:
+    dump()
+"""
+
 
 def find_file(filename, search_depth=3, custom_path=None):
     """
@@ -57,85 +115,240 @@ def find_file(filename, search_depth=3, custom_path=None):
     return None
 
 
+def no_window_flags():
+    return subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+
+
+def trace_imports(script_path, seconds=TRACE_SECONDS):
+    """
+    Run an entry point headless (offscreen Qt, temporary working directory,
+    default config) and return the set of module names it imported.
+    """
+    workdir = tempfile.mkdtemp(prefix="viewfinder_trace_")
+    out = os.path.join(workdir, "modules.json")
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    try:
+        subprocess.run(
+            [sys.executable, "-c", TRACE_SCRIPT, out, script_path, str(seconds)],
+            cwd=workdir, env=env, capture_output=True,
+            timeout=seconds + 30, creationflags=no_window_flags()
+        )
+        with open(out, "r") as f:
+            return set(json.load(f))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def project_imports(directory):
+    """
+    Module names imported anywhere in the project's sources, including lazy
+    imports inside functions that a short traced run never reaches.
+    """
+    names = set()
+    for path in list(Path(directory).glob("*.py")) + list(Path(directory).glob("*.pyw")):
+        try:
+            tree = ast.parse(path.read_text(encoding="utf-8"))
+        except (SyntaxError, UnicodeDecodeError):
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names.add(node.module)
+                names.update(f"{node.module}.{alias.name}" for alias in node.names)
+    return names
+
+
+def derive_excludes(traced, imported):
+    """Exclusion candidates that neither the traced run nor the sources use"""
+    used = traced | imported
+    return [name for name in EXCLUDE_CANDIDATES
+            if not any(module == name or module.startswith(name + ".") for module in used)]
+
+
+def artifact_path(output_name, onedir):
+    if onedir:
+        return os.path.join("dist", output_name, f"{output_name}.exe")
+    return os.path.join("dist", f"{output_name}.exe")
+
+
+def artifact_size(output_name, onedir):
+    """Size in bytes of the built .exe, or of the whole folder for onedir builds"""
+    if not onedir:
+        return os.path.getsize(artifact_path(output_name, onedir))
+    return sum(p.stat().st_size for p in Path("dist", output_name).rglob("*") if p.is_file())
+
+
+def kill_tree(process):
+    # A onefile .exe is a bootloader with the app as a child process
+    if os.name == 'nt':
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                       capture_output=True, creationflags=no_window_flags())
+    else:
+        process.kill()
+    process.wait()
+
+
+def measure_launch(executable, timeout=LAUNCH_TIMEOUT_S):
+    """
+    Start a built executable headless (offscreen Qt, default config) and wait
+    for the startup timeline it writes after the first magnifier frame.
+    Returns {"wall_ms", "first_frame_ms"} or {"error"}. wall_ms counts from
+    process start, so it includes unpacking and interpreter startup; the
+    timeline's own marks start once Python runs.
+    """
+    workdir = tempfile.mkdtemp(prefix="viewfinder_launch_")
+    report = os.path.join(workdir, "startup.json")
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    env[STARTUP_REPORT_ENV] = report
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [os.path.abspath(executable)], cwd=workdir, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        creationflags=no_window_flags()
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if os.path.exists(report):
+                try:
+                    with open(report, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except ValueError:
+                    # Still being written
+                    time.sleep(0.05)
+                    continue
+                wall_ms = (time.perf_counter() - start) * 1000.0
+                marks = {mark["name"]: mark["ms"] for mark in data.get("marks", [])}
+                return {"wall_ms": wall_ms, "first_frame_ms": marks.get("first magnifier frame")}
+            if process.poll() is not None:
+                return {"error": f"exited with code {process.returncode} before its first frame"}
+            time.sleep(0.05)
+        return {"error": f"no startup report within {timeout} s"}
+    finally:
+        if process.poll() is None:
+            kill_tree(process)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
 class CompileThread(QThread):
     log_signal = pyqtSignal(str)
     finished_signal = pyqtSignal(bool, str)
 
-    def __init__(self, targets, custom_path=None):
+    def __init__(self, targets, custom_path=None, profile="standard", measure_startup=False):
         super().__init__()
         self.targets = targets  # List of (file, name, description) tuples
         self.custom_path = custom_path
+        self.profile = BUILD_PROFILES[profile]
+        self.measure_startup = measure_startup
 
-    def compile_single(self, target_file, output_name, description):
+    def compile_single(self, target_file, output_name, description, concurrent=False):
         """Compile a single file"""
-        self.log_signal.emit("\n" + "=" * 60)
-        self.log_signal.emit(f"Compiling: {description}")
-        self.log_signal.emit("=" * 60)
+        # Concurrent builds interleave their output, so tag each line
+        def log(text):
+            if concurrent:
+                text = "\n".join(f"[{output_name}] {line}" for line in text.split("\n"))
+            self.log_signal.emit(text)
+
+        log("\n" + "=" * 60)
+        log(f"Compiling: {description}")
+        log("=" * 60)
 
         # Find the file (may be in subdirectory or custom path)
         found_path = find_file(target_file, custom_path=self.custom_path)
         if not found_path:
-            self.log_signal.emit(f"✗ ERROR: File not found: {target_file}")
+            log(f"✗ ERROR: File not found: {target_file}")
             if self.custom_path:
-                self.log_signal.emit(f"  Searched in: {self.custom_path}")
+                log(f"  Searched in: {self.custom_path}")
             else:
-                self.log_signal.emit(f"  Searched in current directory and subdirectories (depth 3)")
+                log(f"  Searched in current directory and subdirectories (depth 3)")
             return False
         
-        self.log_signal.emit(f"✓ Found: {found_path}")
-        self.log_signal.emit(f"📦 Output: {output_name}.exe\n")
+        onedir = self.profile["onedir"]
+        output_path = artifact_path(output_name, onedir)
+        log(f"✓ Found: {found_path}")
+        log(f"📦 Output: {output_path}\n")
 
         # Build PyInstaller command
         cmd = [
             "pyinstaller",
-            "--onefile",
+            "--onedir" if onedir else "--onefile",
             "--noconsole",
-            "--clean",
             f"--name={output_name}",
-            found_path
         ]
-
-        self.log_signal.emit("Command: " + " ".join(cmd))
-        self.log_signal.emit("-" * 60)
+        if concurrent:
+            # --clean wipes the cache shared by all builds; clear only this
+            # target's work folder instead
+            shutil.rmtree(os.path.join("build", output_name), ignore_errors=True)
+        else:
+            cmd.append("--clean")
+        if onedir:
+            # UPX-packed DLLs are decompressed on every load
+            cmd.append("--noupx")
+
+        if self.profile["trace_excludes"]:
+            log(f"Tracing imports ({TRACE_SECONDS} s headless run)...")
+            try:
+                traced = trace_imports(found_path)
+                excludes = derive_excludes(traced, project_imports(os.path.dirname(found_path)))
+                log(f"✓ Traced {len(traced)} modules, excluding: {', '.join(excludes) or 'none'}")
+                cmd.extend(f"--exclude-module={name}" for name in excludes)
+            except Exception as e:
+                log(f"⚠ Import trace failed ({e}), building without excludes")
+
+        cmd.append(found_path)
+
+        log("Command: " + " ".join(cmd))
+        log("-" * 60)
 
         try:
-            creationflags = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-            
             process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 universal_newlines=True,
                 bufsize=1,
-                creationflags=creationflags
+                creationflags=no_window_flags()
             )
 
             for line in iter(process.stdout.readline, ''):
                 if line.strip():
-                    self.log_signal.emit(line.rstrip())
+                    log(line.rstrip())
 
             process.stdout.close()
             return_code = process.wait()
 
             if return_code == 0:
-                output_path = os.path.join("dist", f"{output_name}.exe")
                 if os.path.exists(output_path):
-                    file_size = os.path.getsize(output_path) / (1024 * 1024)
-                    self.log_signal.emit(f"\n✓ SUCCESS: {description}")
-                    self.log_signal.emit(f"✓ Created: {output_path}")
-                    self.log_signal.emit(f"✓ Size: {file_size:.2f} MB")
+                    file_size = artifact_size(output_name, onedir) / (1024 * 1024)
+                    log(f"\n✓ SUCCESS: {description}")
+                    log(f"✓ Created: {output_path}")
+                    log(f"✓ Size: {file_size:.2f} MB")
                     return True
                 else:
-                    self.log_signal.emit(f"\n✗ FAILED: Executable not found")
+                    log(f"\n✗ FAILED: Executable not found")
                     return False
             else:
-                self.log_signal.emit(f"\n✗ FAILED: Compilation error (code {return_code})")
+                log(f"\n✗ FAILED: Compilation error (code {return_code})")
                 return False
 
         except Exception as e:
-            self.log_signal.emit(f"\n✗ ERROR: {str(e)}")
+            log(f"\n✗ ERROR: {str(e)}")
             return False
 
+    def report_startup(self, target_file, output_name):
+        """Launch a built target headless and log its size and time to first frame"""
+        onedir = self.profile["onedir"]
+        size_mb = artifact_size(output_name, onedir) / (1024 * 1024)
+        self.log_signal.emit(f"\nMeasuring startup: {artifact_path(output_name, onedir)} ({size_mb:.2f} MB)")
+        result = measure_launch(artifact_path(output_name, onedir))
+        if "error" in result:
+            self.log_signal.emit(f"⚠ Startup measurement failed: {result['error']}")
+            return
+        self.log_signal.emit(f"✓ First frame after {result['wall_ms']:.0f} ms from launch")
+        if result["first_frame_ms"] is not None:
+            overhead = result["wall_ms"] - result["first_frame_ms"]
+            self.log_signal.emit(f"  {result['first_frame_ms']:.0f} ms in Python, ~{overhead:.0f} ms unpacking and interpreter start")
+
     def run(self):
         self.log_signal.emit("=" * 60)
         self.log_signal.emit("ViewFinder Compilation Started")
@@ -147,7 +360,7 @@ class CompileThread(QThread):
                 ["pyinstaller", "--version"],
                 capture_output=True,
                 text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+                creationflags=no_window_flags()
             )
             self.log_signal.emit(f"✓ PyInstaller: {result.stdout.strip()}\n")
         except FileNotFoundError:
@@ -156,16 +369,28 @@ class CompileThread(QThread):
             self.finished_signal.emit(False, "PyInstaller not installed")
             return
 
-        # Compile each target
-        all_success = True
-        successful_files = []
-        
-        for target_file, output_name, description in self.targets:
-            success = self.compile_single(target_file, output_name, description)
-            if success:
-                successful_files.append(f"{output_name}.exe")
-            else:
-                all_success = False
+        self.log_signal.emit(f"Profile: {self.profile['label']}")
+
+        # Targets are independent, so build them side by side
+        concurrent = len(self.targets) > 1
+        workers = min(len(self.targets), MAX_PARALLEL_BUILDS, os.cpu_count() or 1) if concurrent else 1
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            results = list(pool.map(
+                lambda target: self.compile_single(*target, concurrent=concurrent),
+                self.targets
+            ))
+        self.log_signal.emit(f"\nBuilt {len(self.targets)} target(s) in {time.perf_counter() - started:.0f} s ({workers} at a time)")
+
+        all_success = all(results)
+        built = [target for target, success in zip(self.targets, results) if success]
+        successful_files = [artifact_path(output_name, self.profile["onedir"]) for _, output_name, _ in built]
+
+        # Measured after all builds finish so they don't skew the timings
+        if self.measure_startup:
+            for target_file, output_name, _ in built:
+                if target_file in LAUNCH_REPORT_TARGETS:
+                    self.report_startup(target_file, output_name)
 
         # Final summary
         self.log_signal.emit("\n" + "=" * 60)
@@ -182,8 +407,10 @@ class CompileThread(QThread):
                 self.log_signal.emit("\n📌 USAGE INSTRUCTIONS:")
                 self.log_signal.emit("  1. Run ViewFinder.exe (the launcher)")
                 self.log_signal.emit("  2. It will open the config menu first")
-                self.log_signal.emit("  3. Then automatically start the main app")
-                self.log_signal.emit("\n  OR distribute all 3 .exe files together!")
+                self.log_signal.emit("  3. 'Run ViewFinder' starts the overlays in the same process")
+                self.log_signal.emit("\n  ViewFinder.exe is self-contained; the other two are standalone alternatives.")
+                if self.profile["onedir"]:
+                    self.log_signal.emit("  Each one is a folder: copy the whole folder, not just the .exe.")
             
             self.finished_signal.emit(True, "All compilations successful!")
         else:
@@ -264,7 +491,7 @@ class CompilerGUI(QWidget):
         info_label = QLabel(
             "Choose your compilation strategy:\n\n"
             "• Compile All (Recommended): Creates 3 standalone .exe files\n"
-            "  - ViewFinder.exe (launcher)\n"
+            "  - ViewFinder.exe (launcher: config menu + overlays in one process)\n"
             "  - ViewFinder_Config.exe (config menu)\n"
             "  - ViewFinder_Main.exe (main overlay app)\n\n"
             "• Individual Compilation: Compile each component separately\n\n"
@@ -273,6 +500,25 @@ class CompilerGUI(QWidget):
         info_label.setWordWrap(True)
         options_layout.addWidget(info_label)
 
+        profile_row = QHBoxLayout()
+        profile_row.addWidget(QLabel("Build profile:"))
+        self.profile_combo = QComboBox()
+        for key, profile in BUILD_PROFILES.items():
+            self.profile_combo.addItem(profile["label"], key)
+        self.profile_combo.setToolTip(
+            "Fast startup builds a folder instead of a single .exe (nothing to unpack on launch)\n"
+            "and excludes modules that a traced run of the app never imports."
+        )
+        profile_row.addWidget(self.profile_combo)
+        self.measure_startup_check = QCheckBox("Measure startup after build")
+        self.measure_startup_check.setChecked(True)
+        self.measure_startup_check.setToolTip(
+            "Launches the built main app headless and reports its size and time to first frame"
+        )
+        profile_row.addWidget(self.measure_startup_check)
+        profile_row.addStretch()
+        options_layout.addLayout(profile_row)
+
         # Main button - Compile All
         self.compile_all_btn = QPushButton("🚀 Compile All Components\n(Recommended - Creates 3 .exe files)")
         self.compile_all_btn.clicked.connect(self.compile_all)
@@ -511,6 +757,7 @@ class CompilerGUI(QWidget):
         self.compile_config_btn.setEnabled(False)
         self.compile_main_btn.setEnabled(False)
         self.open_dist_btn.setEnabled(False)
+        self.profile_combo.setEnabled(False)
         self.browse_folder_btn.setEnabled(False)
         self.clear_folder_btn.setEnabled(False)
         
@@ -521,7 +768,11 @@ class CompilerGUI(QWidget):
         self.log_output.clear()
         
         # Start thread with custom path if set
-        self.compile_thread = CompileThread(targets, self.custom_search_path)
+        self.compile_thread = CompileThread(
+            targets, self.custom_search_path,
+            profile=self.profile_combo.currentData(),
+            measure_startup=self.measure_startup_check.isChecked()
+        )
         self.compile_thread.log_signal.connect(self.append_log)
         self.compile_thread.finished_signal.connect(self.compilation_finished)
         self.compile_thread.start()
@@ -537,6 +788,7 @@ class CompilerGUI(QWidget):
         self.compile_launcher_btn.setEnabled(True)
         self.compile_config_btn.setEnabled(True)
         self.compile_main_btn.setEnabled(True)
+        self.profile_combo.setEnabled(True)
         self.browse_folder_btn.setEnabled(True)
         if self.custom_search_path:
             self.clear_folder_btn.setEnabled(True)
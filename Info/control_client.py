@@ -0,0 +1,86 @@
+"""
+ViewFinder Control Client
+Sends commands to a running ViewFinder over its control socket (enable the
+"control" section in viewfinder_config.json first). Handy for stream-deck
+style macros, and as a reference for writing your own client: the protocol
+is one command per line, one JSON reply per line.
+
+Usage:
+    python Info/control_client.py toggle magnifier
+    python Info/control_client.py zoom 3.5
+    python Info/control_client.py auto on
+    python Info/control_client.py reload
+    python Info/control_client.py --watch 500      # stream stats every 500 ms
+    python Info/control_client.py --tcp 47815 stats
+"""
+
+import sys
+import json
+import time
+import argparse
+
+TIMEOUT_MS = 2000
+
+
+def connect(args):
+    if args.tcp:
+        from PyQt5.QtNetwork import QTcpSocket
+        socket = QTcpSocket()
+        socket.connectToHost("127.0.0.1", args.tcp)
+    else:
+        from PyQt5.QtNetwork import QLocalSocket
+        socket = QLocalSocket()
+        socket.connectToServer(args.name)
+    if not socket.waitForConnected(TIMEOUT_MS):
+        raise SystemExit(f"Could not connect: {socket.errorString()} (is the control server enabled?)")
+    return socket
+
+
+def read_line(socket, timeout_ms=TIMEOUT_MS):
+    while not socket.canReadLine():
+        if not socket.waitForReadyRead(timeout_ms):
+            return None
+    return bytes(socket.readLine()).decode("utf-8").strip()
+
+
+def send(socket, line):
+    socket.write((line + "\n").encode("utf-8"))
+    socket.waitForBytesWritten(TIMEOUT_MS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ViewFinder control client")
+    parser.add_argument("command", nargs="*", help="e.g. 'toggle magnifier', 'zoom 3', 'auto on', 'reload', 'stats'")
+    parser.add_argument("--name", default="viewfinder-control", help="local socket name")
+    parser.add_argument("--tcp", type=int, metavar="PORT", help="connect over localhost TCP instead")
+    parser.add_argument("--watch", type=int, metavar="MS", help="subscribe and print stats at this interval")
+    args = parser.parse_args()
+
+    from PyQt5.QtCore import QCoreApplication
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    socket = connect(args)
+
+    if args.command:
+        start = time.perf_counter()
+        send(socket, " ".join(args.command))
+        reply = read_line(socket)
+        print(reply if reply is not None else "No reply")
+        print(f"({(time.perf_counter() - start) * 1000:.1f} ms round trip)", file=sys.stderr)
+
+    if args.watch:
+        send(socket, f"subscribe {args.watch}")
+        read_line(socket)
+        try:
+            while True:
+                line = read_line(socket, 60000)
+                if line is None:
+                    break
+                stats = json.loads(line).get("stats")
+                if stats is not None:
+                    print("  ".join(f"{key}={value}" for key, value in stats.items()))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
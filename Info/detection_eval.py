@@ -0,0 +1,337 @@
+"""
+ViewFinder Detection Evaluation
+Runs the weapon-equipped detector over a directory of labeled screenshots and
+reports precision/recall overall and per map and time-of-day tag, plus raw
+detector throughput. Headless; no game or display needed.
+
+Dataset layout (either):
+    <root>/<equipped|holstered>/[<map>/[<time_of_day>/]]*.png
+    <root>/labels.csv with columns path,label[,map][,time_of_day]
+
+The 5x5 probe patches are cut out once and cached next to the dataset as a
+memory-mapped .npy (invalidated when files, sizes or the probe change), so
+re-running after a threshold change only costs the detector itself.
+
+Usage:
+    python Info/detection_eval.py screenshots/
+    python Info/detection_eval.py screenshots/ --probe 1718 877 --sweep
+    python Info/detection_eval.py screenshots/ --config viewfinder_config.json --errors 20
+    python Info/detection_eval.py /tmp/synthetic --synthesize 2000
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BRM5_DIR = Path(__file__).resolve().parent.parent / "BRM5"
+sys.path.insert(0, str(BRM5_DIR))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+LABELS = ("equipped", "holstered")
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp"}
+CACHE_NAME = ".viewfinder_patches"
+PATCH = 5
+
+
+def print_header(text):
+    """Print a formatted header"""
+    print("\n" + "=" * 60)
+    print(f"  {text}")
+    print("=" * 60 + "\n")
+
+
+def scan_dataset(root):
+    """List of {"path", "label", "map", "time"} from labels.csv or the directory layout"""
+    root = Path(root)
+    manifest = root / "labels.csv"
+    samples = []
+    if manifest.exists():
+        with open(manifest, newline="") as f:
+            for row in csv.DictReader(f):
+                label = row["label"].strip().lower()
+                if label not in LABELS:
+                    raise SystemExit(f"{manifest}: unknown label '{row['label']}' (expected {' or '.join(LABELS)})")
+                samples.append({"path": str(root / row["path"]), "label": label,
+                                "map": row.get("map") or "-", "time": row.get("time_of_day") or "-"})
+        return samples
+    for label in LABELS:
+        base = root / label
+        if not base.is_dir():
+            continue
+        for path in sorted(base.rglob("*")):
+            if path.suffix.lower() not in IMAGE_EXTENSIONS:
+                continue
+            tags = path.relative_to(base).parts[:-1]
+            samples.append({"path": str(path), "label": label,
+                            "map": tags[0] if len(tags) > 0 else "-", "time": tags[1] if len(tags) > 1 else "-"})
+    return samples
+
+
+def image_loader():
+    """Path -> BGRA uint8 array; OpenCV when installed, otherwise QImage"""
+    import numpy as np
+    try:
+        import cv2
+
+        def load(path):
+            image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+            if image is None:
+                raise ValueError(f"could not read {path}")
+            if image.ndim == 2:
+                return cv2.cvtColor(image, cv2.COLOR_GRAY2BGRA)
+            if image.shape[2] == 3:
+                return cv2.cvtColor(image, cv2.COLOR_BGR2BGRA)
+            return image
+        return load
+    except ImportError:
+        from PyQt5.QtCore import QCoreApplication
+        from PyQt5.QtGui import QImage
+        QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+
+        def load(path):
+            image = QImage(path)
+            if image.isNull():
+                raise ValueError(f"could not read {path}")
+            image = image.convertToFormat(QImage.Format_ARGB32)
+            ptr = image.constBits()
+            ptr.setsize(image.sizeInBytes())
+            # Format_ARGB32 is B, G, R, A in memory on little-endian machines
+            return np.frombuffer(ptr, np.uint8).reshape(image.height(), image.bytesPerLine() // 4, 4)[:, :image.width()].copy()
+        return load
+
+
+def probe_for(size, probe, config):
+    """Probe for an image of this size: calibrated probe_cache entry, else the default"""
+    width, height = size
+    cache = config.get("probe_cache", {}) if config else {}
+    for key, pos in cache.items():
+        if key.split("@")[0] == f"{width}x{height}":
+            return tuple(pos)
+    return probe
+
+
+def extract_patch(image, pos):
+    """The 5x5 BGRA patch the runtime samples around pos (zero-padded at edges)"""
+    import numpy as np
+    half = PATCH // 2
+    x, y = pos
+    patch = np.zeros((PATCH, PATCH, 4), np.uint8)
+    h, w = image.shape[:2]
+    x0, y0, x1, y1 = max(0, x - half), max(0, y - half), min(w, x + half + 1), min(h, y + half + 1)
+    if x0 < x1 and y0 < y1:
+        patch[y0 - (y - half):y1 - (y - half), x0 - (x - half):x1 - (x - half)] = image[y0:y1, x0:x1]
+    return patch
+
+
+def cache_signature(samples, probe, config):
+    files = [[s["path"], os.path.getsize(s["path"]), int(os.path.getmtime(s["path"]))] for s in samples]
+    return {"probe": list(probe), "probe_cache": (config or {}).get("probe_cache", {}), "files": files}
+
+
+def load_patches(root, samples, probe, config, threads, use_cache=True):
+    """(N, 5, 5, 4) patches for samples, memory-mapped from the cache when valid"""
+    import numpy as np
+    cache = Path(root) / (CACHE_NAME + ".npy")
+    meta = Path(root) / (CACHE_NAME + ".json")
+    signature = cache_signature(samples, probe, config)
+    if use_cache and cache.exists() and meta.exists():
+        with open(meta) as f:
+            if json.load(f) == signature:
+                return np.load(cache, mmap_mode="r"), True
+
+    load = image_loader()
+
+    def patch_of(sample):
+        image = load(sample["path"])
+        return extract_patch(image, probe_for((image.shape[1], image.shape[0]), probe, config))
+
+    # Decoding dominates; OpenCV and Qt both release the GIL while decoding
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        patches = np.stack(list(pool.map(patch_of, samples))) if samples else np.zeros((0, PATCH, PATCH, 4), np.uint8)
+    if use_cache:
+        try:
+            np.save(cache, patches)
+            with open(meta, "w") as f:
+                json.dump(signature, f)
+        except OSError as e:
+            print(f"[WARN] Could not write patch cache: {e}")
+    return patches, False
+
+
+def confusion(predicted, actual):
+    tp = int((predicted & actual).sum())
+    fp = int((predicted & ~actual).sum())
+    fn = int((~predicted & actual).sum())
+    tn = int((~predicted & ~actual).sum())
+    return {
+        "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+        "precision": round(tp / (tp + fp), 4) if tp + fp else None,
+        "recall": round(tp / (tp + fn), 4) if tp + fn else None,
+        "accuracy": round((tp + tn) / max(1, tp + fp + fn + tn), 4),
+    }
+
+
+def format_row(name, stats):
+    def pct(value):
+        return "   -  " if value is None else f"{value * 100:5.1f}%"
+    total = stats["tp"] + stats["fp"] + stats["fn"] + stats["tn"]
+    return (f"  {name:<24} n={total:<6} precision {pct(stats['precision'])}  recall {pct(stats['recall'])}  "
+            f"accuracy {pct(stats['accuracy'])}  (tp {stats['tp']} fp {stats['fp']} fn {stats['fn']} tn {stats['tn']})")
+
+
+def time_detector(detector, patches, repeat):
+    """Probes per second of the per-call detector, as the runtime calls it"""
+    count = min(len(patches), 2000)
+    subset = [patches[i] for i in range(count)]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for patch in subset:
+            detector(patch)
+    elapsed = time.perf_counter() - start
+    return count * repeat / elapsed if elapsed else 0.0
+
+
+def synthesize(root, count, probe, size=(1920, 1080), seed=0):
+    """Write a labeled synthetic dataset (noise scenes, HUD yellow at the probe when equipped)"""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    maps = ["ravenna", "shipyard", "outpost"]
+    times = ["day", "dusk", "night"]
+    try:
+        import cv2
+        write = lambda path, image: cv2.imwrite(path, image)
+    except ImportError:
+        from PyQt5.QtGui import QImage
+        def write(path, image):
+            h, w = image.shape[:2]
+            QImage(np.ascontiguousarray(image).data, w, h, w * 4, QImage.Format_ARGB32).save(path)
+    x, y = probe
+    for i in range(count):
+        label = LABELS[i % 2]
+        map_name, tod = maps[i % 3], times[(i // 3) % 3]
+        brightness = {"day": 200, "dusk": 140, "night": 60}[tod]
+        # Blocky low-detail scene: compresses and decodes like a real screenshot
+        coarse = rng.integers(0, brightness, (size[1] // 16 + 1, size[0] // 16 + 1, 4), dtype=np.uint8)
+        image = np.ascontiguousarray(coarse.repeat(16, 0).repeat(16, 1)[:size[1], :size[0]])
+        image[..., 3] = 255
+        if label == "equipped" and rng.random() > 0.03:
+            image[y - 6:y + 7, x - 20:x + 20, :3] = (40, 215, 230)
+        elif rng.random() < 0.03:
+            # Yellow scenery behind the probe: a false positive for the detector
+            image[y - 8:y + 9, x - 8:x + 9, :3] = (60, 200, 210)
+        directory = Path(root) / label / map_name / tod
+        directory.mkdir(parents=True, exist_ok=True)
+        write(str(directory / f"frame_{i:05d}.png"), image)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ViewFinder detection evaluation")
+    parser.add_argument("root", help="dataset directory")
+    parser.add_argument("--probe", type=int, nargs=2, metavar=("X", "Y"), help="probe pixel (default: config or 1718 877)")
+    parser.add_argument("--config", help="viewfinder_config.json to take mag_detection_pos and probe_cache from")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1, help="image decode threads")
+    parser.add_argument("--no-cache", action="store_true", help="always decode the images")
+    parser.add_argument("--sweep", action="store_true", help="also evaluate every minimum yellow-pixel count 1-25")
+    parser.add_argument("--errors", type=int, default=0, metavar="N", help="list up to N misclassified files")
+    parser.add_argument("--repeat", type=int, default=5, help="passes for the throughput measurement")
+    parser.add_argument("--synthesize", type=int, metavar="COUNT", help="first write a synthetic dataset to root")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    import numpy as np
+    from detection import is_yellow, yellow_mask
+
+    config = {}
+    if args.config:
+        with open(args.config) as f:
+            config = json.load(f).get("magnifier", {})
+    probe = tuple(args.probe or config.get("mag_detection_pos", [1718, 877]))
+
+    if args.synthesize:
+        start = time.perf_counter()
+        synthesize(args.root, args.synthesize, probe)
+        print(f"Wrote {args.synthesize} synthetic screenshots to {args.root} in {time.perf_counter() - start:.1f}s")
+
+    samples = scan_dataset(args.root)
+    if not samples:
+        raise SystemExit(f"No labeled screenshots under {args.root} (see --help for the layout)")
+
+    start = time.perf_counter()
+    patches, cached = load_patches(args.root, samples, probe, config, args.threads, not args.no_cache)
+    load_s = time.perf_counter() - start
+    # Plain ndarray view of the map: np.memmap slicing is several times slower per patch
+    patches = np.asarray(patches)
+    actual = np.array([s["label"] == "equipped" for s in samples])
+
+    start = time.perf_counter()
+    predicted = np.array([is_yellow(patch) for patch in patches], dtype=bool)
+    eval_s = time.perf_counter() - start
+    # All patches at once: the same rule as is_yellow, one mask over the stack
+    start = time.perf_counter()
+    counts = yellow_mask(patches).sum(axis=(1, 2))
+    batch_s = time.perf_counter() - start
+    if not np.array_equal(counts > 1, predicted):
+        print("[WARN] Batched mask disagrees with is_yellow; the throughput comparison is not like for like")
+
+    results = {
+        "samples": len(samples),
+        "probe": list(probe),
+        "load": {"seconds": round(load_s, 3), "cached": cached},
+        "overall": confusion(predicted, actual),
+        "by_map": {},
+        "by_time": {},
+        "throughput": {
+            "is_yellow_per_s": round(time_detector(is_yellow, patches, args.repeat)),
+            "batched_per_s": round(len(patches) / batch_s) if batch_s else None,
+        },
+    }
+    groups = {"by_map": defaultdict(list), "by_time": defaultdict(list)}
+    for i, sample in enumerate(samples):
+        groups["by_map"][sample["map"]].append(i)
+        groups["by_time"][sample["time"]].append(i)
+    for name, members in groups.items():
+        for tag, indices in sorted(members.items()):
+            results[name][tag] = confusion(predicted[indices], actual[indices])
+
+    print_header(f"Detection: {len(samples)} screenshots, probe {probe}")
+    print(f"  patches {'memory-mapped from cache' if cached else 'decoded'} in {load_s:.2f}s, "
+          f"evaluated in {eval_s * 1000:.1f} ms")
+    print(format_row("overall", results["overall"]))
+    for name, title in (("by_map", "map"), ("by_time", "time of day")):
+        print(f"\n  By {title}:")
+        for tag, stats in results[name].items():
+            print(format_row(tag, stats))
+    throughput = results["throughput"]
+    print(f"\n  is_yellow: {throughput['is_yellow_per_s']:,} probes/s per call"
+          f" ({1e6 / max(throughput['is_yellow_per_s'], 1):.1f} us per check), "
+          f"batched mask: {throughput['batched_per_s'] or 0:,} probes/s")
+
+    if args.sweep:
+        results["sweep"] = {}
+        print_header("Minimum yellow pixels in the 5x5 patch (is_yellow uses 2)")
+        for minimum in range(1, PATCH * PATCH + 1):
+            stats = confusion(counts >= minimum, actual)
+            results["sweep"][minimum] = stats
+            print(format_row(f">= {minimum}", stats))
+
+    if args.errors:
+        wrong = np.nonzero(predicted != actual)[0][:args.errors]
+        print_header(f"Misclassified ({int((predicted != actual).sum())} total)")
+        for i in wrong:
+            sample = samples[i]
+            print(f"  {sample['label']:<10} yellow px {int(counts[i]):>2}  {sample['path']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
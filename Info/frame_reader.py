@@ -0,0 +1,97 @@
+"""
+ViewFinder Frame Reader
+Example consumer for the shared-memory frame export (enable "shm_export" in
+the magnifier section of viewfinder_config.json first). Maps each new
+magnified frame straight out of shared memory, without copying, and prints
+the frame rate, capture-to-read latency and any frames it missed or that
+were overwritten while it was reading them.
+
+Usage:
+    python Info/frame_reader.py
+    python Info/frame_reader.py --name viewfinder_frames --work checksum
+    python Info/frame_reader.py --seconds 10 --json    # one JSON summary at the end
+"""
+
+import sys
+import json
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+BRM5_DIR = Path(__file__).resolve().parent.parent / "BRM5"
+sys.path.insert(0, str(BRM5_DIR))
+
+
+def attach(name, wait_s):
+    from frame_export import SharedFrameReader
+    deadline = time.perf_counter() + wait_s
+    while True:
+        try:
+            return SharedFrameReader(name)
+        except FileNotFoundError:
+            if time.perf_counter() >= deadline:
+                raise SystemExit(f"No shared-memory segment '{name}' (is shm_export enabled and the magnifier running?)")
+            time.sleep(0.1)
+
+
+def use_frame(frame, work):
+    # Stand-in for real work: the frame is only valid until the writer laps us
+    import numpy as np
+    if work == "copy":
+        return np.array(frame)
+    if work == "checksum":
+        return int(frame[::8, ::8].sum())
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ViewFinder shared-memory frame reader")
+    parser.add_argument("--name", default="viewfinder_frames", help="shared-memory segment name")
+    parser.add_argument("--seconds", type=float, help="stop after this long (default: until Ctrl+C)")
+    parser.add_argument("--work", default="copy", choices=["copy", "checksum", "none"], help="what to do with each frame")
+    parser.add_argument("--wait", type=float, default=5.0, help="seconds to wait for the segment to appear")
+    parser.add_argument("--json", action="store_true", help="print one JSON summary instead of per-second lines")
+    args = parser.parse_args()
+
+    reader = attach(args.name, args.wait)
+    if not args.json:
+        print(f"Attached to '{args.name}' ({reader.slots} slots x {reader.slot_bytes // 1024} KiB)")
+    latencies, window = [], []
+    shape = None
+    start = last_report = time.perf_counter()
+    try:
+        while args.seconds is None or time.perf_counter() - start < args.seconds:
+            latest = reader.latest()
+            if latest is None:
+                time.sleep(0.0005)
+                continue
+            seq, capture_time, frame = latest
+            shape = frame.shape
+            use_frame(frame, args.work)
+            # Only count the frame if it was not overwritten while in use
+            if reader.frame_valid(seq):
+                latency = (time.perf_counter() - capture_time) * 1000.0
+                latencies.append(latency)
+                window.append(latency)
+            now = time.perf_counter()
+            if not args.json and now - last_report >= 1.0:
+                print(f"{len(window) / (now - last_report):5.1f} fps  latency {statistics.median(window) if window else 0:.2f} ms  "
+                      f"frame {shape[1]}x{shape[0]}x{shape[2]}  missed {reader.stats['missed']}  torn {reader.stats['torn']}")
+                window, last_report = [], now
+    except KeyboardInterrupt:
+        pass
+
+    summary = dict(reader.stats, seconds=round(time.perf_counter() - start, 2))
+    if latencies:
+        ordered = sorted(latencies)
+        summary["latency_ms"] = {
+            "median": round(statistics.median(ordered), 3),
+            "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        }
+    reader.close()
+    print(json.dumps(summary) if args.json else f"Done: {summary}")
+
+
+if __name__ == "__main__":
+    main()
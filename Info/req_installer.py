@@ -2,12 +2,23 @@
 Universal Package Installer
 Installs packages with pre-built wheels only (Python 3.14 compatible)
 Can also generate .bat/.sh files and requirements.txt
+
+Installed versions are checked in-process first; pip only runs (once, for
+everything missing) when something needs installing.
+
+Usage:
+    python Info/req_installer.py                        # interactive menu
+    python Info/req_installer.py --install              # install missing packages, no prompts
+    python Info/req_installer.py --install --wheelhouse wheels   # offline, from local wheels
 """
 
 import sys
 import subprocess
 import platform
 import os
+import re
+import argparse
+from importlib import metadata
 
 # Package definitions
 PACKAGES = [
@@ -19,6 +30,9 @@ PACKAGES = [
     "pyinstaller>=5.0.0"
 ]
 
+# Default folder for "download wheels" and --wheelhouse
+WHEELHOUSE_DIR = "wheelhouse"
+
 #
 ### the requirements themselves
 #
@@ -84,37 +98,187 @@ def print_header(text):
     print("=" * 60 + "\n")
 
 
-def install_packages():
-    """Install packages with pre-built wheels only"""
+def normalize_name(name):
+    """Package names compare case-insensitively with -, _ and . equivalent"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def parse_requirement(spec):
+    """
+    Split "name>=1.2" into (name, operator, version). Only the single-clause
+    forms used in PACKAGES are supported; operator and version are None for a
+    bare name.
+    """
+    match = re.match(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:(>=|<=|==|!=|>|<)\s*([0-9][0-9A-Za-z.]*))?\s*$", spec)
+    if not match:
+        raise ValueError(f"Unsupported requirement: {spec}")
+    return match.group(1), match.group(2), match.group(3)
+
+
+def version_key(version):
+    """Numeric release parts of a version ("4.10.0.84" -> (4, 10, 0, 84)), zero-padded when compared"""
+    release = re.match(r"^\d+(?:\.\d+)*", version)
+    return tuple(int(part) for part in release.group(0).split(".")) if release else ()
+
+
+def version_satisfies(installed, operator, required):
+    if operator is None:
+        return True
+    a, b = version_key(installed), version_key(required)
+    width = max(len(a), len(b))
+    a, b = a + (0,) * (width - len(a)), b + (0,) * (width - len(b))
+    return {
+        ">=": a >= b, ">": a > b, "<=": a <= b,
+        "<": a < b, "==": a == b, "!=": a != b,
+    }[operator]
+
+
+def installed_version(name):
+    """Installed version of a distribution, read from its metadata, or None"""
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def installed_distributions():
+    """{normalized name: (name, version)} of everything installed, without running pip"""
+    found = {}
+    for dist in metadata.distributions():
+        name = dist.metadata["Name"]
+        if name:
+            found.setdefault(normalize_name(name), (name, dist.version))
+    return found
+
+
+def check_requirements(packages):
+    """Split requirements into (satisfied, missing) lists of (spec, installed version or None)"""
+    satisfied, missing = [], []
+    for spec in packages:
+        name, operator, required = parse_requirement(spec)
+        version = installed_version(name)
+        if version is not None and version_satisfies(version, operator, required):
+            satisfied.append((spec, version))
+        else:
+            missing.append((spec, version))
+    return satisfied, missing
+
+
+# pip output lines worth reporting, as (kind, regex); the value is group 1
+PIP_LINE_PATTERNS = [
+    ("collect", re.compile(r"^Collecting (\S+)")),
+    ("download", re.compile(r"^\s*(?:Downloading|Using cached|Processing) (\S+)")),
+    ("installing", re.compile(r"^Installing collected packages: (.+)$")),
+    ("installed", re.compile(r"^Successfully installed (.+)$")),
+    ("found", re.compile(r"^Found existing installation: (\S+)")),
+    ("uninstalled", re.compile(r"^\s*Successfully uninstalled (\S+)")),
+    ("skipped", re.compile(r"^WARNING: Skipping (\S+) as it is not installed")),
+    ("error", re.compile(r"^ERROR: (.+)$")),
+]
+
+
+def parse_pip_line(line):
+    """(kind, value) for a pip output line that marks progress, else None"""
+    for kind, pattern in PIP_LINE_PATTERNS:
+        match = pattern.match(line.rstrip())
+        if match:
+            return kind, match.group(1)
+    return None
+
+
+def run_pip(args, on_event=None):
+    """
+    Run one pip command, streaming its output through parse_pip_line.
+    Returns (return code, all output lines).
+    """
+    cmd = [sys.executable, "-m", "pip"] + args + ["--disable-pip-version-check"]
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+        bufsize=1,
+        creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+    )
+    lines = []
+    for line in iter(process.stdout.readline, ''):
+        lines.append(line.rstrip())
+        event = parse_pip_line(line)
+        if event and on_event:
+            on_event(*event)
+    process.stdout.close()
+    return process.wait(), lines
+
+
+def wheelhouse_args(wheelhouse):
+    """pip options to install only from a local folder of wheels"""
+    return ["--no-index", f"--find-links={os.path.abspath(wheelhouse)}"] if wheelhouse else []
+
+
+def install_packages(wheelhouse=None, assume_yes=False):
+    """Install missing packages with pre-built wheels only"""
     print_header("Installing Packages")
     
     print(f"Python version: {sys.version}")
     print(f"Platform: {platform.system()}\n")
     
-    print("Packages to install:")
-    for pkg in PACKAGES:
-        print(f"  - {pkg}")
+    satisfied, missing = check_requirements(PACKAGES)
+    for spec, version in satisfied:
+        print(f"  ✓ {spec} (installed: {version})")
+    if not missing:
+        print_header("All Packages Already Installed")
+        return True
+
+    print("\nPackages to install:")
+    for spec, version in missing:
+        print(f"  - {spec}" + (f" (installed: {version})" if version else ""))
+    if wheelhouse:
+        print(f"\nOffline install from: {os.path.abspath(wheelhouse)}")
     print()
     
     # Confirm installation
-    response = input("Proceed with installation? (y/n): ").strip().lower()
-    if response != 'y':
-        print("Installation cancelled.")
-        return False
+    if not assume_yes:
+        response = input("Proceed with installation? (y/n): ").strip().lower()
+        if response != 'y':
+            print("Installation cancelled.")
+            return False
     
     print("\nInstalling packages...\n")
-    
+
+    requested = {normalize_name(parse_requirement(spec)[0]) for spec, _ in missing}
+    seen = set()
+
+    def on_event(kind, value):
+        if kind in ("collect", "download"):
+            # Local wheels show up only as "Processing <file>.whl"
+            name = (normalize_name(re.split(r"[<>=!~\[;]", value)[0]) if kind == "collect"
+                    else normalize_name(os.path.basename(value).split("-")[0]))
+            if name in requested and name not in seen:
+                seen.add(name)
+                print(f"[{len(seen)}/{len(requested)}] Collecting {name}")
+            elif kind == "collect" and name not in requested:
+                print(f"      + dependency {value}")
+            if kind == "download":
+                print(f"      {os.path.basename(value)}")
+        elif kind == "installing":
+            print(f"\nInstalling {len(value.split(','))} package(s): {value}")
+        elif kind == "installed":
+            print(f"✓ Installed: {value}")
+        elif kind == "error":
+            print(f"✗ {value}")
+
     try:
-        # Install packages with --only-binary flag
-        cmd = [sys.executable, "-m", "pip", "install"] + PACKAGES + ["--only-binary=:all:"]
-        result = subprocess.run(cmd, check=False)
+        # One pip run for everything missing, pre-built wheels only
+        args = ["install"] + [spec for spec, _ in missing] + ["--only-binary=:all:", "--progress-bar=off"]
+        return_code, lines = run_pip(args + wheelhouse_args(wheelhouse), on_event)
         
-        if result.returncode == 0:
+        if return_code == 0:
             print_header("Installation Successful!")
             return True
         else:
             print_header("Installation Failed!")
-            print("Some packages may not have been installed.")
+            print("Some packages may not have been installed. pip output:\n")
+            print("\n".join(lines[-20:]))
             return False
             
     except Exception as e:
@@ -123,6 +287,26 @@ def install_packages():
         return False
 
 
+def download_wheelhouse(wheelhouse=WHEELHOUSE_DIR):
+    """Download wheels for all packages and their dependencies for offline installs"""
+    print_header("Downloading Wheels")
+    print(f"Destination: {os.path.abspath(wheelhouse)}\n")
+
+    def on_event(kind, value):
+        if kind in ("collect", "error"):
+            print(f"  {value}")
+
+    return_code, lines = run_pip(["download", "-d", wheelhouse, "--only-binary=:all:", "--progress-bar=off"] + PACKAGES, on_event)
+    if return_code == 0:
+        print_header("Wheelhouse Ready")
+        print("Install offline with:")
+        print(f"  python {os.path.basename(__file__)} --install --wheelhouse {wheelhouse}")
+        return True
+    print_header("Download Failed!")
+    print("\n".join(lines[-20:]))
+    return False
+
+
 def generate_files():
     """Generate requirements.txt, .bat, and .sh files"""
     print_header("Generating Installation Files")
@@ -177,20 +361,29 @@ def show_menu():
     print("1. Install packages now (with pre-built wheels)")
     print("2. Generate installation files (.txt, .bat, .sh)")
     print("3. Do both (install + generate files)")
-    print("4. Exit")
+    print(f"4. Download wheels to ./{WHEELHOUSE_DIR} (for offline installs)")
+    print("5. Exit")
     print()
     
-    choice = input("Choose an option (1-4): ").strip()
+    choice = input("Choose an option (1-5): ").strip()
     return choice
 
 
 def main():
     """Main program loop"""
+    parser = argparse.ArgumentParser(description="Install ViewFinder's packages")
+    parser.add_argument("--install", action="store_true", help="install missing packages without the menu or prompts")
+    parser.add_argument("--wheelhouse", help="install offline from this folder of wheels")
+    args = parser.parse_args()
+
+    if args.install:
+        sys.exit(0 if install_packages(args.wheelhouse, assume_yes=True) else 1)
+
     while True:
         choice = show_menu()
         
         if choice == "1":
-            install_packages()
+            install_packages(args.wheelhouse)
             input("\nPress Enter to continue...")
         
         elif choice == "2":
@@ -198,18 +391,22 @@ def main():
             input("\nPress Enter to continue...")
         
         elif choice == "3":
-            success = install_packages()
+            success = install_packages(args.wheelhouse)
             if success:
                 print("\nNow generating installation files...\n")
                 generate_files()
             input("\nPress Enter to continue...")
         
         elif choice == "4":
+            download_wheelhouse(args.wheelhouse or WHEELHOUSE_DIR)
+            input("\nPress Enter to continue...")
+        
+        elif choice == "5":
             print_header("Goodbye!")
             break
         
         else:
-            print("\nInvalid choice. Please enter 1-4.\n")
+            print("\nInvalid choice. Please enter 1-5.\n")
             input("Press Enter to continue...")
 
 
@@ -2,6 +2,8 @@ import sys
 import subprocess
 import os
 
+from req_installer import installed_distributions, run_pip
+
 # Check for PyQt6 before importing
 try:
     from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -92,29 +94,17 @@ class UninstallThread(QThread):
     
     def run(self):
         try:
-            # Get list of installed packages
+            # Read installed packages from their metadata instead of running pip list
             self.output_signal.emit("Fetching list of installed packages...\n")
             self.progress_signal.emit(0, 0)  # Indeterminate progress
             
-            result = subprocess.run(
-                [sys.executable, "-m", "pip", "list", "--format=freeze"],
-                capture_output=True,
-                text=True
+            # Skip critical packages (pip, setuptools and wheel) to avoid issues
+            packages = sorted(
+                (name for key, (name, _) in installed_distributions().items()
+                 if key not in ['pip', 'setuptools', 'wheel']),
+                key=str.lower
             )
             
-            if result.returncode != 0:
-                self.finished_signal.emit(False, "Failed to get package list")
-                return
-            
-            # Parse package names (exclude pip, setuptools, and wheel to avoid issues)
-            packages = []
-            for line in result.stdout.strip().split('\n'):
-                if line and '==' in line:
-                    pkg_name = line.split('==')[0]
-                    # Skip critical packages
-                    if pkg_name.lower() not in ['pip', 'setuptools', 'wheel']:
-                        packages.append(pkg_name)
-            
             if not packages:
                 self.finished_signal.emit(True, "No packages to uninstall")
                 return
@@ -123,29 +113,48 @@ class UninstallThread(QThread):
             self.output_signal.emit(f"Found {total_packages} packages to uninstall\n")
             self.output_signal.emit(f"Packages: {', '.join(packages)}\n\n")
             
-            # Uninstall packages one by one to show progress
+            # One pip run for all packages; progress comes from its output
             self.output_signal.emit("Uninstalling packages...\n")
             self.output_signal.emit("-" * 60 + "\n")
             
-            failed_packages = []
+            done = []
+
+            def on_event(kind, value):
+                if kind == "found":
+                    self.output_signal.emit(f"[{len(done) + 1}/{total_packages}] Uninstalling {value}...")
+                elif kind in ("uninstalled", "skipped"):
+                    done.append(value)
+                    self.progress_signal.emit(len(done), total_packages)
+                    self.output_signal.emit(" ✓ Success\n" if kind == "uninstalled" else f" - {value} was not installed\n")
+                elif kind == "error":
+                    self.output_signal.emit(f"   Error: {value}\n")
+
+            return_code, _ = run_pip(["uninstall", "-y"] + packages, on_event)
             
-            for i, pkg_name in enumerate(packages, 1):
-                self.progress_signal.emit(i, total_packages)
-                self.output_signal.emit(f"[{i}/{total_packages}] Uninstalling {pkg_name}...")
-                
-                uninstall_result = subprocess.run(
-                    [sys.executable, "-m", "pip", "uninstall", "-y", pkg_name],
-                    capture_output=True,
-                    text=True
-                )
-                
-                if uninstall_result.returncode == 0:
-                    self.output_signal.emit(" ✓ Success\n")
-                else:
-                    self.output_signal.emit(f" ✗ Failed\n")
-                    failed_packages.append(pkg_name)
-                    if uninstall_result.stderr:
-                        self.output_signal.emit(f"   Error: {uninstall_result.stderr}\n")
+            failed_packages = []
+            if return_code != 0:
+                # pip stops at the first package it can't remove; retry what
+                # is still installed one at a time so one failure doesn't
+                # block the rest
+                remaining = [name for name, _ in installed_distributions().values() if name in packages]
+                self.output_signal.emit(f"\nBatch uninstall stopped; retrying {len(remaining)} packages individually\n")
+                for i, pkg_name in enumerate(remaining, 1):
+                    self.progress_signal.emit(total_packages - len(remaining) + i, total_packages)
+                    self.output_signal.emit(f"[{i}/{len(remaining)}] Uninstalling {pkg_name}...")
+                    
+                    uninstall_result = subprocess.run(
+                        [sys.executable, "-m", "pip", "uninstall", "-y", pkg_name],
+                        capture_output=True,
+                        text=True
+                    )
+                    
+                    if uninstall_result.returncode == 0:
+                        self.output_signal.emit(" ✓ Success\n")
+                    else:
+                        self.output_signal.emit(f" ✗ Failed\n")
+                        failed_packages.append(pkg_name)
+                        if uninstall_result.stderr:
+                            self.output_signal.emit(f"   Error: {uninstall_result.stderr}\n")
             
             self.output_signal.emit("\n" + "-" * 60 + "\n")
             
@@ -246,12 +255,9 @@ class PackageUninstallerGUI(QMainWindow):
         self.output_text.append("Fetching installed packages...\n")
         
         try:
-            result = subprocess.run(
-                [sys.executable, "-m", "pip", "list"],
-                capture_output=True,
-                text=True
-            )
-            self.output_text.append(result.stdout)
+            installed = sorted(installed_distributions().values(), key=lambda item: item[0].lower())
+            width = max((len(name) for name, _ in installed), default=0)
+            self.output_text.append("\n".join(f"{name:<{width}}  {version}" for name, version in installed))
         except Exception as e:
             self.output_text.append(f"Error: {str(e)}")
     
@@ -0,0 +1,296 @@
+"""
+ViewFinder Soak Test
+Runs the real MagnifierOverlay, VisibilityController and toggle/reload paths
+for hours of simulated time against a synthetic capture source (Qt
+offscreen, no game or display needed). Frames are driven back to back, so an
+hour of simulated play takes minutes. Periodically samples RSS, Python object
+counts, tracemalloc and frame-time percentiles, and exits non-zero on
+sustained memory/object growth or frame-time drift.
+
+Usage:
+    python Info/soak_test.py --hours 2
+    python Info/soak_test.py --hours 0.25 --reload-minutes 1 --json soak.json
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import statistics
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+BRM5_DIR = Path(__file__).resolve().parent.parent / "BRM5"
+sys.path.insert(0, str(BRM5_DIR))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def print_header(text):
+    """Print a formatted header"""
+    print("\n" + "=" * 60)
+    print(f"  {text}")
+    print("=" * 60 + "\n")
+
+
+def rss_mb():
+    """Resident set size of this process in MB (None if it can't be read)"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    if os.path.exists("/proc/self/statm"):
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+        counters = Counters()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize / (1024 * 1024)
+    return None
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def slope(xs, ys):
+    """Least-squares slope of ys over xs"""
+    mx, my = statistics.fmean(xs), statistics.fmean(ys)
+    den = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / den if den else 0.0
+
+
+class SyntheticCapture:
+    """mss stand-in: a textured scene that pans slowly, plus a detection pixel
+    that alternates between 'gun equipped' and 'holstered'"""
+
+    def __init__(self, flip_s, seed=0):
+        import numpy as np
+        rng = np.random.default_rng(seed)
+        tile = rng.integers(0, 256, (256, 256, 4), dtype=np.uint8)
+        tile[..., 3] = 255
+        self.scene = np.tile(tile, (8, 8, 1))
+        self.flip_s = flip_s
+        self.sim_s = 0.0
+
+    def grab(self, monitor):
+        h, w = monitor["height"], monitor["width"]
+        offset = int(self.sim_s * 40) % (self.scene.shape[0] - max(h, w))
+        return self.scene[offset:offset + h, offset:offset + w]
+
+    def detect(self, pos, recorder=None):
+        return int(self.sim_s // self.flip_s) % 2 == 0
+
+    def close(self):
+        pass
+
+
+def run_soak(args):
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    import event_log
+    event_log.configure({"console": args.verbose})
+
+    import magnifier_overlay
+    import overlay_runtime
+    from magnifier_overlay import MagnifierOverlay, DEFAULT_MAGNIFIER_CONFIG
+    from visibility_state import VisibilityStateMachine
+    from overlay_toggles import OverlayToggles
+
+    config = dict(DEFAULT_MAGNIFIER_CONFIG)
+    if args.config:
+        with open(args.config, "r") as f:
+            config.update(json.load(f).get("magnifier", {}))
+    timer_s = config["timer_ms"] / 1000.0
+
+    capture = SyntheticCapture(args.detect_flip_seconds)
+    # The real classes, fed from the synthetic source instead of the screen
+    magnifier_overlay.mss = lambda: capture
+    overlay_runtime.detect_yellow_in_region = capture.detect
+
+    state = VisibilityStateMachine()
+    state.register("magnifier", None)
+    magnifier = MagnifierOverlay(config=config)
+    magnifier.create_windows()
+    state.register("magnifier", magnifier)
+    controller = overlay_runtime.VisibilityController(state, tuple(config["mag_detection_pos"]))
+    controller.timer.stop()
+    state.set_auto_detect(True)
+    toggles = OverlayToggles(state)
+
+    def take_over_timers():
+        # Frames are driven from the loop below, not the wall-clock timers
+        magnifier.lens_window.timer.stop()
+        magnifier.lens_window.tracker.stop()
+
+    take_over_timers()
+    app.processEvents()
+
+    total_ticks = int(args.hours * 3600 / timer_s)
+    every = lambda seconds: max(1, int(seconds / timer_s))
+    sample_every = every(args.sample_minutes * 60)
+    detect_every = every(overlay_runtime.DETECTION_CHECK_MS / 1000.0)
+    toggle_every = every(args.toggle_seconds)
+    hide_every = every(args.hide_seconds)
+    reload_every = every(args.reload_minutes * 60) if args.reload_minutes else 0
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    baseline_snapshot = None
+    samples = []
+    frame_ms = []
+    reloads = 0
+    started = time.perf_counter()
+
+    print_header(f"Soak: {args.hours:g} h simulated ({total_ticks} frames at {config['timer_ms']} ms), "
+                 f"sample every {args.sample_minutes:g} min")
+    print(f"  {'sim min':>8} {'rss MB':>8} {'objects':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'traced KB':>10} {'wall s':>7}")
+
+    for tick in range(1, total_ticks + 1):
+        capture.sim_s = tick * timer_s
+        if tick % detect_every == 0:
+            controller.check_and_update()
+        if tick % toggle_every == 0:
+            toggles.toggle("magnifier")
+        if tick % hide_every == 0:
+            state.set_hide_all(not state.hide_all)
+        if reload_every and tick % reload_every == 0:
+            magnifier.reload_config(config)
+            take_over_timers()
+            reloads += 1
+
+        start = time.perf_counter()
+        magnifier.lens_window.update_frame()
+        # Delivers the paint, visibility flushes and deferred deletes
+        app.processEvents()
+        frame_ms.append((time.perf_counter() - start) * 1000.0)
+
+        if tick % sample_every == 0:
+            gc.collect()
+            ordered = sorted(frame_ms)
+            sample = {
+                "sim_min": round(capture.sim_s / 60.0, 2),
+                "rss_mb": rss_mb(),
+                "objects": len(gc.get_objects()),
+                "p50_ms": round(percentile(ordered, 0.50), 3),
+                "p95_ms": round(percentile(ordered, 0.95), 3),
+                "p99_ms": round(percentile(ordered, 0.99), 3),
+                "traced_kb": round(tracemalloc.get_traced_memory()[0] / 1024, 1) if args.tracemalloc else None,
+                "wall_s": round(time.perf_counter() - started, 1),
+            }
+            if args.tracemalloc and baseline_snapshot is None and len(samples) + 1 >= args.warmup_samples:
+                baseline_snapshot = tracemalloc.take_snapshot()
+                baseline_types = Counter(type(o).__name__ for o in gc.get_objects())
+            samples.append(sample)
+            frame_ms = []
+            rss = f"{sample['rss_mb']:8.1f}" if sample["rss_mb"] is not None else f"{'-':>8}"
+            traced = f"{sample['traced_kb']:10.0f}" if sample["traced_kb"] is not None else f"{'-':>10}"
+            print(f"  {sample['sim_min']:8.1f} {rss} {sample['objects']:9d} {sample['p50_ms']:8.3f} "
+                  f"{sample['p95_ms']:8.3f} {sample['p99_ms']:8.3f} {traced} {sample['wall_s']:7.1f}")
+
+    results = {"samples": samples, "reloads": reloads, "frames": total_ticks,
+               "stats": magnifier.get_stats(), "visibility": state.get_stats(), "failures": []}
+
+    growth = []
+    if args.tracemalloc and baseline_snapshot is not None:
+        final = tracemalloc.take_snapshot()
+        growth = [str(stat) for stat in final.compare_to(baseline_snapshot, "lineno")[:args.top] if stat.size_diff > 0]
+        type_growth = Counter(type(o).__name__ for o in gc.get_objects())
+        type_growth.subtract(baseline_types)
+        results["allocation_growth"] = growth
+        results["type_growth"] = [(name, count) for name, count in type_growth.most_common(args.top) if count > 0]
+        tracemalloc.stop()
+
+    results["failures"] = evaluate(samples, args)
+    print_header("Result")
+    print(f"  {total_ticks} frames, {reloads} config reloads, {state.stats['transitions']} visibility transitions, "
+          f"{time.perf_counter() - started:.0f}s wall")
+    if growth:
+        print("  Top allocation growth since warm-up:")
+        for line in growth:
+            print(f"    {line}")
+    if results.get("type_growth"):
+        print("  Object types that grew: " + ", ".join(f"{name} +{count}" for name, count in results["type_growth"]))
+    for failure in results["failures"]:
+        print(f"  FAIL: {failure}")
+    if not results["failures"]:
+        print("  PASS: no sustained growth or drift")
+    return results
+
+
+def evaluate(samples, args):
+    """Fail on growth that persists past warm-up, not one-off steps"""
+    steady = samples[args.warmup_samples:]
+    if len(steady) < 3:
+        return [f"only {len(steady)} samples after warm-up; run longer or sample more often"]
+    failures = []
+    minutes = [s["sim_min"] for s in steady]
+    third = max(1, len(steady) // 3)
+    first, last = steady[:third], steady[-third:]
+
+    def check_growth(key, limit, unit):
+        values = [s[key] for s in steady]
+        if any(v is None for v in values):
+            return
+        projected = slope(minutes, values) * (minutes[-1] - minutes[0])
+        sustained = statistics.median(v[key] for v in last) > statistics.median(v[key] for v in first)
+        if sustained and projected > limit:
+            failures.append(f"{key} grew {projected:.1f}{unit} over {minutes[-1] - minutes[0]:.0f} simulated minutes "
+                            f"(limit {limit}{unit})")
+
+    check_growth("rss_mb", args.max_rss_growth_mb, " MB")
+    check_growth("objects", args.max_object_growth, "")
+    if args.tracemalloc:
+        check_growth("traced_kb", args.max_rss_growth_mb * 1024, " KB")
+
+    for key in ("p50_ms", "p95_ms"):
+        before = statistics.median(s[key] for s in first)
+        after = statistics.median(s[key] for s in last)
+        if before > 0 and after / before > args.max_drift:
+            failures.append(f"{key} drifted {before:.3f} -> {after:.3f} ms (x{after / before:.2f}, limit x{args.max_drift})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ViewFinder soak test")
+    parser.add_argument("--hours", type=float, default=2.0, help="simulated session length")
+    parser.add_argument("--config", help="viewfinder_config.json to take the magnifier settings from")
+    parser.add_argument("--sample-minutes", type=float, default=5.0, help="simulated minutes between samples")
+    parser.add_argument("--warmup-samples", type=int, default=2, help="samples ignored for growth checks")
+    parser.add_argument("--toggle-seconds", type=float, default=20.0, help="magnifier toggle interval")
+    parser.add_argument("--hide-seconds", type=float, default=45.0, help="hide-all toggle interval")
+    parser.add_argument("--detect-flip-seconds", type=float, default=30.0, help="equip/holster interval")
+    parser.add_argument("--reload-minutes", type=float, default=5.0, help="reload_config interval (0 = never)")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=25.0)
+    parser.add_argument("--max-object-growth", type=int, default=5000)
+    parser.add_argument("--max-drift", type=float, default=1.5, help="allowed late/early frame-time ratio")
+    parser.add_argument("--no-tracemalloc", dest="tracemalloc", action="store_false")
+    parser.add_argument("--top", type=int, default=10, help="allocation sites / types to report")
+    parser.add_argument("--verbose", action="store_true", help="print runtime log messages")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = run_soak(args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+        print(f"\nResults written to {args.json}")
+    sys.exit(1 if results["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "BRM5"))
+# The installer and tooling scripts
+sys.path.insert(1, os.path.join(ROOT, "Info"))
@@ -0,0 +1,149 @@
+import json
+
+import pytest
+
+from control_server import Client, ControlServer, parse_command, parse_switch
+
+
+@pytest.fixture(scope="module")
+def app():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+class FakeState:
+    def __init__(self):
+        self.auto_detect = True
+        self.hide_all = False
+
+
+class FakeRuntime:
+    def __init__(self):
+        self.visibility_state = FakeState()
+        self.calls = []
+        self.frames = 0
+
+    def control_toggle(self, overlay):
+        self.calls.append(("toggle", overlay))
+        return True
+
+    def set_magnifier_scale(self, scale):
+        self.calls.append(("zoom", scale))
+        return True
+
+    def set_auto_detect(self, enabled):
+        self.visibility_state.auto_detect = enabled
+
+    def reload_config(self):
+        self.calls.append(("reload",))
+
+    def control_stats(self):
+        return {"auto_detect": self.visibility_state.auto_detect, "frames": self.frames}
+
+
+class FakeSocket:
+    def __init__(self, pending=0):
+        self.pending = pending
+        self.written = []
+
+    def bytesToWrite(self):
+        return self.pending
+
+    def write(self, data):
+        self.written.append(json.loads(data))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def server(app):
+    runtime = FakeRuntime()
+    server = ControlServer(runtime, {"max_pending_bytes": 100})
+    yield server, runtime
+    server.close()
+
+
+@pytest.mark.parametrize("line, message", [
+    ("toggle Magnifier", {"cmd": "toggle", "overlay": "magnifier"}),
+    ("zoom 2.5", {"cmd": "zoom", "scale": 2.5}),
+    ("auto off", {"cmd": "auto", "enabled": False}),
+    ("AUTO yes", {"cmd": "auto", "enabled": True}),
+    ("subscribe 100", {"cmd": "subscribe", "interval_ms": 100}),
+    ("stats", {"cmd": "stats"}),
+    ('  {"cmd": "zoom", "scale": 3}  ', {"cmd": "zoom", "scale": 3}),
+])
+def test_parse_command(line, message):
+    assert parse_command(line) == message
+
+
+@pytest.mark.parametrize("line", ["", "   ", '{"scale": 3}', '{"cmd"', "auto maybe", "zoom big"])
+def test_parse_command_rejects(line):
+    with pytest.raises(ValueError):
+        parse_command(line)
+
+
+@pytest.mark.parametrize("value, expected", [
+    (True, True), (False, False), ("on", True), ("OFF", False), ("1", True), (0, False), ("no", False),
+])
+def test_parse_switch(value, expected):
+    assert parse_switch(value) is expected
+
+
+def test_dispatch_toggle_and_zoom(server):
+    server, runtime = server
+    assert server.handle("toggle crosshair") == {"ok": True, "cmd": "toggle", "visible": True}
+    assert server.handle('{"cmd": "zoom", "scale": 4}') == {"ok": True, "cmd": "zoom", "scale": 4.0}
+    assert runtime.calls == [("toggle", "crosshair"), ("zoom", 4.0)]
+
+
+@pytest.mark.parametrize("line", ["toggle radar", "zoom 50", "frobnicate", '{"cmd": "auto", "enabled": "maybe"}'])
+def test_dispatch_errors_are_replies(server, line):
+    server, runtime = server
+    reply = server.handle(line)
+    assert reply["ok"] is False and reply["error"]
+    assert server.stats["errors"] == 1
+    assert runtime.calls == []
+
+
+@pytest.mark.parametrize("enabled, expected", [("off", False), (False, False), ("on", True), (True, True)])
+def test_json_auto_uses_switch_parsing(server, enabled, expected):
+    server, runtime = server
+    runtime.visibility_state.auto_detect = not expected
+    reply = server.handle(json.dumps({"cmd": "auto", "enabled": enabled}))
+    assert reply == {"ok": True, "cmd": "auto", "auto_detect": expected}
+    assert runtime.visibility_state.auto_detect is expected
+
+
+def test_auto_without_value_toggles(server):
+    server, runtime = server
+    assert server.handle("auto")["auto_detect"] is False
+    assert server.handle("auto")["auto_detect"] is True
+
+
+def test_reload_runs_after_the_reply(app, server):
+    server, runtime = server
+    assert server.handle("reload") == {"ok": True, "cmd": "reload"}
+    assert runtime.calls == []
+    app.processEvents()
+    assert runtime.calls == [("reload",)]
+
+
+def test_subscribers_get_stats_and_slow_ones_are_skipped(server):
+    server, runtime = server
+    fast, slow = Client(FakeSocket()), Client(FakeSocket(pending=1000))
+    server.clients = [fast, slow]
+    assert server.handle("subscribe 10", fast)["interval_ms"] == 50
+    server.handle("subscribe 50", slow)
+    assert server.publish_timer.isActive()
+    server.publish()
+    assert fast.socket.written == [{"stats": {"auto_detect": True, "frames": 0, "fps": 0.0}}]
+    assert slow.socket.written == [] and slow.dropped == 1
+    server.handle("unsubscribe", fast)
+    server.handle("unsubscribe", slow)
+    assert not server.publish_timer.isActive()
+
+
+def test_subscribe_needs_a_connection(server):
+    server, _ = server
+    assert server.handle("subscribe")["ok"] is False
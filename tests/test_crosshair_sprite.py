@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+from crosshair_overlay import DEFAULT_CROSSHAIR_CONFIG
+from crosshair_sprite import CrosshairSprite, FILL
+
+BRM5_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "BRM5")
+
+
+def test_plain_sprite_does_not_import_numpy():
+    # The crosshair thread builds this at startup; numpy is for auto contrast only
+    code = (
+        "import sys; from crosshair_sprite import CrosshairSprite; "
+        "from crosshair_overlay import DEFAULT_CROSSHAIR_CONFIG as c; "
+        "CrosshairSprite(c).ppm(c['color'], c['outline_color']); "
+        "sys.exit('numpy' in sys.modules)"
+    )
+    assert subprocess.run([sys.executable, "-c", code], cwd=BRM5_DIR).returncode == 0
+
+
+def test_ppm_and_rgba_cover_every_pixel():
+    sprite = CrosshairSprite(DEFAULT_CROSSHAIR_CONFIG)
+    header = f"P6 {sprite.size} {sprite.size} 255\n".encode("ascii")
+    assert len(sprite.ppm("#00FF00", "#000000")) == len(header) + sprite.size ** 2 * 3
+    rgba = sprite.rgba("#00FF00", "#000000", 128)
+    assert len(rgba) == sprite.size ** 2 * 4
+    i = sprite.labels.index(FILL)
+    assert rgba[i * 4:i * 4 + 4] == bytes((0, 255, 0, 128))
@@ -0,0 +1,103 @@
+import gc
+import os
+import sys
+import weakref
+from multiprocessing import resource_tracker
+
+import numpy as np
+import pytest
+
+from frame_export import SharedFrameExporter, SharedFrameReader
+
+
+@pytest.fixture
+def ring(request):
+    name = f"vf_test_{os.getpid()}_{request.node.name}"[:30]
+    exporter = SharedFrameExporter(name, slots=3, max_frame_bytes=64 * 64 * 4)
+    reader = SharedFrameReader(name)
+    if sys.platform != "win32" and sys.version_info < (3, 13):
+        # The reader untracks the segment, which in this one process also
+        # drops the exporter's registration; put it back for its unlink
+        resource_tracker.register(exporter.shm._name, "shared_memory")
+    yield exporter, reader
+    reader.close()
+    exporter.close()
+
+
+def frame(value, size=32, channels=3):
+    return np.full((size, size, channels), value, np.uint8)
+
+
+def test_reader_sees_the_latest_frame(ring):
+    exporter, reader = ring
+    assert reader.latest() is None
+    exporter.publish(frame(7), 1.5)
+    seq, capture_time, view = reader.latest()
+    assert (seq, capture_time) == (1, 1.5)
+    assert np.array_equal(view, frame(7))
+    assert reader.frame_valid(seq)
+    del view
+    # Nothing new since
+    assert reader.latest() is None
+
+
+def test_reader_counts_missed_frames(ring):
+    exporter, reader = ring
+    exporter.publish(frame(1), 0.0)
+    assert reader.latest()[0] == 1
+    for value in (2, 3, 4):
+        exporter.publish(frame(value), 0.0)
+    seq, _, view = reader.latest()
+    assert seq == 4 and view[0, 0, 0] == 4
+    del view
+    assert reader.stats["missed"] == 2
+
+
+def test_lapped_read_is_detected(ring):
+    exporter, reader = ring
+    exporter.publish(frame(1), 0.0)
+    seq, _, view = reader.latest()
+    # Three more frames wrap the 3-slot ring back onto the slot being read
+    for value in (2, 3, 4):
+        exporter.publish(frame(value), 0.0)
+    assert not reader.frame_valid(seq)
+    assert reader.stats["torn"] == 1
+    del view
+
+
+def test_half_written_slot_is_skipped(ring):
+    exporter, reader = ring
+    exporter.publish(frame(1), 0.0)
+    # Writer has bumped seq_begin and latest but not finished the slot yet
+    header = exporter.slot_headers[2 % exporter.slots]
+    header["seq_begin"] = 2
+    exporter.ring["latest"] = 2
+    assert reader.latest() is None
+    assert reader.stats["torn"] == 1
+
+
+def test_frame_layout_round_trips(ring):
+    exporter, reader = ring
+    rgba = np.arange(20 * 30 * 4, dtype=np.uint32).astype(np.uint8).reshape(20, 30, 4)
+    exporter.publish(rgba, 0.0)
+    _, _, view = reader.latest()
+    assert view.shape == rgba.shape
+    assert np.array_equal(view, rgba)
+    del view
+
+
+def test_oversize_frames_are_rejected(ring):
+    exporter, reader = ring
+    assert not exporter.publish(frame(1, size=80, channels=4), 0.0)
+    assert exporter.stats["oversize"] == 1
+    assert reader.latest() is None
+
+
+def test_closed_exporter_is_released(request):
+    name = f"vf_test_{os.getpid()}_release"
+    exporter = SharedFrameExporter(name, slots=2, max_frame_bytes=1024)
+    ref = weakref.ref(exporter)
+    exporter.close()
+    del exporter
+    gc.collect()
+    assert ref() is None
@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from image_backend import OpenCVBackend, opencv_available
+from motion_highlight import MotionHighlighter
+
+BACKENDS = [None] + ([OpenCVBackend] if opencv_available() else [])
+SIZE = 96
+
+
+def world():
+    rng = np.random.default_rng(0)
+    # Flat 8x8 blocks, so a sub-block shift is visible in the differencing
+    scene = np.repeat(np.repeat(rng.integers(40, 120, (60, 60, 4), dtype=np.uint8), 8, 0), 8, 1)
+    scene[..., 3] = 255
+    return scene
+
+
+def capture(scene, x, y, target=None):
+    frame = scene[y:y + SIZE, x:x + SIZE].copy()
+    if target is not None:
+        ty, tx = target
+        frame[ty:ty + 8, tx:tx + 8, :3] = 250
+    return frame
+
+
+def highlighter(backend_cls, **config):
+    backend = backend_cls() if backend_cls else None
+    return MotionHighlighter({"motion_highlight": True, "motion_budget_ms": 1000.0, **config}, backend)
+
+
+def tinted(before, after):
+    return np.any(before != after, axis=2)
+
+
+@pytest.mark.parametrize("backend_cls", BACKENDS, ids=lambda cls: cls.name if cls else "numpy")
+def test_moving_target_is_tinted(backend_cls):
+    scene = world()
+    motion = highlighter(backend_cls)
+    for _ in range(3):
+        motion.process(capture(scene, 50, 50), (50, 50))
+    frame = capture(scene, 50, 50, target=(40, 40))
+    before = frame.copy()
+    motion.process(frame, (50, 50))
+    mask = tinted(before, frame)
+    assert mask[42:46, 42:46].all()
+    assert not mask[:30].any() and not mask[60:].any()
+    # Tinted pixels move toward the tint colour
+    assert frame[43, 43, 1] < before[43, 43, 1]
+    assert motion.stats["tinted"] == 1
+
+
+@pytest.mark.parametrize("backend_cls", BACKENDS, ids=lambda cls: cls.name if cls else "numpy")
+def test_cursor_moves_shift_the_background(backend_cls):
+    scene = world()
+    motion = highlighter(backend_cls)
+    motion.process(capture(scene, 50, 50), (50, 50))
+    # The lens follows the cursor; a static scene must not light up
+    for i in range(1, 8):
+        x, y = 50 + 3 * i, 50 - 2 * i
+        frame = capture(scene, x, y)
+        before = frame.copy()
+        motion.process(frame, (x, y))
+        assert not tinted(before, frame).any()
+    assert motion.stats["shifts"] == 7 and motion.stats["reseeds"] == 1
+    # ...while a target that appears during the move still does
+    frame = capture(scene, 80, 30, target=(20, 60))
+    before = frame.copy()
+    motion.process(frame, (80, 30))
+    assert tinted(before, frame)[22:26, 62:66].all()
+
+
+def test_jumps_past_the_lens_reseed():
+    scene = world()
+    motion = highlighter(None)
+    motion.process(capture(scene, 0, 0), (0, 0))
+    frame = capture(scene, 200, 200, target=(10, 10))
+    before = frame.copy()
+    motion.process(frame, (200, 200))
+    assert motion.stats["reseeds"] == 2 and motion.stats["shifts"] == 0
+    assert not tinted(before, frame).any()
+
+
+def test_camera_pan_reseeds_instead_of_tinting():
+    scene = world()
+    motion = highlighter(None)
+    motion.process(capture(scene, 50, 50), (50, 50))
+    # Content moves but the origin doesn't: the game camera turned
+    frame = capture(scene, 90, 70)
+    before = frame.copy()
+    motion.process(frame, (50, 50))
+    assert motion.moving > 0.35
+    assert not tinted(before, frame).any()
+    assert motion.stats["reseeds"] == 2
+
+
+def test_over_budget_frames_skip_the_differencing():
+    scene = world()
+    motion = highlighter(None, motion_budget_ms=1000.0)
+    for _ in range(3):
+        motion.process(capture(scene, 50, 50), (50, 50))
+    # Pretend the differencing costs more than the whole budget
+    motion.budget_ms = 0.5
+    motion.stage_ms = 10.0
+    frame = capture(scene, 50, 50, target=(40, 40))
+    before = frame.copy()
+    motion.process(frame, (50, 50))
+    assert np.array_equal(before, frame)
+    assert motion.stats["over_budget"] == 1
+    # The skipped frame still counts at its predicted cost, so the level drops
+    assert motion.level == 1
+
+
+def test_disabled_config_builds_nothing():
+    assert MotionHighlighter.from_config({"motion_highlight": False}) is None
+    assert MotionHighlighter.from_config({"motion_highlight": True}) is not None
@@ -0,0 +1,109 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import probe_calibration
+from detection import is_yellow
+from image_backend import opencv_available
+from probe_calibration import PATCH_RADIUS, cached_probe, calibrate, find_components
+
+YELLOW = (0, 220, 255, 255)
+MODES = [False] + ([True] if opencv_available() else [])
+
+
+def screen(w=1280, h=720):
+    # Dark scene with the weapon HUD where it sits at 1080p (scaled), a decoy
+    # of the same size far away, a large yellow area and some yellow specks
+    frame = np.zeros((h, w, 4), np.uint8)
+    frame[..., :3] = 40
+    frame[..., 3] = 255
+    hx, hy = int(1718 * w / 1920), int(877 * h / 1080)
+    frame[hy - 4:hy + 4, hx - 20:hx + 20] = YELLOW
+    frame[60:68, 100:140] = YELLOW
+    frame[300:500, 300:700] = YELLOW
+    frame[::97, ::89] = YELLOW
+    return frame, (hx, hy)
+
+
+@pytest.mark.parametrize("use_opencv", MODES)
+def test_probe_lands_on_the_hud(use_opencv):
+    frame, (hx, hy) = screen()
+    result = calibrate(frame, use_opencv)
+    x, y = result["pos"]
+    assert hx - 20 <= x < hx + 20 and hy - 4 <= y < hy + 4
+    assert result["fill"] == (2 * PATCH_RADIUS + 1) ** 2
+    patch = frame[y - PATCH_RADIUS:y + PATCH_RADIUS + 1, x - PATCH_RADIUS:x + PATCH_RADIUS + 1]
+    assert is_yellow(patch)
+
+
+@pytest.mark.parametrize("use_opencv", MODES)
+def test_other_resolutions_scale_the_expected_spot(use_opencv):
+    frame, (hx, hy) = screen(2560, 1440)
+    x, y = calibrate(frame, use_opencv)["pos"]
+    assert abs(x - hx) <= 20 and abs(y - hy) <= 4
+
+
+@pytest.mark.parametrize("use_opencv", MODES)
+def test_no_hud_means_no_probe(use_opencv):
+    frame, _ = screen()
+    frame[..., :3] = 40
+    frame[::97, ::89] = YELLOW
+    result = calibrate(frame, use_opencv)
+    assert result["pos"] is None and result["candidates"] == 0
+
+
+def test_block_components_cover_opencv_regions():
+    frame, _ = screen()
+    mask = frame[..., 2] > 150
+    boxes = find_components(mask, use_opencv=False)
+    assert (100, 60, 40, 8, 320) in boxes
+    assert all(area >= 1 for *_, area in boxes)
+
+
+def test_calibrate_screen_reports_screen_coordinates(monkeypatch):
+    frame, (hx, hy) = screen()
+    monkeypatch.setattr(probe_calibration, "grab_screen", lambda: (frame, (-1280, 0)))
+    result = probe_calibration.calibrate_screen(opencv_available())
+    assert result["size"] == [1280, 720]
+    assert -1280 + hx - 20 <= result["pos"][0] < -1280 + hx + 20
+
+
+def test_cached_probe():
+    config = {"probe_cache": {"2560x1440@96": [2290, 1169]}}
+    assert cached_probe(config, "2560x1440@96") == (2290, 1169)
+    assert cached_probe(config, "1920x1080@96") is None
+    assert cached_probe({}, None) is None
+
+
+@pytest.fixture(scope="module")
+def app():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def test_config_widget_calibrates_off_thread_and_keeps_the_cache(app, monkeypatch):
+    import magnifier_config_widget as widget_module
+    threads = []
+
+    def fake_calibrate(use_opencv):
+        threads.append(threading.current_thread())
+        return {"pos": [10, 20], "candidates": 1, "fill": 25}
+
+    monkeypatch.setattr(widget_module, "calibrate_screen", fake_calibrate)
+    widget = widget_module.MagnifierConfigWidget(widget_module.MAGNIFIER_DEFAULT)
+    widget.countdown = 1
+    widget.calibration_tick()
+    deadline = time.monotonic() + 5
+    while widget.config["probe_cache"] == {} and time.monotonic() < deadline:
+        app.processEvents()
+    key = probe_calibration.screen_key()
+    assert widget.config["probe_cache"] == {key: [10, 20]}
+    assert threads and threads[0] is not threading.main_thread()
+
+    # A manual X/Y edit is the fallback position, not a new calibration
+    widget.pos_x_spinbox.setValue(99)
+    config = widget.get_config()
+    assert config["mag_detection_pos"] == [99, 20]
+    assert config["probe_cache"] == {key: [10, 20]}
@@ -0,0 +1,21 @@
+from image_backend import NumpyBackend, OpenCVBackend, opencv_available
+from quality_governor import QualityGovernor
+
+import pytest
+
+
+@pytest.mark.parametrize("interpolation", ["cubic", "lanczos"])
+def test_unsupported_ceiling_is_linear_on_numpy(interpolation):
+    governor = QualityGovernor(NumpyBackend.interpolations, interpolation, 16)
+    assert governor.tier == "linear"
+    assert governor.get_stats()["ceiling"] == "linear"
+
+
+@pytest.mark.parametrize("interpolation", ["nearest", "linear", "area"])
+def test_supported_ceiling_is_kept(interpolation):
+    assert QualityGovernor(NumpyBackend.interpolations, interpolation, 16).tier == interpolation
+
+
+@pytest.mark.skipif(not opencv_available(), reason="OpenCV not installed")
+def test_opencv_keeps_cubic():
+    assert QualityGovernor(OpenCVBackend.interpolations, "cubic", 16).tier == "cubic"
@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+import req_installer
+from req_installer import (PACKAGES, check_requirements, normalize_name, parse_pip_line, parse_requirement,
+                           version_satisfies, wheelhouse_args)
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ("numpy>=2.0.0", ("numpy", ">=", "2.0.0")),
+    ("opencv-python >= 4.5.0", ("opencv-python", ">=", "4.5.0")),
+    ("keyboard==0.13.5", ("keyboard", "==", "0.13.5")),
+    ("mss", ("mss", None, None)),
+])
+def test_parse_requirement(spec, expected):
+    assert parse_requirement(spec) == expected
+
+
+@pytest.mark.parametrize("spec", ["numpy>=", "numpy~=2.0", "numpy>=2.0,<3", ""])
+def test_parse_requirement_rejects_other_forms(spec):
+    with pytest.raises(ValueError):
+        parse_requirement(spec)
+
+
+def test_every_listed_package_parses():
+    for spec in PACKAGES:
+        assert parse_requirement(spec)[0]
+
+
+@pytest.mark.parametrize("installed, operator, required, expected", [
+    ("4.10.0.84", ">=", "4.5.0", True),    # numeric, not string, comparison
+    ("4.5", ">=", "4.5.0", True),          # zero-padded
+    ("4.4.9", ">=", "4.5.0", False),
+    ("2.0.0rc1", ">=", "2.0.0", True),     # only the release part counts
+    ("1.26.4", ">=", "2.0.0", False),
+    ("0.13.5", "==", "0.13.5.0", True),
+    ("5.15.0", "<", "5.15.1", True),
+    ("5.15.0", "!=", "5.15", False),
+    ("anything", None, None, True),
+])
+def test_version_satisfies(installed, operator, required, expected):
+    assert version_satisfies(installed, operator, required) is expected
+
+
+def test_normalize_name():
+    assert normalize_name("PyQt5") == normalize_name("pyqt5")
+    assert normalize_name("opencv_python") == normalize_name("OpenCV.Python") == "opencv-python"
+
+
+@pytest.mark.parametrize("line, event", [
+    ("Collecting numpy>=2.0.0", ("collect", "numpy>=2.0.0")),
+    ("  Downloading numpy-2.1.0-cp311-cp311-win_amd64.whl (12.9 MB)", ("download", "numpy-2.1.0-cp311-cp311-win_amd64.whl")),
+    ("  Using cached mss-9.0.1-py3-none-any.whl (22 kB)", ("download", "mss-9.0.1-py3-none-any.whl")),
+    ("Processing ./wheelhouse/keyboard-0.13.5-py3-none-any.whl", ("download", "./wheelhouse/keyboard-0.13.5-py3-none-any.whl")),
+    ("Installing collected packages: mss, keyboard", ("installing", "mss, keyboard")),
+    ("Successfully installed keyboard-0.13.5 mss-9.0.1\n", ("installed", "keyboard-0.13.5 mss-9.0.1")),
+    ("Found existing installation: numpy 2.1.0", ("found", "numpy")),
+    ("  Successfully uninstalled numpy-2.1.0", ("uninstalled", "numpy-2.1.0")),
+    ("WARNING: Skipping pyinstaller as it is not installed.", ("skipped", "pyinstaller")),
+    ("ERROR: No matching distribution found for PyQt5>=5.15.0", ("error", "No matching distribution found for PyQt5>=5.15.0")),
+])
+def test_parse_pip_line(line, event):
+    assert parse_pip_line(line) == event
+
+
+@pytest.mark.parametrize("line", ["", "Requirement already satisfied: numpy in ./site-packages", "   |####| 12.9 MB"])
+def test_parse_pip_line_ignores_noise(line):
+    assert parse_pip_line(line) is None
+
+
+def test_check_requirements(monkeypatch):
+    installed = {"numpy": "1.26.4", "mss": "9.0.1"}
+    monkeypatch.setattr(req_installer, "installed_version", installed.get)
+    satisfied, missing = check_requirements(["numpy>=2.0.0", "mss>=6.1.0", "keyboard>=0.13.5"])
+    assert satisfied == [("mss>=6.1.0", "9.0.1")]
+    assert missing == [("numpy>=2.0.0", "1.26.4"), ("keyboard>=0.13.5", None)]
+
+
+def test_wheelhouse_args():
+    assert wheelhouse_args(None) == []
+    assert wheelhouse_args("wheelhouse") == ["--no-index", f"--find-links={os.path.abspath('wheelhouse')}"]
@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+
+from session_recorder import (KIND_CURSOR, KIND_DELTA, KIND_KEY, ReplaySource, SessionReader,
+                              SessionRecorder)
+
+SIZE = 40  # not a multiple of the tile, so edge tiles are padded
+
+
+def scene(count):
+    # A still gradient with a small square moving across it
+    y, x = np.indices((SIZE, SIZE))
+    base = np.stack([x * 6, y * 6, (x + y) * 3, np.full_like(x, 255)], axis=-1).astype(np.uint8)
+    frames = []
+    for i in range(count):
+        frame = base.copy()
+        frame[i:i + 6, 2 * i:2 * i + 6] = (0, 220, 255, 255)
+        frames.append(frame)
+    return frames
+
+
+def record(path, frames, **config):
+    recorder = SessionRecorder(str(path), {"change_threshold": 0, **config})
+    for i, frame in enumerate(frames):
+        recorder.set_detection_patch(frame[:5, :5])
+        assert recorder.append(i / 30.0, 100 + i, 200 - i, frame)
+    recorder.close()
+    return recorder
+
+
+def test_delta_round_trip_is_exact(tmp_path):
+    frames = scene(12)
+    recorder = record(tmp_path / "s.vfr", frames, keyframe_interval=5)
+    reader = SessionReader(str(tmp_path / "s.vfr"))
+    try:
+        assert len(reader) == len(frames)
+        kinds = reader.index["kind"].tolist()
+        assert kinds[0] == KIND_KEY and kinds[6] == KIND_KEY
+        assert kinds.count(KIND_DELTA) == len(frames) - 2
+        for i, frame in enumerate(frames):
+            record_, out = reader.read()
+            assert np.array_equal(out, frame)
+            assert (int(record_["x"]), int(record_["y"])) == (100 + i, 200 - i)
+            assert np.array_equal(record_["patch"], frame[:5, :5])
+            # Records are views into the mapping, which can't close under them
+            del record_
+        assert recorder.get_stats()["frames_stored"] == len(frames)
+    finally:
+        reader.close()
+
+
+def test_delta_frames_store_only_changed_tiles(tmp_path):
+    frames = scene(2)
+    record(tmp_path / "s.vfr", frames)
+    reader = SessionReader(str(tmp_path / "s.vfr"))
+    try:
+        lengths = reader.index["length"].tolist()
+        # The square only touches the top-left tiles, and everything is compressed
+        assert lengths[1] < lengths[0] < frames[0].nbytes
+    finally:
+        reader.close()
+
+
+def test_seek_rebuilds_from_the_last_keyframe(tmp_path):
+    frames = scene(10)
+    record(tmp_path / "s.vfr", frames, keyframe_interval=4)
+    reader = SessionReader(str(tmp_path / "s.vfr"))
+    try:
+        reader.seek(7)
+        assert np.array_equal(reader.frame, frames[7])
+        out = reader.read()[1]
+        assert np.array_equal(out, frames[8])
+    finally:
+        reader.close()
+
+
+def test_threshold_skips_small_changes_without_drift(tmp_path):
+    base = scene(1)[0]
+    frames = [base]
+    for i in range(1, 8):
+        # +-1 noise everywhere stays under the threshold; one tile really changes
+        noisy = base.copy()
+        noisy[::2, ::2, :3] ^= 1
+        noisy[20:30, 20:30] = (i * 30) % 256
+        frames.append(noisy)
+    record(tmp_path / "s.vfr", frames, change_threshold=2)
+    reader = SessionReader(str(tmp_path / "s.vfr"))
+    try:
+        for frame in frames:
+            out = reader.read()[1]
+            assert np.abs(out.astype(int) - frame).max() <= 1
+            assert np.array_equal(out[20:30, 20:30], frame[20:30, 20:30])
+    finally:
+        reader.close()
+
+
+def test_sparse_mode_keeps_cursor_ticks(tmp_path):
+    frames = scene(9)
+    record(tmp_path / "s.vfr", frames, mode="sparse", sparse_every=3)
+    reader = SessionReader(str(tmp_path / "s.vfr"))
+    try:
+        assert reader.mode == "sparse"
+        kinds = reader.index["kind"].tolist()
+        assert [k != KIND_CURSOR for k in kinds] == [i % 3 == 0 for i in range(9)]
+        for i, frame in enumerate(frames):
+            out = reader.read()[1]
+            if i % 3:
+                assert out is None
+            else:
+                assert np.array_equal(out, frame)
+    finally:
+        reader.close()
+
+
+def test_size_change_stops_recording(tmp_path):
+    recorder = SessionRecorder(str(tmp_path / "s.vfr"))
+    frame = np.zeros((SIZE, SIZE, 4), np.uint8)
+    assert recorder.append(0.0, 0, 0, frame)
+    assert not recorder.append(0.1, 0, 0, frame[:20])
+    assert recorder.closed
+    assert not recorder.append(0.2, 0, 0, frame)
+
+
+def test_replay_source_feeds_frames_in_order(tmp_path):
+    frames = scene(6)
+    record(tmp_path / "s.vfr", frames)
+    source = ReplaySource(str(tmp_path / "s.vfr"), realtime=False)
+    try:
+        lens = {"left": 0, "top": 0, "width": SIZE, "height": SIZE}
+        patch = {"left": 0, "top": 0, "width": 5, "height": 5}
+        for i, frame in enumerate(frames):
+            assert np.array_equal(source.grab(lens), frame)
+            assert source.cursor_pos() == (100 + i, 200 - i)
+            assert np.array_equal(source.grab(patch), frame[:5, :5])
+        source.grab(lens)
+        assert source.exhausted
+    finally:
+        source.close()
+
+
+@pytest.mark.parametrize("mode", ["delta", "sparse"])
+def test_unknown_mode_falls_back_to_delta(tmp_path, mode):
+    recorder = SessionRecorder(str(tmp_path / "s.vfr"), {"mode": mode})
+    assert recorder.config["mode"] == mode
+    assert SessionRecorder(str(tmp_path / "t.vfr"), {"mode": "bogus"}).config["mode"] == "delta"
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from image_backend import INTERPOLATIONS, NumpyBackend, OpenCVBackend, opencv_available
+from tiled_resize import BAND_EXACT, TiledResizer
+
+BACKENDS = [NumpyBackend] + ([OpenCVBackend] if opencv_available() else [])
+CASES = [(100, 1.5), (150, 2), (150, 10 / 3), (200, 3.5), (300, 10)]
+
+
+@pytest.fixture(scope="module")
+def app():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.mark.parametrize("backend_cls", BACKENDS, ids=lambda cls: cls.name)
+@pytest.mark.parametrize("interpolation", INTERPOLATIONS)
+def test_tiled_matches_single_call(app, backend_cls, interpolation):
+    backend = backend_cls()
+    resizer = TiledResizer(backend, 3, min_pixels=0)
+    rng = np.random.default_rng(0)
+    try:
+        for radius, scale in CASES:
+            frame = rng.integers(0, 256, (2 * radius, 2 * radius, backend.channels), dtype=np.uint8)
+            assert np.array_equal(resizer.resize(frame, scale, interpolation), backend.resize(frame, scale, interpolation))
+    finally:
+        resizer.close()
+    # Enabled pairs actually run in bands; the rest never do
+    if interpolation in BAND_EXACT[backend.name]:
+        assert resizer.stats["tiled"] > 0
+    else:
+        assert resizer.stats["tiled"] == 0
+
+
+@pytest.mark.skipif(not opencv_available(), reason="needs OpenCV")
+def test_estimate_pipeline_leaves_opencv_threads_alone():
+    backend = OpenCVBackend()
+    before = backend.cv2.getNumThreads()
+    resizer = TiledResizer.from_config({"resize_threads": before + 2}, backend, live=False)
+    try:
+        assert backend.cv2.getNumThreads() == before
+    finally:
+        resizer.close()